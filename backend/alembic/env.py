@@ -9,6 +9,8 @@ from alembic import context
 from app.core.config import settings
 from app.utils.database import Base
 from app.models.prediction import Prediction, Alert # Ensure models are loaded
+from app.models.stats import StatsCounter, StatsDaily
+from app.models.rollup import HourlyRollup, DailyRollup
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -63,6 +65,14 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Callers (e.g. tests) may hand in an open connection via config.attributes
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
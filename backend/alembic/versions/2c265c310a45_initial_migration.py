@@ -20,13 +20,45 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # The base tables as first shipped; later revisions alter them.
+    # if_not_exists: databases bootstrapped by Base.metadata.create_all()
+    # already have them
+    op.create_table(
+        "predictions",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("rainfall", sa.Float(), nullable=False),
+        sa.Column("ph_level", sa.Float(), nullable=False),
+        sa.Column("contamination", sa.Float(), nullable=False),
+        sa.Column("cases_count", sa.Integer(), nullable=False),
+        sa.Column("risk_level", sa.String(), nullable=False),
+        sa.Column("severity", sa.String(), nullable=True),
+        sa.Column("trend", sa.String(), nullable=True),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("recommendation", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_predictions_id", "predictions", ["id"], unique=False, if_not_exists=True)
+    op.create_table(
+        "alerts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("prediction_id", sa.Integer(), nullable=False),
+        sa.Column("severity", sa.String(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("is_resolved", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["prediction_id"], ["predictions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_alerts_id", "alerts", ["id"], unique=False, if_not_exists=True)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index("ix_alerts_id", table_name="alerts", if_exists=True)
+    op.drop_table("alerts", if_exists=True)
+    op.drop_index("ix_predictions_id", table_name="predictions", if_exists=True)
+    op.drop_table("predictions", if_exists=True)
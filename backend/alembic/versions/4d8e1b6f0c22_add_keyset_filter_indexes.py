@@ -0,0 +1,39 @@
+"""Add (filter, created_at) indexes for keyset-paginated listings
+
+Revision ID: 4d8e1b6f0c22
+Revises: 9c4f2a7e5b31
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8e1b6f0c22'
+down_revision: Union[str, Sequence[str], None] = '9c4f2a7e5b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) — mirrors __table_args__ in app/models/prediction.py
+INDEXES = [
+    ("ix_predictions_risk_level_created_at", "predictions", ["risk_level", "created_at"]),
+    ("ix_predictions_severity_created_at", "predictions", ["severity", "created_at"]),
+    ("ix_alerts_severity_created_at", "alerts", ["severity", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,56 @@
+"""Add hourly and daily prediction rollup tables
+
+Revision ID: 5e7a3c9d1f48
+Revises: 4d8e1b6f0c22
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7a3c9d1f48'
+down_revision: Union[str, Sequence[str], None] = '4d8e1b6f0c22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = [("rollups_hourly", "ix_rollups_hourly_bucket"), ("rollups_daily", "ix_rollups_daily_bucket")]
+
+
+def _columns():
+    counts = ["n", "risk_low", "risk_medium", "risk_high",
+              "severity_critical", "severity_high", "severity_warning", "severity_info"]
+    features = ["rainfall", "ph_level", "contamination", "cases_count"]
+    columns = [
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+    ]
+    columns += [sa.Column(c, sa.Integer(), nullable=False) for c in counts]
+    for f in features:
+        columns.append(sa.Column(f"{f}_sum", sa.Float(), nullable=False))
+        columns.append(sa.Column(f"{f}_max", sa.Float(), nullable=True))
+    return columns
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, index in TABLES:
+        op.create_table(table, *_columns(), sa.PrimaryKeyConstraint("location", "bucket"), if_not_exists=True)
+        op.create_index(index, table, ["bucket"], unique=False, if_not_exists=True)
+
+    # Seed from existing predictions with the same code the backfill CLI runs
+    from app.services.rollup_service import rollup_aggregator
+    with Session(bind=op.get_bind()) as db:
+        rollup_aggregator.backfill(db)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, index in reversed(TABLES):
+        op.drop_index(index, table_name=table, if_exists=True)
+        op.drop_table(table, if_exists=True)
@@ -0,0 +1,43 @@
+"""Add access-path indexes for trends, listings, stats and pulse sync
+
+Revision ID: 7b1e4c9d2a10
+Revises: 2c265c310a45
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4c9d2a10'
+down_revision: Union[str, Sequence[str], None] = '2c265c310a45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) — mirrors __table_args__ in app/models/prediction.py
+INDEXES = [
+    ("ix_predictions_location_created_at", "predictions", ["location", "created_at"]),
+    ("ix_predictions_created_at", "predictions", ["created_at"]),
+    ("ix_alerts_is_resolved_created_at", "alerts", ["is_resolved", "created_at"]),
+    ("ix_alerts_created_at", "alerts", ["created_at"]),
+    ("ix_alerts_prediction_id", "alerts", ["prediction_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # if_not_exists: databases bootstrapped by Base.metadata.create_all()
+    # already carry these indexes
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
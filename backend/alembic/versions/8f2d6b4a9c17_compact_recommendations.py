@@ -0,0 +1,126 @@
+"""Store recommendations as template registry codes
+
+Revision ID: 8f2d6b4a9c17
+Revises: 5e7a3c9d1f48
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2d6b4a9c17'
+down_revision: Union[str, Sequence[str], None] = '5e7a3c9d1f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows read and rewritten per page
+BATCH = 5000
+
+# ---- Template registry as of this revision ----
+# Frozen copy of app/services/recommendation.py when the codes were
+# introduced: later edits to the live templates must not change which texts
+# this migration recognises or what a downgrade writes back.
+
+_RISK_LINES = {
+    "high": (
+        "🚨 Immediate water supply shutdown recommended",
+        "💧 Emergency chlorination of water sources",
+        "📢 Issue public boil-water advisory",
+    ),
+    "medium": (
+        "⚠️ Increase water quality monitoring frequency",
+        "💧 Precautionary chlorination of water supply",
+        "🔬 Schedule water quality testing",
+    ),
+    "low": (
+        "✅ Continue routine water quality monitoring",
+        "🔄 Maintain standard purification protocols",
+    ),
+}
+_SEVERITY_LINES = {
+    "CRITICAL": "🔥 EMERGENCY: Immediate evacuation and deployment of full medical response units.",
+    "HIGH": "🚨 ALERT: High risk detected — prioritize water treatment and public notification.",
+    "WARNING": "⚠️ WARNING: Moderate risk rising — increase surveillance and lab frequency.",
+    "INFO": "ℹ️ INFO: Routine surveillance active — no immediate action required.",
+}
+_TREND_LINES = {
+    "RISING": "📈 TREND: Risk level is RISING. Accelerate preventive measures.",
+    "STABLE": "📊 TREND: Situation is stable. Continue monitoring.",
+    "FALLING": "📉 TREND: Risk level is declining. Prepare to scale back alerts.",
+}
+_FLAG_LINES = (
+    "⚗️ pH Out of Range — inspect for industrial leaks or runoff.",
+    "☣️ Extreme contamination detected — investigate source immediately.",
+    "🏨 Outbreak Alert — notify all nearby healthcare facilities.",
+    "🌧️ Flood Warning — move medical supplies to high ground.",
+)
+_RISK_AXIS = ("low", "medium", "high")
+_SEVERITY_AXIS = ("INFO", "WARNING", "HIGH", "CRITICAL")
+_TREND_AXIS = (None, "RISING", "STABLE", "FALLING")
+
+
+def _templates() -> list:
+    """Text of every code, in code order."""
+    templates = []
+    for level in _RISK_AXIS:
+        for severity in _SEVERITY_AXIS:
+            for trend in _TREND_AXIS:
+                for flags in range(1 << len(_FLAG_LINES)):
+                    actions = [_SEVERITY_LINES[severity]]
+                    if trend in _TREND_LINES and not (trend == "STABLE" and level == "high"):
+                        actions.append(_TREND_LINES[trend])
+                    actions.extend(_RISK_LINES[level])
+                    actions.extend(line for bit, line in enumerate(_FLAG_LINES) if flags >> bit & 1)
+                    templates.append(" | ".join(actions))
+    return templates
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    codes = {}
+    for code, text in enumerate(_templates()):
+        codes.setdefault(text, code)  # first code for texts that several codes share
+
+    bind = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(bind).get_columns("predictions")}
+    if "recommendation_code" not in columns:
+        with op.batch_alter_table("predictions") as batch:
+            batch.add_column(sa.Column("recommendation_code", sa.Integer(), nullable=True))
+
+    # Replace every text the registry knows with its code; free text stays as
+    # is. Rows are paged by id so the table is never held in memory at once.
+    page = sa.text(
+        "SELECT id, recommendation FROM predictions "
+        "WHERE recommendation IS NOT NULL AND id > :after ORDER BY id LIMIT :limit"
+    )
+    update = sa.text("UPDATE predictions SET recommendation_code = :code, recommendation = NULL WHERE id = :id")
+    after = 0
+    while True:
+        rows = bind.execute(page, {"after": after, "limit": BATCH}).all()
+        if not rows:
+            break
+        params = [{"id": row_id, "code": codes[text]} for row_id, text in rows if text in codes]
+        if params:
+            bind.execute(update, params)
+        after = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    templates = _templates()
+
+    bind = op.get_bind()
+    codes = bind.execute(sa.text(
+        "SELECT DISTINCT recommendation_code FROM predictions WHERE recommendation_code IS NOT NULL"
+    )).scalars().all()
+    for code in codes:
+        bind.execute(
+            sa.text("UPDATE predictions SET recommendation = :text WHERE recommendation_code = :code"),
+            {"text": templates[code], "code": code},
+        )
+    with op.batch_alter_table("predictions") as batch:
+        batch.drop_column("recommendation_code")
@@ -0,0 +1,63 @@
+"""Add incrementally maintained dashboard stats tables
+
+Revision ID: 9c4f2a7e5b31
+Revises: 7b1e4c9d2a10
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f2a7e5b31'
+down_revision: Union[str, Sequence[str], None] = '7b1e4c9d2a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Seed the counters from the existing rows (same numbers as
+# ``python -m app.services.stats_service reconcile``)
+BACKFILL = [
+    "INSERT INTO stats_counters (key, value) SELECT 'total_predictions', COUNT(*) FROM predictions",
+    "INSERT INTO stats_counters (key, value) SELECT 'risk:' || risk_level, COUNT(*) "
+    "FROM predictions GROUP BY risk_level",
+    "INSERT INTO stats_counters (key, value) SELECT 'trend:' || trend, COUNT(*) "
+    "FROM predictions WHERE trend IS NOT NULL GROUP BY trend",
+    "INSERT INTO stats_counters (key, value) SELECT 'confidence_sum', COALESCE(SUM(confidence), 0) FROM predictions",
+    "INSERT INTO stats_counters (key, value) SELECT 'confidence_count', COUNT(confidence) FROM predictions",
+    "INSERT INTO stats_counters (key, value) SELECT 'total_alerts', COUNT(*) FROM alerts",
+    "INSERT INTO stats_counters (key, value) SELECT 'resolved_alerts', COUNT(*) FROM alerts WHERE is_resolved",
+    "INSERT INTO stats_daily (day, predictions) SELECT DATE(created_at), COUNT(*) "
+    "FROM predictions WHERE created_at IS NOT NULL GROUP BY DATE(created_at)",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stats_counters",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "stats_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("predictions", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+        if_not_exists=True,
+    )
+    op.execute("DELETE FROM stats_counters")
+    op.execute("DELETE FROM stats_daily")
+    for statement in BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("stats_daily", if_exists=True)
+    op.drop_table("stats_counters", if_exists=True)
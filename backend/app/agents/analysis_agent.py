@@ -2,9 +2,12 @@ import numpy as np
 import logging
 import joblib
 from app.core.config import settings
+from app.utils.metrics import stage
 
 logger = logging.getLogger("aqua-sentinel")
 
+_SHAP = stage("agent.shap", "explain")
+
 class AnalysisAgent:
     """
     🔍 Analysis Agent
@@ -40,7 +43,8 @@ class AnalysisAgent:
 
         if self.explainer is not None:
             try:
-                shap_values = self.explainer(X)
+                with _SHAP.time():
+                    shap_values = self.explainer(X)
                 abs_shap = np.abs(shap_values.values[0])
                 sorted_indices = np.argsort(abs_shap)[::-1]
 
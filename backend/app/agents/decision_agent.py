@@ -1,16 +1,53 @@
+import asyncio
 import httpx
 import json
 from app.core.config import settings
+from app.utils.metrics import stage
+
+_OLLAMA = stage("agent.ollama", "llm")
 
 class DecisionAgent:
     """
     🚨 Decision Agent
     Suggests specific actions based on risk and analysis.
-    Uses Local Llama3 (Ollama).
+    Uses Local Llama3 (Ollama) through one pooled HTTP client (kept-alive
+    connections), created on first use or by ``warm()``.
     """
     def __init__(self):
         self.base_url = f"{settings.OLLAMA_BASE_URL}/api/generate"
         self.model = settings.LLM_MODEL
+        self.fallbacks = 0
+        self.llm_reachable = None   # unknown until warm() or a call
+        self._client = None
+        self._client_loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # A client is tied to the event loop it first ran on
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=30.0)
+            self._client_loop = loop
+        return self._client
+
+    async def warm(self):
+        """Open the pool with a cheap Ollama request; records whether the LLM is reachable."""
+        try:
+            response = await self._get_client().get(
+                f"{settings.OLLAMA_BASE_URL}/api/tags", timeout=settings.LLM_WARMUP_TIMEOUT
+            )
+            self.llm_reachable = response.status_code == 200
+        except httpx.HTTPError:
+            self.llm_reachable = False
+
+    def pool_state(self) -> str:
+        if self.llm_reachable is None:
+            return "cold"
+        return "warm" if self.llm_reachable else "unavailable"
+
+    async def aclose(self):
+        if self._client is not None:
+            client, self._client, self._client_loop = self._client, None, None
+            await client.aclose()
 
     async def decide(self, risk_level: str, confidence: float, top_factors: list, input_data: dict) -> dict:
         """Consult Llama3 for actionable advice."""
@@ -35,27 +72,31 @@ class DecisionAgent:
         """
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(self.base_url, json={
+            with _OLLAMA.time():
+                response = await self._get_client().post(self.base_url, json={
                     "model": self.model,
                     "prompt": prompt,
                     "stream": False,
                     "format": "json"
                 })
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    # Some versions of Ollama return the response string which needs second parsing
-                    advice_data = json.loads(result.get("response", "{}"))
-                    return advice_data
-                else:
-                    return self._fallback_advice(risk_level)
+            self.llm_reachable = True
+
+            if response.status_code == 200:
+                result = response.json()
+                # Some versions of Ollama return the response string which needs second parsing
+                advice_data = json.loads(result.get("response", "{}"))
+                return advice_data
+            else:
+                return self._fallback_advice(risk_level)
         except Exception as e:
+            if isinstance(e, httpx.TransportError):
+                self.llm_reachable = False
             print(f"DecisionAgent Error: {e}")
             return self._fallback_advice(risk_level)
 
     def _fallback_advice(self, risk_level: str) -> dict:
         """Static fallback if Llama3 is unavailable."""
+        self.fallbacks += 1
         if risk_level.upper() == "HIGH":
             return {
                 "recommendations": [
@@ -1,7 +1,6 @@
-import numpy as np
-import joblib
 import os
 from app.core.config import settings
+from app.ml import predictor
 from app.ml.predictor import _engineer_features
 
 class PredictionAgent:
@@ -16,9 +15,11 @@ class PredictionAgent:
         self._load_resources()
 
     def _load_resources(self):
+        # Share the predictor's loaded model rather than unpickling a second copy
         if os.path.exists(settings.abs_model_path):
-            self.model = joblib.load(settings.abs_model_path)
-            self.encoder = joblib.load(settings.abs_encoder_path)
+            predictor._load_model()
+            self.model = predictor._model
+            self.encoder = predictor._encoder
 
     def predict(self, rainfall: float, ph_level: float, 
                 contamination: float, cases_count: int) -> dict:
@@ -13,6 +13,62 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./aqua_sentinel.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # Derived from DATABASE_URL when unset
+    # SQLite storage profile. WAL + NORMAL survives process crashes; use FULL
+    # for power-loss durability of every acknowledged commit.
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Trend: number of recent predictions per location kept in memory
+    TREND_WINDOW: int = 3
+
+    # Group-commit write pipeline
+    WRITE_PIPELINE_ENABLED: bool = True
+    GROUP_COMMIT_MAX_DELAY_MS: float = 5.0
+    GROUP_COMMIT_MAX_BATCH: int = 500
+
+    # /predict/batch: rows per request (scored and written in one go)
+    BATCH_MAX_ROWS: int = 5000
+
+    # Admission control: shared request slots (some reserved for ingestion) and limits
+    # for the heavy routes (agent analysis and simulation) in cost units per second
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 64
+    ADMISSION_RESERVED_INGEST: int = 16
+    ADMISSION_HEAVY_CONCURRENCY: int = 4
+    ADMISSION_HEAVY_RATE: float = 2.0
+    ADMISSION_HEAVY_BURST: float = 10.0
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_MAX_QUEUE: int = 32
+
+    # Idempotency-Key on /predict and /predict/batch: how long responses are replayed, keys kept
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+
+    # Streaming ingest (/predict/ingest): rows per transaction and line limits
+    INGEST_CHUNK_ROWS: int = 2000
+    INGEST_MAX_LINE_BYTES: int = 65536
+    INGEST_MAX_ERRORS_PER_CHUNK: int = 20
+
+    # /realtime/pulse: seconds a computed pulse is served (and revalidated) before recomputing
+    PULSE_SNAPSHOT_SECONDS: float = 30.0
+
+    # Hot/cold tiering: predictions older than this move to monthly archive files
+    ARCHIVE_RETENTION_DAYS: int = 180
+    ARCHIVE_DIR: str = "data/archive"
+
+    # Bulk export: rows per streamed chunk, background job files and their lifetime
+    EXPORT_CHUNK_ROWS: int = 5000
+    EXPORT_DIR: str = "data/exports"
+    EXPORT_JOB_TTL_SECONDS: float = 86400.0
+
+    # Server-Timing response headers; on-demand request profiling (admin token required,
+    # disabled when unset) with folded-stack profiles stored under PROFILE_DIR
+    SERVER_TIMING_ENABLED: bool = True
+    ADMIN_TOKEN: Optional[str] = None
+    PROFILE_INTERVAL_MS: float = 1.0
+    PROFILE_DIR: str = "data/profiles"
 
     # CORS
     CORS_ORIGINS: Any = ["http://localhost:5173", "http://127.0.0.1:5173"]
@@ -42,9 +98,36 @@ class Settings(BaseSettings):
     # Ollama Settings
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     LLM_MODEL: str = "llama3:latest"
+    LLM_WARMUP_TIMEOUT: float = 2.0
+
+    # Load the model and SHAP explainer (and open the LLM pool) in the background at startup;
+    # otherwise on the first agent request
+    AGENT_WARMUP: bool = True
 
     # Weather API
     WEATHER_API_KEY: Optional[str] = None
+    WEATHER_API_URL: str = "https://api.openweathermap.org/data/2.5/weather"
+    WEATHER_API_TIMEOUT: float = 10.0
+    WEATHER_CACHE_TTL: float = 600.0        # Serve cached reading without refresh (s)
+    WEATHER_CACHE_MAX_STALE: float = 3600.0  # Serve stale reading while refreshing (s)
+    WEATHER_BREAKER_FAILURES: int = 3       # Consecutive failures before opening
+    WEATHER_BREAKER_COOLDOWN: float = 60.0  # Seconds before a half-open probe
+    WEATHER_GRID_DEG: float = 0.1           # Geo-grid cell size (~11 km); wards in a cell share a fetch
+    WEATHER_MAX_CONCURRENCY: int = 4        # Parallel upstream fetches per batch
+    WEATHER_CACHE_MAX_ENTRIES: int = 256    # LRU cap on cached grid cells
+    # Coimbatore district bounding box; /realtime/weather rejects points outside it
+    WEATHER_LAT_MIN: float = 10.2
+    WEATHER_LAT_MAX: float = 11.6
+    WEATHER_LON_MIN: float = 76.6
+    WEATHER_LON_MAX: float = 77.4
+    WEATHER_HISTORY_PATH: str = "data/weather_history.npz"
+    WEATHER_HISTORY_FLUSH_SECONDS: float = 300.0
+
+    # Medical Records Store
+    MEDICAL_DB_PATH: str = "data/medical_records.db"
+    MEDICAL_RECENT_DAYS: int = 7           # Window (ending today) for the pulse's recent-cases aggregate
+    MEDICAL_RELOAD_SECONDS: float = 5.0    # How often reads check the store file for new ingests
+    MEDICAL_INGEST_CHUNK: int = 50_000     # Rows per ingest transaction
 
     @property
     def abs_model_path(self) -> str:
@@ -58,6 +141,26 @@ class Settings(BaseSettings):
     def abs_metrics_path(self) -> str:
         return os.path.join(self.BASE_DIR, self.METRICS_PATH)
 
+    @property
+    def abs_weather_history_path(self) -> str:
+        return os.path.join(self.BASE_DIR, self.WEATHER_HISTORY_PATH)
+
+    @property
+    def abs_profile_dir(self) -> str:
+        return os.path.join(self.BASE_DIR, self.PROFILE_DIR)
+
+    @property
+    def abs_archive_dir(self) -> str:
+        return os.path.join(self.BASE_DIR, self.ARCHIVE_DIR)
+
+    @property
+    def abs_export_dir(self) -> str:
+        return os.path.join(self.BASE_DIR, self.EXPORT_DIR)
+
+    @property
+    def abs_medical_db_path(self) -> str:
+        return os.path.join(self.BASE_DIR, self.MEDICAL_DB_PATH)
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -2,9 +2,11 @@
 AquaSentinel AI — FastAPI Application Entry Point.
 AI-powered waterborne disease outbreak prediction system.
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Configure Logging
@@ -14,17 +16,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger("aqua-sentinel")
 
-from app.utils.database import engine, Base
-from app.routes import predict, agent_api, realtime
+from app.utils.database import async_engine, Base, get_db
+from app.routes import predict, agent_api, realtime, analytics, export, metrics
 from app.core.config import settings
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.services.idempotency import REPLAYED_HEADER
+from app.services.weather_history import weather_history
+from app.services.write_pipeline import write_pipeline
+from app.services.risk_history import risk_history
+from app.services.export_service import exporter
+from app.services.agent_orchestrator import orchestrator
+from app.services.admission import AdmissionMiddleware
+from app.services.profiling import ServerTimingMiddleware
+
+
+def _prepare_database(app: FastAPI):
+    """
+    Create tables and hydrate trend history through the ``get_db`` dependency,
+    so an override (e.g. a test database) applies to startup as well.
+    """
+    db_dependency = app.dependency_overrides.get(get_db, get_db)
+    sessions = db_dependency()
+    db = next(sessions)
+    try:
+        Base.metadata.create_all(bind=db.get_bind())
+        logger.info(f"✅ {settings.APP_NAME} Database tables created")
+        risk_history.hydrate(db)
+        logger.info(f"Trend history hydrated for {len(risk_history)} locations")
+    finally:
+        sessions.close()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create database tables on startup."""
-    Base.metadata.create_all(bind=engine)
-    logger.info(f"✅ {settings.APP_NAME} Database tables created")
+    """
+    Create tables, reload weather and trend history, and start the DB writer.
+    Agent resources warm up in the background; /ready reports when they are.
+    """
+    _prepare_database(app)
+    weather_history.load()
+    if settings.WRITE_PIPELINE_ENABLED:
+        await write_pipeline.start()
+    warmup = asyncio.create_task(orchestrator.warmup()) if settings.AGENT_WARMUP else None
     yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    await orchestrator.decide_agent.aclose()
+    await write_pipeline.stop()
+    exporter.shutdown()
+    weather_history.flush()
+    await async_engine.dispose()
     logger.info(f"👋 Shutting down {settings.APP_NAME}")
 
 
@@ -35,6 +76,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Server-Timing and admin-requested profiles (inside admission: only admitted work is timed)
+app.add_middleware(ServerTimingMiddleware)
+
+# Admission control (inside CORS, so rejections carry CORS headers)
+app.add_middleware(AdmissionMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -42,12 +89,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REPLAYED_HEADER, "Retry-After", "Server-Timing", "X-Profile-File"],
 )
 
 # Register routes
 app.include_router(predict.router, prefix=settings.API_V1_STR)
 app.include_router(agent_api.router, prefix=settings.API_V1_STR)
 app.include_router(realtime.router, prefix=settings.API_V1_STR)
+app.include_router(analytics.router, prefix=settings.API_V1_STR)
+app.include_router(export.router, prefix=settings.API_V1_STR)
+app.include_router(metrics.router)
 
 
 @app.get("/", tags=["Health"])
@@ -58,3 +109,18 @@ def health_check():
         "service": "AquaSentinel AI",
         "version": "1.0.0",
     }
+
+
+@app.get("/ready", tags=["Health"])
+def readiness_check():
+    """
+    Readiness: 200 once the model is loaded and warmup has finished, else 503.
+    Also reports the SHAP explainer and the LLM connection pool; neither gates
+    readiness, since analysis and advice both have fallbacks.
+    """
+    components = orchestrator.readiness()
+    ready = components["model"] == "warm" and orchestrator.warmup_state == "done"
+    return JSONResponse(
+        {"ready": ready, "warmup": orchestrator.warmup_state, **components},
+        status_code=200 if ready else 503,
+    )
@@ -7,6 +7,7 @@ import os
 import numpy as np
 import joblib
 from app.core.config import settings
+from app.utils.metrics import perf_counter, stage
 
 MODEL_PATH = settings.abs_model_path
 ENCODER_PATH = settings.abs_encoder_path
@@ -15,6 +16,12 @@ ENCODER_PATH = settings.abs_encoder_path
 _model = None
 _encoder = None
 
+_FEATURES = stage("predictor.features", "model")
+_PREDICT = stage("predictor.predict", "model")
+_PREDICT_PROBA = stage("predictor.predict_proba", "model")
+_FEATURES_BATCH = stage("predictor.features_batch", "model")
+_PREDICT_PROBA_BATCH = stage("predictor.predict_proba_batch", "model")
+
 
 def _load_model():
     """Lazy-load the trained model and label encoder."""
@@ -37,7 +44,16 @@ def _engineer_features(rainfall: float, ph_level: float,
     [rainfall, ph_level, contamination, cases_count,
      ph_deviation, rain_contam_interaction, cases_per_contam, severity_score]
     """
-    ph_deviation = abs(ph_level - 7.0)
+    return _engineer_features_batch(
+        np.array([rainfall], dtype=float), np.array([ph_level], dtype=float),
+        np.array([contamination], dtype=float), np.array([cases_count], dtype=float),
+    )
+
+
+def _engineer_features_batch(rainfall: np.ndarray, ph_level: np.ndarray,
+                             contamination: np.ndarray, cases_count: np.ndarray) -> np.ndarray:
+    """Column-wise form of :func:`_engineer_features`: one (n, 8) feature matrix."""
+    ph_deviation = np.abs(ph_level - 7.0)
     rain_contam_interaction = rainfall * contamination
     cases_per_contam = cases_count / (contamination + 0.01)
     severity_score = (
@@ -47,10 +63,10 @@ def _engineer_features(rainfall: float, ph_level: float,
         cases_count / 120 * 0.25
     )
 
-    return np.array([[
+    return np.column_stack([
         rainfall, ph_level, contamination, cases_count,
         ph_deviation, rain_contam_interaction, cases_per_contam, severity_score,
-    ]])
+    ])
 
 
 def predict(rainfall: float, ph_level: float,
@@ -74,10 +90,16 @@ def predict(rainfall: float, ph_level: float,
 
     # --- Layer 2: ML Hybrid Ensemble ---
     _load_model()
+    t0 = perf_counter()
     features = _engineer_features(rainfall, ph_level, contamination, cases_count)
-    
+    t1 = perf_counter()
     prediction = _model.predict(features)[0]
+    t2 = perf_counter()
     probabilities = _model.predict_proba(features)[0]
+    t3 = perf_counter()
+    _FEATURES.observe(t1 - t0)
+    _PREDICT.observe(t2 - t1)
+    _PREDICT_PROBA.observe(t3 - t2)
 
     risk_level = _encoder.inverse_transform([prediction])[0]
     confidence = float(max(probabilities))
@@ -87,3 +109,50 @@ def predict(rainfall: float, ph_level: float,
         "confidence": round(confidence, 4),
         "method": "hybrid_ensemble"
     }
+
+
+def predict_batch(rainfall, ph_level, contamination, cases_count) -> list:
+    """
+    Vectorized :func:`predict` over equal-length sequences of inputs.
+    The rule-based overrides are applied as masks and every remaining row is
+    scored by the ensemble in a single ``predict_proba`` call.
+    Returns one result dict per row, in input order.
+    """
+    rainfall = np.asarray(rainfall, dtype=float)
+    ph_level = np.asarray(ph_level, dtype=float)
+    contamination = np.asarray(contamination, dtype=float)
+    cases_count = np.asarray(cases_count, dtype=float)
+    results = [None] * len(rainfall)
+
+    # --- Layer 1: Rule-Based Safety Overrides (first matching rule wins) ---
+    overridden = np.zeros(len(rainfall), dtype=bool)
+    rules = [
+        (contamination > 0.85, 1.0, "Critical Contamination Threshold Exceeded"),
+        ((rainfall > 450) & (contamination > 0.4), 0.95, "Heavy Rain + Contamination Interaction"),
+        (cases_count > 80, 0.98, "Localized Outbreak Pattern Detected"),
+    ]
+    for mask, confidence, reason in rules:
+        for i in np.flatnonzero(mask & ~overridden).tolist():
+            results[i] = {"risk_level": "high", "confidence": confidence, "reason": reason}
+        overridden |= mask
+
+    # --- Layer 2: ML Hybrid Ensemble, one call for the rest ---
+    remaining = np.flatnonzero(~overridden)
+    if len(remaining):
+        _load_model()
+        t0 = perf_counter()
+        features = _engineer_features_batch(
+            rainfall[remaining], ph_level[remaining], contamination[remaining], cases_count[remaining],
+        )
+        t1 = perf_counter()
+        # Soft voting: the predicted class is the argmax of the averaged probabilities
+        probabilities = _model.predict_proba(features)
+        _FEATURES_BATCH.observe(t1 - t0)
+        _PREDICT_PROBA_BATCH.observe(perf_counter() - t1)
+        best = probabilities.argmax(axis=1)
+        risk_levels = _encoder.inverse_transform(_model.classes_[best])
+        confidences = np.round(probabilities.max(axis=1), 4)
+        for i, risk_level, confidence in zip(remaining.tolist(), risk_levels.tolist(), confidences.tolist()):
+            results[i] = {"risk_level": risk_level, "confidence": confidence, "method": "hybrid_ensemble"}
+
+    return results
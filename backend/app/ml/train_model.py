@@ -15,31 +15,40 @@ Features:
     6. feature_correlation.png
     7. roc_curves.png
 
+Each RF / GB fit (final models, CV folds, learning-curve subsets) runs once,
+in parallel worker processes; the hybrid ensemble reuses those fits and
+plots render in the same pool. A wall-time summary per stage is printed at
+the end.
+
 Usage:
-    python app/ml/train_model.py
+    python app/ml/train_model.py [--no-plots] [--jobs N]
 """
 import os
 import sys
 import json
+import time
+import argparse
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import (
     classification_report, confusion_matrix, accuracy_score,
     f1_score, roc_curve, auc, precision_recall_curve,
     average_precision_score,
 )
-from sklearn.model_selection import train_test_split, cross_val_score, learning_curve
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.preprocessing import LabelEncoder, label_binarize
+from sklearn.utils import Bunch
 import joblib
 
-# Plotting
-import matplotlib
-matplotlib.use("Agg")  # Non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Plotting libraries are imported by setup_plot_style(), so importing this
+# module (e.g. from tests) doesn't pay for matplotlib and seaborn
+plt = None
+sns = None
 
 warnings.filterwarnings("ignore")
 
@@ -61,7 +70,14 @@ GRID_COLOR = "#334155"
 
 
 def setup_plot_style():
-    """Set dark theme for all plots."""
+    """Import the plotting libraries and set the dark theme for all plots."""
+    global plt, sns
+    if plt is None:
+        import matplotlib
+        matplotlib.use("Agg")  # Non-interactive backend
+        import matplotlib.pyplot
+        import seaborn
+        plt, sns = matplotlib.pyplot, seaborn
     plt.rcParams.update({
         "figure.facecolor": BG_COLOR,
         "axes.facecolor": CARD_COLOR,
@@ -249,21 +265,17 @@ def plot_feature_correlation(df, feature_cols, filename):
     print(f"   📊 Saved {filename}")
 
 
-def plot_roc_curves(models_dict, X_test, y_test, class_names, encoder, filename):
-    """Multi-class ROC curves (One-vs-Rest) for all models."""
+
+def plot_roc_curves(scores, y_test, class_names, filename):
+    """Multi-class ROC curves (One-vs-Rest) for all models, from their test-set probabilities."""
     n_classes = len(class_names)
     y_test_bin = label_binarize(y_test, classes=range(n_classes))
 
-    fig, axes = plt.subplots(1, len(models_dict), figsize=(14, 6))
+    fig, axes = plt.subplots(1, len(scores), figsize=(14, 6))
     line_colors = ["#ef4444", "#22c55e", "#3b82f6"]
 
-    for idx, (name, model) in enumerate(models_dict.items()):
-        ax = axes[idx] if len(models_dict) > 1 else axes
-
-        if hasattr(model, "predict_proba"):
-            y_score = model.predict_proba(X_test)
-        else:
-            continue
+    for idx, (name, y_score) in enumerate(scores.items()):
+        ax = axes[idx] if len(scores) > 1 else axes
 
         for i in range(n_classes):
             fpr, tpr, _ = roc_curve(y_test_bin[:, i], y_score[:, i])
@@ -287,21 +299,16 @@ def plot_roc_curves(models_dict, X_test, y_test, class_names, encoder, filename)
     print(f"   📊 Saved {filename}")
 
 
-def plot_precision_recall_curves(models_dict, X_test, y_test, class_names, filename):
-    """Multi-class Precision-Recall curves for all models."""
+def plot_precision_recall_curves(scores, y_test, class_names, filename):
+    """Multi-class Precision-Recall curves for all models, from their test-set probabilities."""
     n_classes = len(class_names)
     y_test_bin = label_binarize(y_test, classes=range(n_classes))
 
-    fig, axes = plt.subplots(1, len(models_dict), figsize=(14, 6))
+    fig, axes = plt.subplots(1, len(scores), figsize=(14, 6))
     line_colors = ["#ef4444", "#22c55e", "#3b82f6"]
 
-    for idx, (name, model) in enumerate(models_dict.items()):
-        ax = axes[idx] if len(models_dict) > 1 else axes
-
-        if hasattr(model, "predict_proba"):
-            y_score = model.predict_proba(X_test)
-        else:
-            continue
+    for idx, (name, y_score) in enumerate(scores.items()):
+        ax = axes[idx] if len(scores) > 1 else axes
 
         for i in range(n_classes):
             precision, recall, _ = precision_recall_curve(y_test_bin[:, i], y_score[:, i])
@@ -324,14 +331,12 @@ def plot_precision_recall_curves(models_dict, X_test, y_test, class_names, filen
     print(f"   📊 Saved {filename}")
 
 
-def plot_learning_curves(model, X, y, filename):
-    """Plot learning curves to show training vs validation performance."""
-    train_sizes, train_scores, test_scores = learning_curve(
-        model, X, y, cv=5, n_jobs=-1,
-        train_sizes=np.linspace(0.1, 1.0, 5),
-        scoring="accuracy"
-    )
+def plot_learning_curves(train_sizes, train_scores, test_scores, filename):
+    """Plot learning curves to show training vs validation performance.
 
+    ``train_scores`` / ``test_scores`` have one row per training size and one
+    column per CV fold, as returned by ``sklearn.model_selection.learning_curve``.
+    """
     train_mean = np.mean(train_scores, axis=1)
     train_std = np.std(train_scores, axis=1)
     test_mean = np.mean(test_scores, axis=1)
@@ -341,7 +346,7 @@ def plot_learning_curves(model, X, y, filename):
 
     ax.plot(train_sizes, train_mean, 'o-', color="#ef4444", label="Training Score")
     ax.fill_between(train_sizes, train_mean - train_std, train_mean + train_std, alpha=0.1, color="#ef4444")
-    
+
     ax.plot(train_sizes, test_mean, 'o-', color="#22c55e", label="Cross-Validation Score")
     ax.fill_between(train_sizes, test_mean - test_std, test_mean + test_std, alpha=0.1, color="#22c55e")
 
@@ -357,191 +362,356 @@ def plot_learning_curves(model, X, y, filename):
     print(f"   📊 Saved {filename}")
 
 
+# ================ PIPELINE HELPERS ================
+
+CV_FOLDS = 5
+LEARNING_CURVE_SIZES = np.linspace(0.1, 1.0, 5)
+PLOT_FILES = [
+    "confusion_matrix_rf.png",
+    "confusion_matrix_gb.png",
+    "feature_importance_comparison.png",
+    "model_accuracy_comparison.png",
+    "risk_distribution.png",
+    "feature_correlation.png",
+    "roc_curves.png",
+    "pr_curves.png",
+    "learning_curves.png",
+]
+
+
+class StageTimer:
+    """Wall time per pipeline stage, printed as a summary when training ends."""
+
+    def __init__(self):
+        self.seconds = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self):
+        total = time.perf_counter() - self._start
+        print("\n⏱️  Stage wall time:")
+        for name, seconds in self.seconds.items():
+            print(f"   {name:10s} {seconds:7.2f}s")
+        print(f"   {'total':10s} {total:7.2f}s")
+
+
+def _render(plot, *args):
+    """Draw one plot (runs in a worker process); returns its filename."""
+    plot(*args)
+    return args[-1]
+
+
+def _fit(estimator, X, y):
+    """Fit one model on the full training split (runs in a worker process)."""
+    return estimator.fit(X, y)
+
+
+def _fit_fold(estimator, X, y, train, test):
+    """
+    Fit one model on a CV training subset (runs in a worker process). Only
+    the class probabilities on that subset and on the fold's test rows travel
+    back, not the fitted model.
+    """
+    estimator.fit(X.iloc[train], y[train])
+    return estimator.classes_, estimator.predict_proba(X.iloc[train]), estimator.predict_proba(X.iloc[test])
+
+
+def _soft_vote_accuracy(scored, y_true):
+    """
+    Accuracy of a soft vote over members' ``(classes, probabilities)`` for
+    the same rows; with one member, that member's own accuracy.
+    """
+    classes = scored[0][0]
+    proba = np.mean([probabilities for _, probabilities in scored], axis=0)
+    return float(np.mean(classes[np.argmax(proba, axis=1)] == y_true))
+
+
+def assemble_voting(members, y):
+    """
+    A soft ``VotingClassifier`` built from already-fitted members instead of
+    refitting clones of them. Sets the same fitted attributes as
+    ``VotingClassifier.fit``, so predictions and pickles are identical.
+    """
+    ensemble = VotingClassifier(
+        estimators=[(name, clone(model)) for name, model in members.items()],
+        voting='soft',
+    )
+    ensemble.le_ = LabelEncoder().fit(y)
+    ensemble.classes_ = ensemble.le_.classes_
+    ensemble.estimators_ = list(members.values())
+    ensemble.named_estimators_ = Bunch(**members)
+    for model in ensemble.estimators_:
+        if hasattr(model, "feature_names_in_"):
+            ensemble.feature_names_in_ = model.feature_names_in_
+    return ensemble
+
+
 # ================ MAIN TRAINING ================
 
-def train():
-    """Train multiple models, compare, generate plots, and save the best one."""
-    setup_plot_style()
+def train(plots=True, jobs=None):
+    """
+    Train multiple models, compare, generate plots, and save the best one.
+
+    Every RF / GB fit (final models, CV folds, learning-curve subsets) runs
+    once, in a pool of ``jobs`` worker processes (default: one per CPU). The
+    hybrid ensemble is assembled from those fits rather than refitting its
+    members, and plots render in the same pool while models train. With
+    ``plots=False`` only the model, encoder and metrics are written.
+    """
+    timer = StageTimer()
     os.makedirs(PLOTS_DIR, exist_ok=True)
 
     print("=" * 60)
     print("🌊 AquaSentinel AI — Enhanced ML Training Pipeline")
     print("=" * 60)
 
-    # ---- Load Data ----
-    print("\n📊 Loading dataset...")
-    df = pd.read_csv(DATA_PATH)
-    print(f"   Shape: {df.shape}")
-    print(f"   Risk distribution:\n{df['risk_label'].value_counts().to_string()}\n")
-
-    # ---- Feature Engineering ----
-    print("🔧 Engineering features...")
-    df = add_engineered_features(df)
-    print(f"   Total features: {len(FEATURE_COLS)}")
-
-    X = df[FEATURE_COLS]
-    y = df["risk_label"]
-
-    # ---- Encode Labels ----
-    encoder = LabelEncoder()
-    y_encoded = encoder.fit_transform(y)
-    class_names = list(encoder.classes_)
-    print(f"   Classes: {class_names}")
-
-    # ---- Train/Test Split ----
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-    )
-    print(f"   Train: {len(X_train)} | Test: {len(X_test)}")
-
-    # ---- Plot 1: Risk Distribution ----
-    print("\n🎨 Generating plots...")
-    plot_risk_distribution(df, "risk_distribution.png")
-
-    # ---- Plot 2: Feature Correlation ----
-    plot_feature_correlation(df, FEATURE_COLS, "feature_correlation.png")
+    with timer("load"):
+        # ---- Load Data ----
+        print("\n📊 Loading dataset...")
+        df = pd.read_csv(DATA_PATH)
+        print(f"   Shape: {df.shape}")
+        print(f"   Risk distribution:\n{df['risk_label'].value_counts().to_string()}\n")
+
+        # ---- Feature Engineering ----
+        print("🔧 Engineering features...")
+        df = add_engineered_features(df)
+        print(f"   Total features: {len(FEATURE_COLS)}")
+
+        X = df[FEATURE_COLS]
+        y = df["risk_label"]
+
+        # ---- Encode Labels ----
+        encoder = LabelEncoder()
+        y_encoded = encoder.fit_transform(y)
+        class_names = list(encoder.classes_)
+        print(f"   Classes: {class_names}")
+
+        # ---- Train/Test Split ----
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
+        )
+        print(f"   Train: {len(X_train)} | Test: {len(X_test)}")
 
     # ---- Define Models ----
-    rf = RandomForestClassifier(
-        n_estimators=200, max_depth=12,
-        min_samples_split=5, min_samples_leaf=2,
-        random_state=42, n_jobs=-1,
-    )
-    gb = GradientBoostingClassifier(
-        n_estimators=200, max_depth=6,
-        learning_rate=0.1, min_samples_split=5,
-        min_samples_leaf=2, random_state=42,
-    )
-    hybrid_ensemble = VotingClassifier(
-        estimators=[('rf', rf), ('gb', gb)],
-        voting='soft'
-    )
-
-    models = {
-        "RandomForest": rf,
-        "GradientBoosting": gb,
-        "HybridEnsemble (RF+GB)": hybrid_ensemble,
+    # Workers are the parallelism, so each fit is single-threaded; the saved
+    # model gets n_jobs=-1 back before it is written.
+    members = {
+        "RandomForest": RandomForestClassifier(
+            n_estimators=200, max_depth=12,
+            min_samples_split=5, min_samples_leaf=2,
+            random_state=42, n_jobs=1,
+        ),
+        "GradientBoosting": GradientBoostingClassifier(
+            n_estimators=200, max_depth=6,
+            learning_rate=0.1, min_samples_split=5,
+            min_samples_leaf=2, random_state=42,
+        ),
     }
-
-    # ---- Train & Evaluate ----
-    results = {}
-    importances_dict = {}
-    best_model_name = None
-    best_accuracy = 0
-
-    for name, model in models.items():
-        print(f"\nTraining: {name}")
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
-        
-        acc = accuracy_score(y_test, y_pred)
-        f1_macro = f1_score(y_test, y_pred, average="macro")
-        f1_weighted = f1_score(y_test, y_pred, average="weighted")
-        cm = confusion_matrix(y_test, y_pred).tolist()
-        cv_scores = cross_val_score(model, X, y_encoded, cv=5, scoring="accuracy")
-
-        print(f"   Accuracy: {acc:.4f} | CV: {cv_scores.mean():.4f}")
-
-        # --- Handle Feature Importance ---
-        if hasattr(model, 'feature_importances_'):
-            importances = model.feature_importances_
-        elif hasattr(model, 'estimators_'):
-            # Average importances from RF and GB
-            importances = np.mean([
-                est.feature_importances_ for est in model.estimators_
-            ], axis=0)
+    hybrid_name = "HybridEnsemble (RF+GB)"
+    member_keys = {"RandomForest": "rf", "GradientBoosting": "gb"}
+
+    # Same splits as cross_val_score(cv=5) and learning_curve(cv=5)
+    folds = list(StratifiedKFold(n_splits=CV_FOLDS).split(X, y_encoded))
+    n_max = len(folds[0][0])
+    train_sizes = np.unique(np.clip((LEARNING_CURVE_SIZES * n_max).astype(int), 1, n_max))
+
+    workers = jobs or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=setup_plot_style if plots else None)
+    with pool:
+        rendered = []
+
+        def render(plot, *args):
+            rendered.append(pool.submit(_render, plot, *args))
+
+        if plots:
+            # ---- Plots 1-2: Risk Distribution, Feature Correlation ----
+            print("\n🎨 Generating plots in the background...")
+            render(plot_risk_distribution, df, "risk_distribution.png")
+            render(plot_feature_correlation, df, FEATURE_COLS, "feature_correlation.png")
+
+        # ---- Fit: final models, CV folds and learning-curve subsets ----
+        with timer("fit"):
+            print(f"\n🏋️  Fitting {', '.join(members)} on {workers} worker(s)...")
+            final = {name: pool.submit(_fit, clone(model), X_train, y_train) for name, model in members.items()}
+            cv_folds = {
+                name: [pool.submit(_fit_fold, clone(model), X, y_encoded, train, test) for train, test in folds]
+                for name, model in members.items()
+            }
+            # The full-size point of the learning curve is the CV fold itself
+            curve = {}
+            if plots:
+                curve = {
+                    (name, size): [pool.submit(_fit_fold, clone(model), X, y_encoded, train[:size], test)
+                                   for train, test in folds]
+                    for name, model in members.items() for size in train_sizes[:-1]
+                }
+            fitted = {name: future.result() for name, future in final.items()}
+            cv_folds = {name: [f.result() for f in futures] for name, futures in cv_folds.items()}
+            curve = {key: [f.result() for f in futures] for key, futures in curve.items()}
+
+        with timer("ensemble"):
+            hybrid = assemble_voting(
+                {member_keys[name]: model for name, model in fitted.items()}, y_train
+            )
+            models = {**fitted, hybrid_name: hybrid}
+
+        # ---- Evaluate ----
+        with timer("evaluate"):
+            results = {}
+            importances_dict = {}
+            test_scores = {}
+            confusion_plots = {}
+            best_model_name = None
+            best_accuracy = 0
+
+            for name, model in models.items():
+                print(f"\nEvaluating: {name}")
+                test_scores[name] = model.predict_proba(X_test)
+                y_pred = model.classes_[np.argmax(test_scores[name], axis=1)]
+
+                acc = accuracy_score(y_test, y_pred)
+                f1_macro = f1_score(y_test, y_pred, average="macro")
+                f1_weighted = f1_score(y_test, y_pred, average="weighted")
+                cm = confusion_matrix(y_test, y_pred).tolist()
+                voters = list(members) if name == hybrid_name else [name]
+                cv_scores = np.array([
+                    _soft_vote_accuracy([(cv_folds[m][i][0], cv_folds[m][i][2]) for m in voters], y_encoded[test])
+                    for i, (_, test) in enumerate(folds)
+                ])
+
+                print(f"   Accuracy: {acc:.4f} | CV: {cv_scores.mean():.4f}")
+
+                # --- Handle Feature Importance ---
+                if hasattr(model, 'feature_importances_'):
+                    importances = model.feature_importances_
+                elif hasattr(model, 'estimators_'):
+                    # Average importances from RF and GB
+                    importances = np.mean([
+                        est.feature_importances_ for est in model.estimators_
+                    ], axis=0)
+                else:
+                    importances = np.zeros(len(FEATURE_COLS))
+
+                importances_dict[name] = importances
+
+                # Feature importance log
+                print(f"\n🔍 Feature Importance:")
+                sorted_idx = np.argsort(importances)[::-1]
+                for idx in sorted_idx:
+                    bar = "█" * int(importances[idx] * 40)
+                    print(f"   {FEATURE_COLS[idx]:30s} {importances[idx]:.4f}  {bar}")
+
+                results[name] = {
+                    "accuracy": round(acc, 4),
+                    "f1_macro": round(f1_macro, 4),
+                    "f1_weighted": round(f1_weighted, 4),
+                    "cv_accuracy_mean": round(cv_scores.mean(), 4),
+                    "cv_accuracy_std": round(cv_scores.std(), 4),
+                    "confusion_matrix": cm,
+                    "feature_importance": {
+                        FEATURE_COLS[i]: round(float(importances[i]), 4)
+                        for i in sorted_idx
+                    },
+                }
+
+                # Confusion matrix per model; the hybrid shares "gb" and, as
+                # the last model, is the one that ends up in that file
+                cm_filename = f"confusion_matrix_{'rf' if 'Random' in name else 'gb'}.png"
+                confusion_plots[cm_filename] = (y_test, y_pred, class_names, name, cm_filename)
+
+                if acc > best_accuracy or "Hybrid" in name:
+                    best_accuracy = acc
+                    best_model_name = name
+
+        if plots:
+            with timer("plots"):
+                for args in confusion_plots.values():
+                    render(plot_confusion_matrix, *args)
+
+                # ---- Plot 3: Feature Importance Comparison ----
+                render(plot_feature_importance_comparison, importances_dict, np.array(FEATURE_COLS),
+                       "feature_importance_comparison.png")
+
+                # ---- Plot 4: Model Accuracy Comparison ----
+                render(plot_model_comparison, results, "model_accuracy_comparison.png")
+
+                # ---- Plot 5: ROC Curves ----
+                render(plot_roc_curves, test_scores, y_test, class_names, "roc_curves.png")
+
+                # ---- Plot 6: Precision-Recall Curves ----
+                render(plot_precision_recall_curves, test_scores, y_test, class_names, "pr_curves.png")
+
+                # ---- Plot 7: Learning Curves (hybrid, from the member fits) ----
+                def fold_scores(size):
+                    runs = cv_folds if size == n_max else {m: curve[(m, size)] for m in members}
+                    train_acc, test_acc = [], []
+                    for i, (train, test) in enumerate(folds):
+                        scored = [runs[m][i] for m in members]
+                        train_acc.append(_soft_vote_accuracy([(c, p) for c, p, _ in scored], y_encoded[train[:size]]))
+                        test_acc.append(_soft_vote_accuracy([(c, p) for c, _, p in scored], y_encoded[test]))
+                    return train_acc, test_acc
+
+                curve_scores = [fold_scores(size) for size in train_sizes]
+                render(plot_learning_curves, train_sizes,
+                       np.array([s[0] for s in curve_scores]), np.array([s[1] for s in curve_scores]),
+                       "learning_curves.png")
+
+                plots_generated = [future.result() for future in rendered]
         else:
-            importances = np.zeros(len(FEATURE_COLS))
-            
-        importances_dict[name] = importances
-
-        # Feature importance log
-        print(f"\n🔍 Feature Importance:")
-        sorted_idx = np.argsort(importances)[::-1]
-        for idx in sorted_idx:
-            bar = "█" * int(importances[idx] * 40)
-            print(f"   {FEATURE_COLS[idx]:30s} {importances[idx]:.4f}  {bar}")
-
-        results[name] = {
-            "accuracy": round(acc, 4),
-            "f1_macro": round(f1_macro, 4),
-            "f1_weighted": round(f1_weighted, 4),
-            "cv_accuracy_mean": round(cv_scores.mean(), 4),
-            "cv_accuracy_std": round(cv_scores.std(), 4),
-            "confusion_matrix": cm,
-            "feature_importance": {
-                FEATURE_COLS[i]: round(float(importances[i]), 4)
-                for i in sorted_idx
-            },
-        }
-
-        # Plot confusion matrix per model
-        cm_filename = f"confusion_matrix_{'rf' if 'Random' in name else 'gb'}.png"
-        plot_confusion_matrix(y_test, y_pred, class_names, name, cm_filename)
-
-        if acc > best_accuracy or "Hybrid" in name:
-            best_accuracy = acc
-            best_model_name = name
-
-    # ---- Plot 3: Feature Importance Comparison ----
-    plot_feature_importance_comparison(importances_dict, np.array(FEATURE_COLS),
-                                       "feature_importance_comparison.png")
-
-    # ---- Plot 4: Model Accuracy Comparison ----
-    plot_model_comparison(results, "model_accuracy_comparison.png")
-
-    # ---- Plot 5: ROC Curves ----
-    plot_roc_curves(models, X_test, y_test, class_names, encoder, "roc_curves.png")
-
-    # ---- Plot 6: Precision-Recall Curves ----
-    plot_precision_recall_curves(models, X_test, y_test, class_names, "pr_curves.png")
-
-    # ---- Plot 7: Learning Curves ----
-    print("\n📈 Calculating learning curves (this may take a moment)...")
-    plot_learning_curves(hybrid_ensemble, X, y_encoded, "learning_curves.png")
+            plots_generated = []
 
     # ---- Save Best Model ----
-    print(f"\n{'=' * 60}")
-    print(f"🏆 BEST MODEL: {best_model_name} (Accuracy: {best_accuracy:.4f})")
-    print(f"{'=' * 60}")
-
-    best_model = models[best_model_name]
-    joblib.dump(best_model, MODEL_PATH)
-    joblib.dump(encoder, ENCODER_PATH)
-    print(f"   💾 Model  → {MODEL_PATH}")
-    print(f"   💾 Encoder → {ENCODER_PATH}")
-
-    # ---- Save Metrics ----
-    metrics = {
-        "best_model": best_model_name,
-        "best_accuracy": best_accuracy,
-        "dataset_size": len(df),
-        "train_size": len(X_train),
-        "test_size": len(X_test),
-        "features": FEATURE_COLS,
-        "engineered_features": ["ph_deviation", "rain_contam_interaction",
-                                 "cases_per_contam", "severity_score"],
-        "class_labels": class_names,
-        "results": results,
-        "plots_generated": [
-            "confusion_matrix_rf.png",
-            "confusion_matrix_gb.png",
-            "feature_importance_comparison.png",
-            "model_accuracy_comparison.png",
-            "risk_distribution.png",
-            "feature_correlation.png",
-            "roc_curves.png",
-            "pr_curves.png",
-            "learning_curves.png",
-        ],
-    }
+    with timer("save"):
+        print(f"\n{'=' * 60}")
+        print(f"🏆 BEST MODEL: {best_model_name} (Accuracy: {best_accuracy:.4f})")
+        print(f"{'=' * 60}")
+
+        best_model = models[best_model_name]
+        for model in getattr(best_model, "estimators_", [best_model]):
+            if "n_jobs" in model.get_params():
+                model.set_params(n_jobs=-1)
+        joblib.dump(best_model, MODEL_PATH)
+        joblib.dump(encoder, ENCODER_PATH)
+        print(f"   💾 Model  → {MODEL_PATH}")
+        print(f"   💾 Encoder → {ENCODER_PATH}")
+
+        # ---- Save Metrics ----
+        metrics = {
+            "best_model": best_model_name,
+            "best_accuracy": best_accuracy,
+            "dataset_size": len(df),
+            "train_size": len(X_train),
+            "test_size": len(X_test),
+            "features": FEATURE_COLS,
+            "engineered_features": ["ph_deviation", "rain_contam_interaction",
+                                     "cases_per_contam", "severity_score"],
+            "class_labels": class_names,
+            "results": results,
+            "plots_generated": [name for name in PLOT_FILES if name in plots_generated],
+        }
+
+        with open(METRICS_PATH, "w") as f:
+            json.dump(metrics, f, indent=2)
+        print(f"   📊 Metrics → {METRICS_PATH}")
+        if plots:
+            print(f"\n   🎨 All plots saved to: {PLOTS_DIR}")
 
-    with open(METRICS_PATH, "w") as f:
-        json.dump(metrics, f, indent=2)
-    print(f"   📊 Metrics → {METRICS_PATH}")
-    print(f"\n   🎨 All plots saved to: {PLOTS_DIR}")
+    timer.report()
     print(f"\n✅ Training complete!")
 
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train and compare the AquaSentinel risk models.")
+    parser.add_argument("--no-plots", action="store_true",
+                        help="only write the model, encoder and metrics (skips plots and learning curves)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="worker processes for fitting and plotting (default: one per CPU)")
+    args = parser.parse_args()
+    train(plots=not args.no_plots, jobs=args.jobs)
@@ -2,10 +2,11 @@
 SQLAlchemy ORM models for AquaSentinel AI.
 Defines the Prediction and Alert tables.
 """
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.utils.database import Base
+from app.services.recommendation import render_recommendation
 
 
 class Prediction(Base):
@@ -21,13 +22,31 @@ class Prediction(Base):
     severity = Column(String, nullable=True)              # CRITICAL / HIGH / WARNING / INFO
     trend = Column(String, nullable=True)                 # RISING / STABLE / FALLING
     confidence = Column(Float, nullable=True)
-    recommendation = Column(String, nullable=True)
+    recommendation = Column(String, nullable=True)        # Free text; NULL when coded
+    recommendation_code = Column(Integer, nullable=True)  # Template registry code
     location = Column(String, nullable=True, default="Unknown")
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     # One prediction may trigger one alert
     alert = relationship("Alert", back_populates="prediction", uselist=False)
 
+    @property
+    def rendered_recommendation(self):
+        """Recommendation text, rendered from the template registry for coded rows."""
+        if self.recommendation_code is not None:
+            return render_recommendation(self.recommendation_code)
+        return self.recommendation
+
+    __table_args__ = (
+        # Trend lookups: WHERE location = ? ORDER BY created_at DESC LIMIT n
+        Index("ix_predictions_location_created_at", "location", "created_at"),
+        # Newest-first listings and time-range filters
+        Index("ix_predictions_created_at", "created_at"),
+        # Filtered keyset pages: WHERE <col> = ? ORDER BY created_at DESC, id DESC
+        Index("ix_predictions_risk_level_created_at", "risk_level", "created_at"),
+        Index("ix_predictions_severity_created_at", "severity", "created_at"),
+    )
+
 
 class Alert(Base):
     """Auto-generated alert when risk_level is HIGH."""
@@ -41,3 +60,14 @@ class Alert(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     prediction = relationship("Prediction", back_populates="alert")
+
+    __table_args__ = (
+        # Active/resolved counts and filtered newest-first listings
+        Index("ix_alerts_is_resolved_created_at", "is_resolved", "created_at"),
+        # Newest-first listings
+        Index("ix_alerts_created_at", "created_at"),
+        # Severity-filtered keyset pages
+        Index("ix_alerts_severity_created_at", "severity", "created_at"),
+        # Pulse sync joins alerts to predictions
+        Index("ix_alerts_prediction_id", "prediction_id"),
+    )
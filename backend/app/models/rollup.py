@@ -0,0 +1,44 @@
+"""
+SQLAlchemy ORM models for time-bucketed prediction rollups.
+One row per (location, bucket) at hourly and daily granularity, maintained
+incrementally by app.services.rollup_service.
+"""
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index
+from app.utils.database import Base
+
+
+class _RollupColumns:
+    """Counts per risk level / severity plus sum and max of every input feature."""
+    location = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)   # Bucket start, naive UTC
+    n = Column(Integer, nullable=False, default=0)
+
+    risk_low = Column(Integer, nullable=False, default=0)
+    risk_medium = Column(Integer, nullable=False, default=0)
+    risk_high = Column(Integer, nullable=False, default=0)
+
+    severity_critical = Column(Integer, nullable=False, default=0)
+    severity_high = Column(Integer, nullable=False, default=0)
+    severity_warning = Column(Integer, nullable=False, default=0)
+    severity_info = Column(Integer, nullable=False, default=0)
+
+    # Means are served as sum / n
+    rainfall_sum = Column(Float, nullable=False, default=0.0)
+    rainfall_max = Column(Float, nullable=True)
+    ph_level_sum = Column(Float, nullable=False, default=0.0)
+    ph_level_max = Column(Float, nullable=True)
+    contamination_sum = Column(Float, nullable=False, default=0.0)
+    contamination_max = Column(Float, nullable=True)
+    cases_count_sum = Column(Float, nullable=False, default=0.0)
+    cases_count_max = Column(Float, nullable=True)
+
+
+class HourlyRollup(_RollupColumns, Base):
+    __tablename__ = "rollups_hourly"
+    # All-locations range scans: WHERE bucket BETWEEN ? AND ? GROUP BY bucket
+    __table_args__ = (Index("ix_rollups_hourly_bucket", "bucket"),)
+
+
+class DailyRollup(_RollupColumns, Base):
+    __tablename__ = "rollups_daily"
+    __table_args__ = (Index("ix_rollups_daily_bucket", "bucket"),)
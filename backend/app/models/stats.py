@@ -0,0 +1,22 @@
+"""
+SQLAlchemy ORM models for the materialized dashboard statistics.
+Maintained incrementally by app.services.stats_service on every flush.
+"""
+from sqlalchemy import Column, Integer, Float, String, Date
+from app.utils.database import Base
+
+
+class StatsCounter(Base):
+    """One running total per key (e.g. ``total_predictions``, ``risk:high``, ``confidence_sum``)."""
+    __tablename__ = "stats_counters"
+
+    key = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+
+
+class StatsDaily(Base):
+    """Predictions created per UTC day (serves ``predictions_today``)."""
+    __tablename__ = "stats_daily"
+
+    day = Column(Date, primary_key=True)
+    predictions = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,46 @@
+"""
+Server-side analytics over the hourly/daily prediction rollups.
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.database import get_async_db
+from app.services.rollup_service import rollup_aggregator, GRANULARITIES
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get("/timeseries")
+async def get_timeseries(
+    granularity: str = Query("day", description="hour | day"),
+    location: Optional[str] = Query(None, description="Omit to merge all locations"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    points: Optional[int] = Query(None, ge=3, le=10_000, description="Downsample (LTTB) to this many points"),
+    metric: str = Query("n", description="Series that drives downsampling, e.g. n, risk_high, rainfall_mean"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Prediction counts per risk level and severity plus mean/max of every input
+    feature, per hour or day, read from the rollup tables.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    stmt = rollup_aggregator.timeseries_statement(granularity, location, since, until)
+    series = rollup_aggregator.to_points((await db.execute(stmt)).all())
+    if series and metric not in series[0]:
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{metric}'")
+
+    sampled = rollup_aggregator.downsample(series, metric, points)
+    return {
+        "granularity": granularity,
+        "location": location,
+        "metric": metric,
+        "source_points": len(series),
+        "downsampled": len(sampled) < len(series),
+        "points": sampled,
+    }
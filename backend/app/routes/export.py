@@ -0,0 +1,87 @@
+"""
+Bulk export of predictions and alerts: streamed downloads and background jobs.
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.services.export_service import exporter, available_formats, DATASETS, FORMATS
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+def _filters(dataset: str, since, until, location, risk_level, severity, resolved) -> dict:
+    filters = {"since": since, "until": until, "severity": severity.upper() if severity else None}
+    if dataset == "predictions":
+        filters.update(location=location, risk_level=risk_level.lower() if risk_level else None)
+    else:
+        filters["is_resolved"] = resolved
+    return filters
+
+
+def _check(dataset: str, format: str):
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{dataset}'")
+    if format not in available_formats():
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(available_formats())}")
+
+
+@router.get("/{dataset}")
+def export_stream(
+    dataset: str,
+    format: str = Query("csv", description="csv | ndjson | parquet"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    location: Optional[str] = Query(None, description="predictions only"),
+    risk_level: Optional[str] = Query(None, description="predictions only"),
+    severity: Optional[str] = None,
+    resolved: Optional[bool] = Query(None, description="alerts only"),
+):
+    """
+    Stream every matching row (archived history included), oldest first,
+    as ``predictions`` or ``alerts`` in CSV, NDJSON or Parquet.
+    """
+    _check(dataset, format)
+    media_type, extension = FORMATS[format]
+    body = exporter.stream(dataset, format, _filters(dataset, since, until, location, risk_level, severity, resolved))
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{dataset}.{extension}"',
+    })
+
+
+@router.post("/{dataset}/jobs", status_code=202)
+def export_job(
+    dataset: str,
+    format: str = Query("csv", description="csv | ndjson | parquet"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    location: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    severity: Optional[str] = None,
+    resolved: Optional[bool] = None,
+):
+    """Run a large export in the background; poll the job and download its file when done."""
+    _check(dataset, format)
+    job = exporter.submit(dataset, format, _filters(dataset, since, until, location, risk_level, severity, resolved))
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}")
+def export_job_status(job_id: str):
+    job = exporter.job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job '{job_id}' not found")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/download")
+def export_job_download(job_id: str):
+    job = exporter.job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job '{job_id}' not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    media_type, extension = FORMATS[job.format]
+    return FileResponse(job.path, media_type=media_type, filename=f"{job.dataset}.{extension}")
@@ -0,0 +1,70 @@
+"""
+Prometheus scrape endpoint: per-stage latency histograms plus cache hit
+rates, queue depths and admission counters read from the live services.
+Mounted at the application root (``/metrics``), outside the API prefix.
+"""
+from fastapi import APIRouter, Response
+
+from app.utils.metrics import CONTENT_TYPE, metrics
+from app.services.admission import admission_controller
+from app.services.agent_orchestrator import orchestrator
+from app.services.artifact_cache import artifact_cache
+from app.services.idempotency import idempotency_store
+from app.services.pulse_service import pulse_service
+from app.services.risk_history import risk_history
+from app.services.weather_service import weather_service
+from app.services.write_pipeline import write_pipeline
+
+router = APIRouter(tags=["Monitoring"])
+
+# Name → object with ``hits`` / ``misses`` counters
+CACHES = {
+    "weather": weather_service.cache,
+    "artifact": artifact_cache,
+    "pulse_snapshot": pulse_service,
+    "risk_history": risk_history,
+}
+
+
+def _per_cache(attribute: str) -> dict:
+    return {(("cache", name),): getattr(cache, attribute) for name, cache in CACHES.items()}
+
+
+def _hit_ratios() -> dict:
+    ratios = {}
+    for name, cache in CACHES.items():
+        lookups = cache.hits + cache.misses
+        ratios[(("cache", name),)] = cache.hits / lookups if lookups else None
+    return ratios
+
+
+def _per_class(counts: dict) -> dict:
+    return {(("class", route_class),): n for route_class, n in counts.items()}
+
+
+metrics.counter("cache_hits_total", "Lookups answered from the cache.", lambda: _per_cache("hits"))
+metrics.counter("cache_misses_total", "Lookups that missed the cache.", lambda: _per_cache("misses"))
+metrics.gauge("cache_hit_ratio", "Hits / lookups since start.", _hit_ratios)
+metrics.gauge("queue_depth", "Work waiting in each queue.", lambda: {
+    (("queue", "write_pipeline"),): write_pipeline.queue_depth,
+    (("queue", "admission_pool"),): admission_controller.pool.waiting,
+    (("queue", "admission_heavy"),): admission_controller.heavy.waiting,
+})
+metrics.gauge("requests_in_flight", "API requests holding an admission slot.",
+              lambda: admission_controller.pool.active)
+metrics.counter("admission_admitted_total", "Requests admitted per route class.",
+                lambda: _per_class(admission_controller.admitted))
+metrics.counter("admission_rejected_total", "Requests rejected (429/503) per route class.",
+                lambda: _per_class(admission_controller.rejected))
+metrics.counter("write_pipeline_batches_total", "Group commits written.", lambda: write_pipeline.batches)
+metrics.counter("write_pipeline_rows_total", "Predictions written by group commits.", lambda: write_pipeline.rows)
+metrics.counter("idempotent_replays_total", "Responses replayed for a repeated Idempotency-Key.",
+                lambda: idempotency_store.replays + idempotency_store.coalesced)
+metrics.gauge("idempotency_keys", "Idempotency keys currently stored.", lambda: len(idempotency_store))
+metrics.counter("llm_fallbacks_total", "Decisions served from static advice instead of the LLM.",
+                lambda: orchestrator.decide_agent.fallbacks)
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
@@ -3,25 +3,41 @@ API routes for AquaSentinel AI predictions, alerts, stats, and model metrics.
 """
 import os
 import json
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
 
-from app.utils.database import get_db
+from app.utils.database import get_db, get_async_db
+from app.utils.pagination import decode_cursor, NEXT_CURSOR_HEADER
+from app.utils.conditional import is_not_modified, not_modified, validator_headers
+from app.services.artifact_cache import artifact_cache
+from app.services.idempotency import idempotency_store, request_fingerprint, StoredResponse
+from app.utils.serialization import (
+    available_formats, encode_document, encode_rows, negotiate, MSGPACK, ARROW,
+)
 from app.schemas.prediction import (
     PredictionInput, PredictionOutput, AlertOutput,
     BatchPredictionInput, BatchPredictionOutput,
     StatsOutput, ModelMetricsOutput,
 )
 from app.services.prediction_service import (
-    create_prediction,
+    create_prediction_async,
+    create_predictions_bulk,
     get_prediction_by_id,
-    get_all_predictions,
-    get_all_alerts,
+    get_prediction_rows_page_async,
+    get_alert_rows_page_async,
+    prediction_values,
+    PREDICTION_FIELDS,
+    ALERT_FIELDS,
     resolve_alert,
-    get_stats,
+    get_stats_async,
+    get_stats_etag_async,
 )
+from app.services.ingest_service import stream_ingestor, to_ndjson, FORMATS as INGEST_FORMATS
 
 router = APIRouter()
 
@@ -31,66 +47,196 @@ METRICS_PATH = os.path.join(ML_DIR, "metrics.json")
 PLOTS_DIR = os.path.join(ML_DIR, "plots")
 
 
+# Alternative encodings advertised in OpenAPI next to the JSON schema
+_TABLE_RESPONSES = {200: {"content": {MSGPACK: {}, ARROW: {}}}}
+_DOCUMENT_RESPONSES = {200: {"content": {MSGPACK: {}}}}
+
+
+def _negotiated(request: Request, tabular: bool = True) -> str:
+    """Response media type for the request's Accept header (406 if none can be produced)."""
+    formats = available_formats(tabular)
+    media_type = negotiate(request.headers.get("accept"), formats)
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f"Supported formats: {', '.join(formats)}")
+    return media_type
+
+
+def _rows_response(request: Request, fields, rows, next_cursor: Optional[str]) -> Response:
+    """Encode a listing page directly, bypassing per-row response-model validation."""
+    media_type = _negotiated(request)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(encode_rows(fields, rows, media_type), media_type=media_type, headers=headers)
+
+
+async def _idempotent(request: Request, key: str, handler) -> Response:
+    """Run ``handler`` once per Idempotency-Key for this route; repeats replay its response."""
+    fingerprint = request_fingerprint(request.method, request.url.path, await request.body())
+    return await idempotency_store.respond(request.url.path, key, fingerprint, handler)
+
+
 # ======================== PREDICTIONS ========================
 
 @router.post("/predict", response_model=PredictionOutput, tags=["Predictions"])
-def predict(data: PredictionInput, db: Session = Depends(get_db)):
+async def predict(
+    data: PredictionInput,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
     """
     Submit environmental data and receive a waterborne disease risk prediction.
     Automatically generates an alert if risk is HIGH.
+
+    With an ``Idempotency-Key`` header, a retry with the same key and body
+    returns the original response instead of predicting (and saving) again.
     """
-    try:
-        prediction = create_prediction(
-            db=db,
-            rainfall=data.rainfall,
-            ph_level=data.ph_level,
-            contamination=data.contamination,
-            cases_count=data.cases_count,
-            location=data.location or "Unknown",
-        )
-        return prediction
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
-
-
-@router.post("/predict/batch", response_model=BatchPredictionOutput, tags=["Predictions"])
-def predict_batch(data: BatchPredictionInput, db: Session = Depends(get_db)):
-    """
-    Submit multiple predictions at once (max 50).
-    Returns results for each entry along with success/failure counts.
-    """
-    results = []
-    errors = []
-
-    for idx, entry in enumerate(data.predictions):
+    async def run():
         try:
-            prediction = create_prediction(
+            return await create_prediction_async(
                 db=db,
-                rainfall=entry.rainfall,
-                ph_level=entry.ph_level,
-                contamination=entry.contamination,
-                cases_count=entry.cases_count,
-                location=entry.location or "Unknown",
+                rainfall=data.rainfall,
+                ph_level=data.ph_level,
+                contamination=data.contamination,
+                cases_count=data.cases_count,
+                location=data.location or "Unknown",
             )
-            results.append(prediction)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=500, detail=str(e))
         except Exception as e:
-            errors.append({"index": idx, "error": str(e), "input": entry.model_dump()})
-
-    return BatchPredictionOutput(
-        total=len(data.predictions),
-        successful=len(results),
-        failed=len(errors),
-        predictions=results,
-        errors=errors,
-    )
+            raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+    if idempotency_key is None:
+        return await run()
+
+    async def stored():
+        prediction = await run()
+        body = PredictionOutput.model_validate(prediction).model_dump_json().encode()
+        return StoredResponse(200, body, "application/json")
 
+    return await _idempotent(request, idempotency_key, stored)
+
+
+@router.post("/predict/batch", response_model=BatchPredictionOutput, responses=_DOCUMENT_RESPONSES,
+             tags=["Predictions"])
+async def predict_batch(
+    data: BatchPredictionInput,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
+    """
+    Submit multiple predictions at once (up to BATCH_MAX_ROWS).
+    Valid rows are scored together and saved in a single transaction;
+    invalid or failing rows are reported in ``errors`` with their index.
+    A repeated ``Idempotency-Key`` replays the original response.
+    """
+    media_type = _negotiated(request, tabular=False)
+
+    async def run():
+        entries, indices, errors = [], [], []
+        for idx, row in enumerate(data.predictions):
+            try:
+                entries.append(row if isinstance(row, PredictionInput) else PredictionInput.model_validate(row))
+                indices.append(idx)
+            except ValidationError as e:
+                errors.append({"index": idx, "error": str(e), "input": row})
+
+        results = []
+        if entries:
+            try:
+                results, row_errors = await create_predictions_bulk(db, entries)
+            except FileNotFoundError as e:
+                raise HTTPException(status_code=500, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+            for err in row_errors:
+                err["index"] = indices[err["index"]]
+            errors = sorted(errors + row_errors, key=lambda err: err["index"])
+
+        # Rows were just written and are fully loaded: encode them as they are
+        body = {
+            "total": len(data.predictions),
+            "successful": len(results),
+            "failed": len(errors),
+            "predictions": [dict(zip(PREDICTION_FIELDS, prediction_values(p))) for p in results],
+            "errors": errors,
+        }
+        return StoredResponse(200, encode_document(body, media_type), media_type)
+
+    if idempotency_key is None:
+        return (await run()).to_response()
+    return await _idempotent(request, idempotency_key, run)
+
+
+class _UploadProgressResponse(StreamingResponse):
+    """
+    Streams progress while the request body is still being read.
+
+    The stock StreamingResponse (below ASGI spec 2.4) runs a disconnect
+    listener on ``receive`` next to the body iterator; here the body reader
+    *is* the response iterator, so the listener would steal upload chunks.
+    This response pumps body reads and progress sends on one task and owns
+    ``receive`` alone; a client disconnect surfaces via ``request.stream()``.
+    """
 
-@router.get("/predictions", response_model=List[PredictionOutput], tags=["Predictions"])
-def list_predictions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Retrieve all past predictions, ordered newest first."""
-    return get_all_predictions(db, skip=skip, limit=limit)
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+@router.post("/predict/ingest", tags=["Predictions"])
+async def predict_ingest(request: Request, format: Optional[str] = None):
+    """
+    Stream an NDJSON or CSV body of any size (e.g. a season backfill).
+    Rows are scored and saved in chunks of INGEST_CHUNK_ROWS, one transaction
+    per chunk; the response streams one NDJSON progress record per chunk
+    (with per-line errors) and a final ``{"done": true}`` summary.
+
+    The format comes from ``?format=ndjson|csv`` or the Content-Type
+    (``text/csv`` → CSV, anything else → NDJSON). CSV needs a header row.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    if format not in INGEST_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'")
+
+    records = stream_ingestor.ingest(request.stream(), format)
+    return _UploadProgressResponse(to_ndjson(records), media_type="application/x-ndjson")
+
+
+def _decode_cursor_param(cursor: Optional[str]):
+    try:
+        return decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/predictions", response_model=List[PredictionOutput], responses=_TABLE_RESPONSES,
+            tags=["Predictions"])
+async def list_predictions(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; prefer cursor"),
+    location: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    severity: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Retrieve past predictions, newest first, optionally filtered.
+    Pages are keyset-paginated on (created_at, id): when more rows follow, the
+    ``X-Next-Cursor`` response header carries the token for the next page.
+    Send ``Accept: application/msgpack`` or ``application/vnd.apache.arrow.stream``
+    for a binary encoding of the same records.
+    """
+    rows, next_cursor = await get_prediction_rows_page_async(
+        db, limit, _decode_cursor_param(cursor), skip=skip, location=location,
+        risk_level=risk_level, severity=severity, since=since, until=until,
+    )
+    return _rows_response(request, PREDICTION_FIELDS, rows, next_cursor)
 
 
 @router.get("/predictions/{prediction_id}", response_model=PredictionOutput, tags=["Predictions"])
@@ -104,10 +250,24 @@ def get_prediction(prediction_id: int, db: Session = Depends(get_db)):
 
 # ======================== ALERTS ========================
 
-@router.get("/alerts", response_model=List[AlertOutput], tags=["Alerts"])
-def list_alerts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Retrieve all alerts, ordered newest first."""
-    return get_all_alerts(db, skip=skip, limit=limit)
+@router.get("/alerts", response_model=List[AlertOutput], responses=_TABLE_RESPONSES, tags=["Alerts"])
+async def list_alerts(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; prefer cursor"),
+    resolved: Optional[bool] = None,
+    severity: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Retrieve alerts, newest first, optionally filtered (keyset-paginated like /predictions)."""
+    rows, next_cursor = await get_alert_rows_page_async(
+        db, limit, _decode_cursor_param(cursor), skip=skip, is_resolved=resolved,
+        severity=severity, since=since, until=until,
+    )
+    return _rows_response(request, ALERT_FIELDS, rows, next_cursor)
 
 
 @router.patch("/alerts/{alert_id}/resolve", response_model=AlertOutput, tags=["Alerts"])
@@ -122,35 +282,52 @@ def resolve_alert_endpoint(alert_id: int, db: Session = Depends(get_db)):
 # ======================== STATS ========================
 
 @router.get("/stats", response_model=StatsOutput, tags=["Dashboard"])
-def dashboard_stats(db: Session = Depends(get_db)):
+async def dashboard_stats(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Get summary statistics for the dashboard:
     total predictions, alerts, risk distribution, avg confidence, etc.
+    The ETag follows the stats generation (bumped by every write), so an
+    unchanged summary is answered with 304 after a single key lookup.
     """
-    return get_stats(db)
+    headers = validator_headers(await get_stats_etag_async(db))
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return await get_stats_async(db)
 
 
 # ======================== MODEL METRICS ========================
 
+def _metrics_body(data: bytes) -> bytes:
+    """Validated response body for a metrics.json file (built once per file version)."""
+    metrics = json.loads(data)
+    # Map 'plots_generated' → 'plots_available' for the schema
+    metrics["plots_available"] = metrics.pop("plots_generated", [])
+    return ModelMetricsOutput.model_validate(metrics).model_dump_json().encode()
+
+
+def _artifact_response(request: Request, artifact, media_type: str) -> Response:
+    headers = validator_headers(artifact.etag, artifact.last_modified)
+    if is_not_modified(request, artifact.etag, artifact.last_modified):
+        return not_modified(headers)
+    return Response(artifact.value, media_type=media_type, headers=headers)
+
+
 @router.get("/model/metrics", response_model=ModelMetricsOutput, tags=["Model"])
-def model_metrics():
+def model_metrics(request: Request):
     """
     Serve the ML model evaluation metrics (accuracy, F1, confusion matrix,
     feature importance) from the latest training run.
+    Cached in memory until metrics.json changes; supports If-None-Match / If-Modified-Since.
     """
-    if not os.path.exists(METRICS_PATH):
+    artifact = artifact_cache.get(METRICS_PATH, _metrics_body)
+    if artifact is None:
         raise HTTPException(status_code=404, detail="Metrics not found. Run training first.")
-
-    with open(METRICS_PATH, "r") as f:
-        metrics = json.load(f)
-
-    # Map 'plots_generated' → 'plots_available' for the schema
-    metrics["plots_available"] = metrics.pop("plots_generated", [])
-    return metrics
+    return _artifact_response(request, artifact, "application/json")
 
 
 @router.get("/model/plots/{plot_name}", tags=["Model"])
-def model_plot(plot_name: str):
+def model_plot(plot_name: str, request: Request):
     """
     Serve a specific ML training plot image by filename.
     Example: /model/plots/confusion_matrix_rf.png
@@ -164,8 +341,7 @@ def model_plot(plot_name: str):
     if plot_name not in allowed_plots:
         raise HTTPException(status_code=404, detail=f"Plot '{plot_name}' not found")
 
-    plot_path = os.path.join(PLOTS_DIR, plot_name)
-    if not os.path.exists(plot_path):
+    artifact = artifact_cache.get(os.path.join(PLOTS_DIR, plot_name))
+    if artifact is None:
         raise HTTPException(status_code=404, detail=f"Plot file '{plot_name}' not generated yet")
-
-    return FileResponse(plot_path, media_type="image/png")
+    return _artifact_response(request, artifact, "image/png")
@@ -1,26 +1,52 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from app.services.weather_service import weather_service
 from app.services.pulse_service import pulse_service
+from app.services.medical_service import medical_service
+from app.utils.conditional import is_not_modified, not_modified, validator_headers
 
 router = APIRouter(prefix="/realtime", tags=["Government Data"])
 
 @router.get("/weather")
-async def get_coimbatore_weather():
-    """Get live weather data for Coimbatore."""
+async def get_coimbatore_weather(lat: Optional[float] = Query(default=None, ge=-90, le=90),
+                                 lon: Optional[float] = Query(default=None, ge=-180, le=180)):
+    """
+    Get live weather data for Coimbatore, or for the grid cell at lat/lon if given.
+    Points outside the district's bounding box are rejected.
+    """
+    if lat is not None and lon is not None and not weather_service.in_district(lat, lon):
+        raise HTTPException(status_code=422, detail="lat/lon must lie inside the Coimbatore district")
     try:
-        data = await weather_service.get_current_weather()
+        if lat is not None and lon is not None:
+            data = await weather_service.get_weather_at(lat, lon)
+        else:
+            data = await weather_service.get_current_weather()
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/pulse")
-async def get_territory_pulse():
+async def get_territory_pulse(request: Request):
     """
     Get live AI diagnostics for all Coimbatore wards.
     Automates weather, medical, and sensor data ingestion.
+    Served from a short-lived snapshot; revalidate with If-None-Match for a 304.
     """
     try:
-        data = await pulse_service.get_territory_pulse()
-        return data
+        snapshot = await pulse_service.snapshot()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    headers = validator_headers(snapshot.etag, snapshot.last_modified)
+    if is_not_modified(request, snapshot.etag, snapshot.last_modified):
+        return not_modified(headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+@router.get("/medical")
+def get_ward_case_history(ward: str, start: Optional[date] = None, end: Optional[date] = None):
+    """Daily reported case counts for a ward over an optional date range."""
+    return {
+        "ward": ward,
+        "summary": medical_service.get_ward_records(ward),
+        "history": medical_service.get_case_history(ward, start, end),
+    }
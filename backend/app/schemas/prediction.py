@@ -2,10 +2,12 @@
 Pydantic schemas for request/response validation.
 Updated to Pydantic v2 standards.
 """
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict, Any
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 
+from app.core.config import settings
+
 
 # --- Prediction Schemas ---
 
@@ -41,7 +43,10 @@ class PredictionOutput(BaseModel):
     severity: Optional[str] = "INFO"      # CRITICAL / HIGH / WARNING / INFO
     trend: Optional[str] = "STABLE"       # RISING / STABLE / FALLING
     confidence: Optional[float]
-    recommendation: Optional[str]
+    # Coded rows render their template text here, at serialization time
+    recommendation: Optional[str] = Field(
+        default=None, validation_alias=AliasChoices("rendered_recommendation", "recommendation")
+    )
     location: Optional[str]
     created_at: datetime
 
@@ -65,10 +70,15 @@ class AlertOutput(BaseModel):
 # --- Batch Prediction Schemas ---
 
 class BatchPredictionInput(BaseModel):
-    """Input for batch predictions — a list of entries."""
-    predictions: List[PredictionInput] = Field(
-        ..., min_length=1, max_length=50,
-        description="List of prediction inputs (max 50)"
+    """
+    Input for batch predictions — a list of entries shaped like PredictionInput.
+    Entries are validated one by one so an invalid row is reported in
+    ``errors`` instead of rejecting the whole batch: a row that does not fit
+    ``PredictionInput`` is kept as a plain object and re-validated in the route.
+    """
+    predictions: List[Union[PredictionInput, Dict[str, Any]]] = Field(
+        ..., min_length=1, max_length=settings.BATCH_MAX_ROWS,
+        description=f"List of prediction inputs (max {settings.BATCH_MAX_ROWS})"
     )
 
     model_config = ConfigDict(
@@ -0,0 +1,216 @@
+"""
+Admission control for the API: cost-aware rate limits, concurrency caps and
+capacity reserved for ingestion.
+
+Every API request takes a slot from a shared pool of
+``ADMISSION_MAX_CONCURRENT``. The last ``ADMISSION_RESERVED_INGEST`` slots
+are usable only by the ingestion routes (``/predict``, ``/predict/batch``,
+``/predict/ingest``), so a burst of anything else cannot starve alert
+ingestion.
+
+The heavy routes (agent analysis and simulation) also go through a token
+bucket charged by route cost (``ADMISSION_HEAVY_RATE`` cost units per
+second, bursts up to ``ADMISSION_HEAVY_BURST``) and their own concurrency
+cap of ``ADMISSION_HEAVY_CONCURRENCY``. The territory pulse is a default
+route: it is served from a shared snapshot (or a 304), and recomputed at most
+once per ``PULSE_SNAPSHOT_SECONDS`` however many dashboards poll it.
+
+A request that finds the bucket empty gets 429 immediately. One that finds
+no free slot waits up to ``ADMISSION_QUEUE_TIMEOUT_SECONDS`` (at most
+``ADMISSION_MAX_QUEUE`` waiters per limit) and then gets 503, with its
+tokens refunded. Both responses carry ``Retry-After``.
+"""
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+INGEST = "ingest"
+HEAVY = "heavy"
+DEFAULT = "default"
+
+INGEST_ROUTES = ("/predict", "/predict/batch", "/predict/ingest")
+# Route → cost in token-bucket units (a simulation runs many model passes)
+HEAVY_ROUTES = {"/agent/simulate": 5.0, "/agent/analyze": 2.0}
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, retry_after: float, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+    def to_response(self) -> JSONResponse:
+        return JSONResponse(
+            {"detail": self.detail}, status_code=self.status_code,
+            headers={"Retry-After": str(max(1, math.ceil(self.retry_after)))},
+        )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """Take ``cost`` tokens; returns 0, or the seconds until they would be available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def refund(self, cost: float):
+        """Return tokens taken by a request that was rejected afterwards."""
+        self.tokens = min(self.burst, self.tokens + cost)
+
+
+class ConcurrencyLimit:
+    """
+    Up to ``limit`` holders; the last ``reserved`` slots only for privileged
+    acquirers. Waiters are woken on every release and recheck.
+    """
+
+    def __init__(self, limit: int, reserved: int = 0, max_queue: int = 32):
+        self.limit = limit
+        self.reserved = min(reserved, limit)
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: List[asyncio.Future] = []
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _free(self, privileged: bool) -> bool:
+        return self.active < self.limit - (0 if privileged else self.reserved)
+
+    async def acquire(self, timeout: float, privileged: bool = False) -> bool:
+        if not self._free(privileged):
+            if len(self._waiters) >= self.max_queue:
+                return False
+            deadline = time.monotonic() + timeout
+            loop = asyncio.get_running_loop()
+            while not self._free(privileged):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+                try:
+                    await asyncio.wait_for(waiter, remaining)
+                except asyncio.TimeoutError:
+                    return False
+                finally:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class AdmissionController:
+    """Classifies API paths and admits, queues or rejects requests per class."""
+
+    def __init__(self, prefix: str = "", enabled: bool = True, max_concurrent: int = 64,
+                 reserved_ingest: int = 16, heavy_concurrency: int = 4, heavy_rate: float = 2.0,
+                 heavy_burst: float = 10.0, queue_timeout: float = 2.0, max_queue: int = 32):
+        self.prefix = prefix
+        self.enabled = enabled
+        self.queue_timeout = queue_timeout
+        self.pool = ConcurrencyLimit(max_concurrent, reserved=reserved_ingest, max_queue=max_queue)
+        self.heavy = ConcurrencyLimit(heavy_concurrency, max_queue=max_queue)
+        self.bucket = TokenBucket(heavy_rate, heavy_burst)
+        self.admitted: Dict[str, int] = {INGEST: 0, HEAVY: 0, DEFAULT: 0}
+        self.rejected: Dict[str, int] = {INGEST: 0, HEAVY: 0, DEFAULT: 0}
+
+    def classify(self, path: str) -> Tuple[Optional[str], float]:
+        """(route class, cost) for a request path; class None for paths outside the API."""
+        if not path.startswith(self.prefix):
+            return None, 0.0
+        route = path[len(self.prefix):].rstrip("/") or "/"
+        if route in INGEST_ROUTES:
+            return INGEST, 0.0
+        if route in HEAVY_ROUTES:
+            return HEAVY, HEAVY_ROUTES[route]
+        return DEFAULT, 0.0
+
+    async def admit(self, route_class: str, cost: float):
+        """Take the slots for one request or raise ``Rejected``; pair with ``release``."""
+        deadline = time.monotonic() + self.queue_timeout
+        if route_class == HEAVY:
+            wait = self.bucket.take(cost)
+            if wait:
+                self.rejected[HEAVY] += 1
+                raise Rejected(429, wait, "Too many analysis requests, retry later")
+            if not await self.heavy.acquire(self.queue_timeout):
+                self.bucket.refund(cost)
+                self.rejected[HEAVY] += 1
+                raise Rejected(503, self.queue_timeout, "Analysis capacity exhausted, retry later")
+        if not await self.pool.acquire(deadline - time.monotonic(), privileged=route_class == INGEST):
+            if route_class == HEAVY:
+                self.heavy.release()
+                self.bucket.refund(cost)
+            self.rejected[route_class] += 1
+            raise Rejected(503, self.queue_timeout, "Server busy, retry later")
+        self.admitted[route_class] += 1
+
+    def release(self, route_class: str):
+        self.pool.release()
+        if route_class == HEAVY:
+            self.heavy.release()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding a request's slots until its response is complete."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller or admission_controller
+        if scope["type"] != "http" or not controller.enabled or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        route_class, cost = controller.classify(scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await controller.admit(route_class, cost)
+        except Rejected as e:
+            await e.to_response()(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(route_class)
+
+
+admission_controller = AdmissionController(
+    prefix=settings.API_V1_STR,
+    enabled=settings.ADMISSION_ENABLED,
+    max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+    reserved_ingest=settings.ADMISSION_RESERVED_INGEST,
+    heavy_concurrency=settings.ADMISSION_HEAVY_CONCURRENCY,
+    heavy_rate=settings.ADMISSION_HEAVY_RATE,
+    heavy_burst=settings.ADMISSION_HEAVY_BURST,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+)
@@ -1,35 +1,104 @@
-from app.agents.prediction_agent import PredictionAgent
-from app.agents.analysis_agent import AnalysisAgent
+import asyncio
+import logging
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
 from app.agents.decision_agent import DecisionAgent
+from app.utils.metrics import stage
+
+logger = logging.getLogger("aqua-sentinel")
+
+_PREDICTION = stage("agent.prediction", "model")
+_ANALYSIS = stage("agent.analysis")
+_DECISION = stage("agent.decision")
 
 class AgentOrchestrator:
     """
     Coordination layer for the Multi-Agent system.
     Predicts -> Analyzes -> Decides.
+
+    The prediction and analysis agents (model load, SHAP explainer) are built
+    on first use or by ``warmup()``, which ``lifespan`` starts in the
+    background, so importing this module stays cheap.
     """
     def __init__(self):
-        self.predict_agent = PredictionAgent()
-        # Initialize analysis agent with prediction agent's model to share memory
-        self.analyze_agent = AnalysisAgent(model=self.predict_agent.model)
+        self._predict_agent = None
+        self._analyze_agent = None
+        self._init_lock = threading.Lock()
         self.decide_agent = DecisionAgent()
+        self.warmup_state = "pending"   # pending / running / done / failed
+
+    def warm(self):
+        """Build the prediction and analysis agents (blocking; idempotent)."""
+        if self._analyze_agent is not None:
+            return
+        with self._init_lock:
+            if self._analyze_agent is None:
+                from app.agents.prediction_agent import PredictionAgent
+                from app.agents.analysis_agent import AnalysisAgent
+
+                predict_agent = PredictionAgent()
+                # Initialize analysis agent with prediction agent's model to share memory
+                self._analyze_agent = AnalysisAgent(model=predict_agent.model)
+                self._predict_agent = predict_agent
+
+    @property
+    def predict_agent(self):
+        self.warm()
+        return self._predict_agent
+
+    @property
+    def analyze_agent(self):
+        self.warm()
+        return self._analyze_agent
+
+    async def warmup(self):
+        """Load the model and explainer off the event loop, then open the LLM pool."""
+        self.warmup_state = "running"
+        try:
+            await run_in_threadpool(self.warm)
+            await self.decide_agent.warm()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Agent warmup failed: {e}")
+            self.warmup_state = "failed"
+            return
+        self.warmup_state = "done"
+        logger.info(f"Agents warm ({self.readiness()})")
+
+    def readiness(self) -> dict:
+        """Warmth of each heavy resource: warm / cold / unavailable."""
+        if self._analyze_agent is None:
+            model = explainer = "cold"
+        else:
+            model = "warm" if self._predict_agent.model is not None else "unavailable"
+            explainer = "warm" if self._analyze_agent.explainer is not None else "unavailable"
+        return {"model": model, "explainer": explainer, "llm": self.decide_agent.pool_state()}
 
     async def run_workflow(self, rainfall: float, ph_level: float, 
                            contamination: float, cases_count: int) -> dict:
         """Execute the full agentic loop."""
+        if self._analyze_agent is None:
+            await run_in_threadpool(self.warm)  # don't block the loop on a cold start
         
         # 1. Prediction
-        prediction = self.predict_agent.predict(rainfall, ph_level, contamination, cases_count)
+        with _PREDICTION.time():
+            prediction = self.predict_agent.predict(rainfall, ph_level, contamination, cases_count)
         
-        # 2. Analysis
-        analysis = self.analyze_agent.analyze(prediction["raw_features"])
+        # 2. Analysis (SHAP)
+        with _ANALYSIS.time():
+            analysis = self.analyze_agent.analyze(prediction["raw_features"])
         
         # 3. Decision (GenAI)
-        decision = await self.decide_agent.decide(
-            risk_level=prediction["risk_level"],
-            confidence=prediction["confidence"],
-            top_factors=analysis["top_factors"],
-            input_data=prediction["input_data"]
-        )
+        with _DECISION.time():
+            decision = await self.decide_agent.decide(
+                risk_level=prediction["risk_level"],
+                confidence=prediction["confidence"],
+                top_factors=analysis["top_factors"],
+                input_data=prediction["input_data"]
+            )
         
         return {
             "prediction": {
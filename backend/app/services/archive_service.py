@@ -0,0 +1,397 @@
+"""
+Hot/cold tiering for predictions.
+
+Predictions older than ``ARCHIVE_RETENTION_DAYS`` move out of the database
+into one compressed columnar file per month (``predictions-YYYY-MM.npz``):
+every column is a NumPy array, and string columns (location, levels, free
+text) are dictionary-encoded as int32 codes plus the distinct values, so a
+month of history costs a few bytes per row.
+
+What stays put:
+  - Rollups and dashboard counters are lifetime totals; archival deletes with
+    Core statements, which the flush hooks never see.
+  - Alert references: an alert moves with its prediction (same file, same
+    ids), and a prediction whose alert is still open — or newer than the
+    cutoff — stays hot until the alert is resolved.
+
+``iter_predictions`` / ``iter_alerts`` merge archived months and the hot
+table into one ``created_at``-ordered stream for historical exports.
+
+    python -m app.services.archive_service archive [--days N] [--vacuum]
+    python -m app.services.archive_service export --since 2025-01-01 > history.ndjson
+"""
+import argparse
+import heapq
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import Boolean, DateTime, Integer, String, and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.prediction import Alert, Prediction
+from app.services.recommendation import render_recommendation
+from app.utils.pagination import as_utc_naive
+
+logger = logging.getLogger("aqua-sentinel")
+
+PREDICTION_COLUMNS = list(Prediction.__table__.columns)
+ALERT_COLUMNS = list(Alert.__table__.columns)
+_MONTH_FILE = re.compile(r"^predictions-(\d{4})-(\d{2})\.npz$")
+# Ids per DELETE ... WHERE id IN (...) statement
+DELETE_BATCH = 500
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    return month_start(month_start(value) + timedelta(days=32))
+
+
+# ---- Column codecs ----
+
+def _encode_column(column, values: list) -> Dict[str, np.ndarray]:
+    name, kind = column.name, column.type
+    if isinstance(kind, DateTime):
+        return {name: np.array([as_utc_naive(v) for v in values], dtype="datetime64[us]")}
+    if isinstance(kind, String):
+        index: Dict[str, int] = {}
+        codes = np.array([-1 if v is None else index.setdefault(v, len(index)) for v in values], dtype=np.int32)
+        return {f"{name}.codes": codes, f"{name}.values": np.array(list(index), dtype=str)}
+    if isinstance(kind, Boolean):
+        return {name: np.array([bool(v) for v in values], dtype=bool)}
+    if isinstance(kind, Integer):
+        if column.nullable:
+            return {name: np.array([-1 if v is None else v for v in values], dtype=np.int64),
+                    f"{name}.null": np.array([v is None for v in values], dtype=bool)}
+        return {name: np.array(values, dtype=np.int64)}
+    return {name: np.array([np.nan if v is None else v for v in values], dtype=np.float64)}
+
+
+def _decode_column(column, data, count: int, rows: Optional[np.ndarray] = None) -> list:
+    """Python values of ``column`` (optionally only at positions ``rows``)."""
+    name, kind = column.name, column.type
+    if name not in data and f"{name}.codes" not in data:
+        # Column added after the month was archived
+        return [None] * (count if rows is None else len(rows))
+    if isinstance(kind, String):
+        codes = data[f"{name}.codes"] if rows is None else data[f"{name}.codes"][rows]
+        values = data[f"{name}.values"].tolist()
+        return [None if c < 0 else values[c] for c in codes.tolist()]
+    array = data[name] if rows is None else data[name][rows]
+    values = array.tolist()
+    if f"{name}.null" in data:
+        null = (data[f"{name}.null"] if rows is None else data[f"{name}.null"][rows]).tolist()
+        return [None if n else v for v, n in zip(values, null)]
+    if isinstance(kind, (DateTime, Boolean, Integer)):
+        return values
+    return [None if v != v else v for v in values]  # NaN -> None
+
+
+def _string_code(data, name: str, value: str) -> Optional[int]:
+    """Dictionary code of ``value`` in a string column, or None if the month never saw it."""
+    hits = np.flatnonzero(data[f"{name}.values"] == value)
+    return int(hits[0]) if len(hits) else None
+
+
+class ArchiveStore:
+    """Monthly compressed columnar files of archived predictions and their alerts."""
+
+    def __init__(self, directory: str, retention_days: int = 180):
+        self.directory = directory
+        self.retention_days = retention_days
+
+    # ---- Files ----
+
+    def path_for(self, month: datetime) -> str:
+        return os.path.join(self.directory, f"predictions-{month:%Y-%m}.npz")
+
+    def months(self) -> List[datetime]:
+        """Archived months, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in os.listdir(self.directory):
+            m = _MONTH_FILE.match(name)
+            if m:
+                found.append(datetime(int(m.group(1)), int(m.group(2)), 1))
+        return sorted(found)
+
+    def _read(self, month: datetime):
+        path = self.path_for(month)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {key: data[key] for key in data.files}
+
+    def _write_month(self, month: datetime, predictions: List[dict], alerts: List[dict]):
+        """Merge rows into the month's file (ids already archived are kept once) and rewrite it atomically."""
+        existing = self._read(month)
+        if existing is not None:
+            old_predictions = self._rows(existing, PREDICTION_COLUMNS, "")
+            old_alerts = self._rows(existing, ALERT_COLUMNS, "alert.")
+            seen = {r["id"] for r in old_predictions}
+            predictions = old_predictions + [r for r in predictions if r["id"] not in seen]
+            seen = {r["id"] for r in old_alerts}
+            alerts = old_alerts + [r for r in alerts if r["id"] not in seen]
+
+        epoch = datetime(1970, 1, 1)
+        predictions.sort(key=lambda r: (r["created_at"] or epoch, r["id"]))
+        arrays = {}
+        for column in PREDICTION_COLUMNS:
+            arrays.update(_encode_column(column, [r[column.name] for r in predictions]))
+        for column in ALERT_COLUMNS:
+            encoded = _encode_column(column, [r[column.name] for r in alerts])
+            arrays.update({f"alert.{key}": value for key, value in encoded.items()})
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(month)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _rows(data, columns, prefix: str, rows: Optional[np.ndarray] = None) -> List[dict]:
+        view = {key[len(prefix):]: value for key, value in data.items() if key.startswith(prefix)} if prefix else data
+        decoded = {c.name: _decode_column(c, view, len(view["id"]), rows) for c in columns}
+        count = len(next(iter(decoded.values()))) if decoded else 0
+        return [{name: values[i] for name, values in decoded.items()} for i in range(count)]
+
+    # ---- Archival ----
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        now = as_utc_naive(now) or datetime.now(timezone.utc).replace(tzinfo=None)
+        return now - timedelta(days=self.retention_days)
+
+    @staticmethod
+    def candidates_statement(start: datetime, end: datetime, cutoff: datetime):
+        """
+        Predictions in [start, end) that may leave the hot table. Kept hot: rows
+        whose alert is unresolved or newer than ``cutoff``, and the newest
+        prediction and alert (SQLite reuses the highest rowid once it is deleted).
+        """
+        newest_prediction = select(func.max(Prediction.id)).scalar_subquery()
+        newest_alert = select(func.max(Alert.id)).scalar_subquery()
+        pinned = select(Alert.prediction_id).where(or_(
+            Alert.is_resolved.is_not(True), Alert.created_at >= cutoff, Alert.id == newest_alert,
+        ))
+        return (
+            select(*Prediction.__table__.columns)
+            .where(and_(Prediction.created_at >= start, Prediction.created_at < end))
+            .where(Prediction.id < newest_prediction)
+            .where(Prediction.id.not_in(pinned))
+        )
+
+    def archive(self, db: Session, now: Optional[datetime] = None) -> dict:
+        """
+        Move predictions older than the retention cutoff (and their resolved
+        alerts) into the monthly files. Each month is written to disk before
+        its rows are deleted and committed, so an interrupted run only leaves
+        rows that the next run archives again (the merge keeps one copy).
+        """
+        cutoff = self.cutoff(now)
+        oldest = db.execute(select(func.min(Prediction.created_at)).where(Prediction.created_at < cutoff)).scalar()
+        summary = {"cutoff": cutoff.isoformat(), "months": 0, "predictions": 0, "alerts": 0}
+        if oldest is None:
+            return summary
+
+        month = month_start(oldest)
+        while month < cutoff:
+            end = min(next_month(month), cutoff)
+            stmt = self.candidates_statement(month, end, cutoff)
+            predictions = [dict(row) for row in db.execute(stmt.execution_options(yield_per=5000)).mappings()]
+            if predictions:
+                ids = [p["id"] for p in predictions]
+                alerts = []
+                for i in range(0, len(ids), DELETE_BATCH):
+                    alerts += [dict(row) for row in db.execute(
+                        select(*Alert.__table__.columns).where(Alert.prediction_id.in_(ids[i:i + DELETE_BATCH]))
+                    ).mappings()]
+                self._write_month(month, predictions, alerts)
+
+                alert_ids = [a["id"] for a in alerts]
+                for i in range(0, len(alert_ids), DELETE_BATCH):
+                    db.execute(delete(Alert).where(Alert.id.in_(alert_ids[i:i + DELETE_BATCH])))
+                for i in range(0, len(ids), DELETE_BATCH):
+                    db.execute(delete(Prediction).where(Prediction.id.in_(ids[i:i + DELETE_BATCH])))
+                db.commit()
+
+                summary["months"] += 1
+                summary["predictions"] += len(predictions)
+                summary["alerts"] += len(alerts)
+                logger.info(f"Archived {len(predictions)} predictions, {len(alerts)} alerts to {self.path_for(month)}")
+            month = next_month(month)
+        return summary
+
+    # ---- Reading ----
+
+    def scan(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+             location: Optional[str] = None, risk_level: Optional[str] = None,
+             severity: Optional[str] = None) -> Iterator[dict]:
+        """
+        Archived prediction rows in ``created_at`` order. Months outside the
+        range are skipped by file name; filters are evaluated on the encoded
+        columns, and only matching rows are decoded.
+        """
+        since, until = as_utc_naive(since), as_utc_naive(until)
+        for month in self.months():
+            if (since is not None and next_month(month) <= since) or (until is not None and month >= until):
+                continue
+            data = self._read(month)
+            if data is None:
+                continue
+            mask = np.ones(len(data["id"]), dtype=bool)
+            if since is not None:
+                mask &= data["created_at"] >= np.datetime64(since, "us")
+            if until is not None:
+                mask &= data["created_at"] < np.datetime64(until, "us")
+            skip = False
+            for name, value in (("location", location), ("risk_level", risk_level), ("severity", severity)):
+                if value is None:
+                    continue
+                code = _string_code(data, name, value)
+                if code is None:
+                    skip = True
+                    break
+                mask &= data[f"{name}.codes"] == code
+            if skip:
+                continue
+            yield from self._rows(data, PREDICTION_COLUMNS, "", np.flatnonzero(mask))
+
+    def scan_alerts(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    severity: Optional[str] = None, is_resolved: Optional[bool] = None) -> Iterator[dict]:
+        """Archived alerts matching the filters, in ``(created_at, id)`` order within each month."""
+        since, until = as_utc_naive(since), as_utc_naive(until)
+        for month in self.months():
+            # An alert is never older than its prediction, so later months cannot match
+            if until is not None and month >= until:
+                continue
+            data = self._read(month)
+            if data is None or "alert.id" not in data:
+                continue
+            created = data["alert.created_at"]
+            mask = np.ones(len(created), dtype=bool)
+            if since is not None:
+                mask &= created >= np.datetime64(since, "us")
+            if until is not None:
+                mask &= created < np.datetime64(until, "us")
+            if is_resolved is not None:
+                mask &= data["alert.is_resolved"] == bool(is_resolved)
+            if severity is not None:
+                hits = np.flatnonzero(data["alert.severity.values"] == severity)
+                if not len(hits):
+                    continue
+                mask &= data["alert.severity.codes"] == int(hits[0])
+            rows = np.flatnonzero(mask)
+            rows = rows[np.lexsort((data["alert.id"][rows], created[rows]))]
+            yield from self._rows(data, ALERT_COLUMNS, "alert.", rows)
+
+    def alerts(self, month: datetime) -> List[dict]:
+        """Archived alerts of one month."""
+        data = self._read(month)
+        return [] if data is None else self._rows(data, ALERT_COLUMNS, "alert.")
+
+    def column_arrays(self) -> Iterator[dict]:
+        """Raw arrays of every archived month (for reconciling lifetime totals)."""
+        for month in self.months():
+            data = self._read(month)
+            if data is not None:
+                yield data
+
+
+def iter_predictions(db: Session, store: Optional["ArchiveStore"] = None,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     location: Optional[str] = None, risk_level: Optional[str] = None,
+                     severity: Optional[str] = None) -> Iterator[dict]:
+    """
+    Every prediction matching the filters — archived and hot — as one stream
+    of column dicts ordered by ``(created_at, id)``, with coded
+    recommendations rendered.
+    """
+    store = store or archive_store
+    stmt = select(*Prediction.__table__.columns)
+    if since is not None:
+        stmt = stmt.where(Prediction.created_at >= as_utc_naive(since))
+    if until is not None:
+        stmt = stmt.where(Prediction.created_at < as_utc_naive(until))
+    if location is not None:
+        stmt = stmt.where(Prediction.location == location)
+    if risk_level is not None:
+        stmt = stmt.where(Prediction.risk_level == risk_level)
+    if severity is not None:
+        stmt = stmt.where(Prediction.severity == severity)
+    stmt = stmt.order_by(Prediction.created_at, Prediction.id).execution_options(yield_per=5000)
+
+    hot = (dict(row) for row in db.execute(stmt).mappings())
+    cold = store.scan(since, until, location, risk_level, severity)
+    epoch = datetime(1970, 1, 1)
+    for row in heapq.merge(cold, hot, key=lambda r: (r["created_at"] or epoch, r["id"])):
+        if row["recommendation_code"] is not None:
+            row["recommendation"] = render_recommendation(row["recommendation_code"])
+        yield row
+
+
+def iter_alerts(db: Session, store: Optional["ArchiveStore"] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                severity: Optional[str] = None, is_resolved: Optional[bool] = None) -> Iterator[dict]:
+    """Every alert matching the filters — archived and hot — ordered by ``(created_at, id)``."""
+    store = store or archive_store
+    stmt = select(*Alert.__table__.columns)
+    if since is not None:
+        stmt = stmt.where(Alert.created_at >= as_utc_naive(since))
+    if until is not None:
+        stmt = stmt.where(Alert.created_at < as_utc_naive(until))
+    if severity is not None:
+        stmt = stmt.where(Alert.severity == severity)
+    if is_resolved is not None:
+        stmt = stmt.where(Alert.is_resolved == is_resolved)
+    stmt = stmt.order_by(Alert.created_at, Alert.id).execution_options(yield_per=5000)
+
+    hot = (dict(row) for row in db.execute(stmt).mappings())
+    cold = store.scan_alerts(since, until, severity, is_resolved)
+    epoch = datetime(1970, 1, 1)
+    yield from heapq.merge(cold, hot, key=lambda r: (r["created_at"] or epoch, r["id"]))
+
+
+archive_store = ArchiveStore(settings.abs_archive_dir, retention_days=settings.ARCHIVE_RETENTION_DAYS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AquaSentinel prediction archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+    archive_cmd = sub.add_parser("archive", help="Move predictions past retention into monthly archive files")
+    archive_cmd.add_argument("--days", type=int, default=None, help="Retention in days (default: ARCHIVE_RETENTION_DAYS)")
+    archive_cmd.add_argument("--vacuum", action="store_true", help="Compact the database file afterwards")
+    export_cmd = sub.add_parser("export", help="Write archived + hot predictions as NDJSON to stdout")
+    export_cmd.add_argument("--since", type=datetime.fromisoformat, default=None)
+    export_cmd.add_argument("--until", type=datetime.fromisoformat, default=None)
+    export_cmd.add_argument("--location", default=None)
+    args = parser.parse_args()
+
+    from app.utils.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    if args.command == "archive":
+        if args.days is not None:
+            archive_store.retention_days = args.days
+        with SessionLocal() as db:
+            print(archive_store.archive(db))
+        if args.vacuum and engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                conn.exec_driver_sql("VACUUM")
+    elif args.command == "export":
+        with SessionLocal() as db:
+            for row in iter_predictions(db, since=args.since, until=args.until, location=args.location):
+                print(json.dumps(row, default=str))
+
+
+if __name__ == "__main__":
+    main()
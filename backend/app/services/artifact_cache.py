@@ -0,0 +1,69 @@
+"""
+In-memory cache of training artifacts (metrics.json, plot PNGs).
+
+Entries are keyed on path and validated on every read against the file's
+``(mtime_ns, size)`` — one ``stat`` call — so a retrain is picked up on the
+next request while unchanged files are never re-read or re-parsed. Each
+entry carries a strong content ETag and the file's mtime for Last-Modified.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from app.utils.conditional import strong_etag
+
+
+class Artifact:
+    __slots__ = ("value", "etag", "last_modified", "signature")
+
+    def __init__(self, value: Any, etag: str, last_modified: float, signature: tuple):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.signature = signature
+
+
+class ArtifactCache:
+    """LRU of parsed file contents, revalidated by mtime and size."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, loader: Callable[[bytes], Any] = bytes) -> Optional[Artifact]:
+        """The artifact at ``path`` (``loader`` applied to its bytes), or None if the file is missing."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+
+        with open(path, "rb") as f:
+            data = f.read()
+        entry = Artifact(loader(data), strong_etag(data), st.st_mtime, signature)
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+artifact_cache = ArtifactCache()
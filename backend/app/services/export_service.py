@@ -0,0 +1,248 @@
+"""
+Streaming bulk export of predictions and alerts (CSV, NDJSON, Parquet).
+
+Rows come from ``iter_predictions`` / ``iter_alerts`` — the hot table read
+through a server-side cursor merged with the archive files — and are encoded
+``EXPORT_CHUNK_ROWS`` at a time, so memory stays at one chunk (plus one
+archived month) however long the history, and the first bytes leave as soon
+as the first chunk is read.
+
+Large extracts can run as background jobs instead: the same stream is
+written to a file under ``EXPORT_DIR`` and downloaded when the job is done.
+Parquet needs the optional ``pyarrow`` package.
+"""
+import csv
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+from app.core.config import settings
+from app.models.prediction import Alert, Prediction
+from app.services.archive_service import iter_alerts, iter_predictions
+from app.services.prediction_service import ALERT_FIELDS, PREDICTION_FIELDS
+from app.utils.database import SessionLocal
+from app.utils.serialization import dumps_json
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger("aqua-sentinel")
+
+DATASETS = {"predictions": (Prediction, PREDICTION_FIELDS), "alerts": (Alert, ALERT_FIELDS)}
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in FORMATS if fmt != "parquet" or pyarrow is not None]
+
+
+def _parquet_schema(model, fields):
+    types = []
+    for name in fields:
+        kind = model.__table__.columns[name].type
+        if isinstance(kind, DateTime):
+            types.append(pyarrow.timestamp("us"))
+        elif isinstance(kind, Boolean):
+            types.append(pyarrow.bool_())
+        elif isinstance(kind, Integer):
+            types.append(pyarrow.int64())
+        elif isinstance(kind, Float):
+            types.append(pyarrow.float64())
+        else:
+            types.append(pyarrow.string())
+    return pyarrow.schema(list(zip(fields, types)))
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every row group."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class ExportJob:
+    __slots__ = ("id", "dataset", "format", "filters", "status", "rows", "error",
+                 "path", "created_at", "finished_at")
+
+    def __init__(self, dataset: str, fmt: str, filters: dict, directory: str):
+        self.id = uuid.uuid4().hex
+        self.dataset = dataset
+        self.format = fmt
+        self.filters = filters
+        self.status = "queued"          # queued / running / done / failed
+        self.rows = 0
+        self.error: Optional[str] = None
+        self.path = os.path.join(directory, f"{dataset}-{self.id}.{FORMATS[fmt][1]}")
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id, "dataset": self.dataset, "format": self.format, "status": self.status,
+            "rows": self.rows, "error": self.error,
+            "created_at": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat(),
+            "finished_at": datetime.fromtimestamp(self.finished_at, timezone.utc).isoformat()
+            if self.finished_at else None,
+        }
+
+
+class Exporter:
+    """Chunked export streams and the background jobs that write them to files."""
+
+    def __init__(self, session_factory=SessionLocal, chunk_rows: int = 5000, directory: str = "exports",
+                 job_ttl: float = 86400.0, max_workers: int = 2):
+        self.session_factory = session_factory
+        self.chunk_rows = max(1, chunk_rows)
+        self.directory = directory
+        self.job_ttl = job_ttl
+        self.max_workers = max_workers
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ---- Streams ----
+
+    def _records(self, db, dataset: str, filters: dict) -> Iterator[dict]:
+        if dataset == "predictions":
+            return iter_predictions(db, **filters)
+        return iter_alerts(db, **filters)
+
+    def chunks(self, dataset: str, filters: dict) -> Iterator[List[tuple]]:
+        """Lists of up to ``chunk_rows`` field tuples, read through one session."""
+        _, fields = DATASETS[dataset]
+        with self.session_factory() as db:
+            rows = (tuple(record[f] for f in fields) for record in self._records(db, dataset, filters))
+            while True:
+                chunk = list(islice(rows, self.chunk_rows))
+                if not chunk:
+                    return
+                yield chunk
+
+    def stream(self, dataset: str, fmt: str, filters: dict, counter: Optional[list] = None) -> Iterator[bytes]:
+        """Encoded export body, one piece per chunk. ``counter[0]`` accumulates the row count."""
+        model, fields = DATASETS[dataset]
+        if fmt == "parquet":
+            schema = _parquet_schema(model, fields)
+            sink = _Sink()
+            with pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd") as writer:
+                for chunk in self.chunks(dataset, filters):
+                    columns = list(zip(*chunk))
+                    writer.write_table(pyarrow.table(
+                        [pyarrow.array(list(col), type=t) for col, t in zip(columns, schema.types)], schema=schema
+                    ))
+                    if counter is not None:
+                        counter[0] += len(chunk)
+                    yield sink.drain()
+            yield sink.drain()  # footer
+            return
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            yield buffer.getvalue().encode()
+        for chunk in self.chunks(dataset, filters):
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(
+                    [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in chunk
+                )
+                piece = buffer.getvalue().encode()
+            else:
+                piece = b"".join(dumps_json(dict(zip(fields, row))) + b"\n" for row in chunk)
+            if counter is not None:
+                counter[0] += len(chunk)
+            yield piece
+
+    # ---- Background jobs ----
+
+    def submit(self, dataset: str, fmt: str, filters: dict) -> ExportJob:
+        """Queue an export to a file; returns immediately."""
+        self._prune()
+        os.makedirs(self.directory, exist_ok=True)
+        job = ExportJob(dataset, fmt, filters, self.directory)
+        with self._lock:
+            self._jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="export")
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: ExportJob):
+        job.status = "running"
+        tmp_path = f"{job.path}.part"
+        counter = [0]
+        try:
+            with open(tmp_path, "wb") as f:
+                for piece in self.stream(job.dataset, job.format, job.filters, counter):
+                    f.write(piece)
+                    job.rows = counter[0]
+            os.replace(tmp_path, job.path)
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Export job {job.id} failed: {e}")
+            job.status, job.error = "failed", str(e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            job.finished_at = time.time()
+
+    def job(self, job_id: str) -> Optional[ExportJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        """Forget finished jobs (and delete their files) older than ``job_ttl``."""
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [j for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]
+            for j in expired:
+                del self._jobs[j.id]
+        for j in expired:
+            if os.path.exists(j.path):
+                os.remove(j.path)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+exporter = Exporter(
+    chunk_rows=settings.EXPORT_CHUNK_ROWS,
+    directory=settings.abs_export_dir,
+    job_ttl=settings.EXPORT_JOB_TTL_SECONDS,
+)
@@ -0,0 +1,127 @@
+"""
+``Idempotency-Key`` support for ingestion endpoints.
+
+Field gateways retry ``/predict`` on timeouts. With a key, the first request
+runs and its response (status, body, media type) is kept for
+``IDEMPOTENCY_TTL_SECONDS``; repeats of the same key replay it without
+running the model or writing again, and carry ``Idempotent-Replayed: true``.
+Duplicates arriving while the first is still running wait for its result
+instead of running in parallel.
+
+A key reused with a different request body is rejected with 422. Failures
+(exceptions, 5xx) are not stored, so a retry after a failure runs again.
+The store is per process, bounded to ``IDEMPOTENCY_MAX_KEYS`` (oldest keys
+are evicted first).
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+from app.core.config import settings
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256(method.encode() + b" " + path.encode() + b"\n")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class StoredResponse:
+    __slots__ = ("status_code", "body", "media_type")
+
+    def __init__(self, status_code: int, body: bytes, media_type: str):
+        self.status_code = status_code
+        self.body = body
+        self.media_type = media_type
+
+    def to_response(self, replayed: bool = False) -> Response:
+        headers = {REPLAYED_HEADER: "true"} if replayed else None
+        return Response(self.body, status_code=self.status_code, media_type=self.media_type, headers=headers)
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "future", "response", "expires")
+
+    def __init__(self, fingerprint: str, future: asyncio.Future, expires: float):
+        self.fingerprint = fingerprint
+        self.future = future
+        self.response: Optional[StoredResponse] = None
+        self.expires = expires
+
+
+class IdempotencyStore:
+    """Bounded, TTL-evicted map of (scope, key) → stored response or in-flight future."""
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 86400.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        # Counters for observability
+        self.replays = 0
+        self.coalesced = 0
+
+    async def respond(self, scope: str, key: str, fingerprint: str,
+                      handler: Callable[[], Awaitable[StoredResponse]]) -> Response:
+        """Run ``handler`` once per (scope, key); replay its response for repeats."""
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._entries.get((scope, key))
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+            if entry.response is not None:
+                self.replays += 1
+                return entry.response.to_response(replayed=True)
+            self.coalesced += 1
+            stored = await asyncio.shield(entry.future)
+            return stored.to_response(replayed=True)
+
+        entry = _Entry(fingerprint, asyncio.get_running_loop().create_future(), now + self.ttl)
+        self._entries[(scope, key)] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        try:
+            stored = await handler()
+        except BaseException as e:
+            self._forget(scope, key, entry)
+            if isinstance(e, asyncio.CancelledError):
+                entry.future.cancel()
+            else:
+                entry.future.set_exception(e)
+                entry.future.exception()  # retrieved: waiters re-raise it, nobody else needs to
+            raise
+
+        if stored.status_code >= 500:
+            self._forget(scope, key, entry)
+        else:
+            entry.response = stored
+        entry.future.set_result(stored)
+        return stored.to_response()
+
+    def _forget(self, scope: str, key: str, entry: _Entry):
+        if self._entries.get((scope, key)) is entry:
+            del self._entries[(scope, key)]
+
+    def _expire(self, now: float):
+        # Entries are inserted in expiry order (constant TTL)
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires > now:
+                break
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCY_MAX_KEYS,
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+)
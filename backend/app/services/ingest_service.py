@@ -0,0 +1,174 @@
+"""
+Streaming bulk ingest for historic and sensor backfills.
+
+An NDJSON or CSV body of any size is parsed incrementally off the request
+stream, validated and scored in fixed-size chunks (``INGEST_CHUNK_ROWS``)
+through the bulk prediction path, and each chunk is written in its own
+transaction. Progress is reported per chunk as NDJSON while the upload is
+still being read; the next chunk is only read once the previous one is
+durable, so memory stays bounded by one chunk regardless of upload size.
+"""
+import csv
+import json
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.prediction import PredictionInput
+from app.services.prediction_service import create_predictions_bulk
+from app.utils.database import AsyncSessionLocal
+
+FORMATS = ("ndjson", "csv")
+
+# Yielded by iter_lines() in place of a line longer than the limit
+OVERSIZED = object()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[object]:
+    """
+    Split a byte stream into lines (without the newline) holding at most one
+    partial line in memory. A line over ``max_line_bytes`` is skipped and
+    reported as :data:`OVERSIZED` so line numbering stays intact.
+    """
+    buf = bytearray()
+    skipping = False
+    async for piece in chunks:
+        start = 0
+        while True:
+            nl = piece.find(b"\n", start)
+            end = len(piece) if nl < 0 else nl
+            if not skipping:
+                buf += piece[start:end]
+                if len(buf) > max_line_bytes:
+                    buf.clear()
+                    skipping = True
+            if nl < 0:
+                break
+            if skipping:
+                skipping = False
+                yield OVERSIZED
+            else:
+                yield bytes(buf).rstrip(b"\r")
+                buf.clear()
+            start = nl + 1
+    if skipping:
+        yield OVERSIZED
+    elif buf:
+        yield bytes(buf).rstrip(b"\r")
+
+
+class RowParser:
+    """Turns raw lines into dicts for ``PredictionInput``; CSV takes its header from the first line."""
+
+    def __init__(self, fmt: str):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported ingest format '{fmt}' (expected one of {', '.join(FORMATS)})")
+        self.fmt = fmt
+        self.header: Optional[List[str]] = None
+
+    def parse(self, line: bytes) -> Optional[dict]:
+        """Row dict, or None for a line that carries no row (blank / CSV header)."""
+        text = line.decode("utf-8").strip()
+        if not text:
+            return None
+        if self.fmt == "ndjson":
+            row = json.loads(text)
+            if not isinstance(row, dict):
+                raise ValueError("Expected a JSON object per line")
+            return row
+        values = next(csv.reader([text]))
+        if self.header is None:
+            self.header = [h.strip() for h in values]
+            return None
+        if len(values) != len(self.header):
+            raise ValueError(f"Expected {len(self.header)} columns, got {len(values)}")
+        return {k: v for k, v in zip(self.header, values) if v != ""}
+
+
+class StreamIngestor:
+    """Chunked validate → score → write loop that yields one progress record per chunk."""
+
+    def __init__(self, session_factory=AsyncSessionLocal, chunk_rows: int = 2000,
+                 max_line_bytes: int = 65536, max_errors_per_chunk: int = 20):
+        self.session_factory = session_factory
+        self.chunk_rows = max(1, chunk_rows)
+        self.max_line_bytes = max_line_bytes
+        self.max_errors_per_chunk = max_errors_per_chunk
+
+    async def ingest(self, body: AsyncIterator[bytes], fmt: str) -> AsyncIterator[dict]:
+        """
+        Consume ``body`` and yield ``{"chunk": ...}`` progress records followed
+        by a final ``{"done": true, ...}`` summary. Line numbers are 1-based.
+        """
+        parser = RowParser(fmt)
+        started = time.perf_counter()
+        totals = {"rows": 0, "accepted": 0, "failed": 0, "chunks": 0}
+        entries: List[Tuple[int, PredictionInput]] = []
+        errors: List[dict] = []
+        line_no = 0
+
+        async for line in iter_lines(body, self.max_line_bytes):
+            line_no += 1
+            if line is OVERSIZED:
+                errors.append({"line": line_no, "error": f"Line exceeds {self.max_line_bytes} bytes"})
+            else:
+                try:
+                    raw = parser.parse(line)
+                    if raw is not None:
+                        entries.append((line_no, PredictionInput.model_validate(raw)))
+                except (ValueError, ValidationError, UnicodeDecodeError) as e:
+                    errors.append({"line": line_no, "error": str(e)})
+            if len(entries) + len(errors) >= self.chunk_rows:
+                yield await self._flush(entries, errors, totals)
+                entries, errors = [], []
+
+        if entries or errors:
+            yield await self._flush(entries, errors, totals)
+        yield {"done": True, **totals, "seconds": round(time.perf_counter() - started, 3)}
+
+    async def _flush(self, entries: List[Tuple[int, PredictionInput]], errors: List[dict], totals: dict) -> dict:
+        """Score and write one chunk in a single transaction; returns its progress record."""
+        chunk_started = time.perf_counter()
+        accepted = 0
+        if entries:
+            lines = [line for line, _ in entries]
+            try:
+                async with self.session_factory() as db:
+                    predictions, row_errors = await create_predictions_bulk(db, [e for _, e in entries])
+                accepted = len(predictions)
+                errors.extend({"line": lines[err["index"]], "error": err["error"]} for err in row_errors)
+            except Exception as e:
+                # The chunk's transaction rolled back: every row in it failed
+                errors.extend({"line": line, "error": f"Chunk write failed: {e}"} for line in lines)
+        errors.sort(key=lambda err: err["line"])
+
+        totals["chunks"] += 1
+        totals["rows"] += accepted + len(errors)
+        totals["accepted"] += accepted
+        totals["failed"] += len(errors)
+        return {
+            "chunk": totals["chunks"],
+            "rows": accepted + len(errors),
+            "accepted": accepted,
+            "failed": len(errors),
+            "errors": errors[: self.max_errors_per_chunk],
+            "errors_truncated": len(errors) > self.max_errors_per_chunk,
+            "ms": round((time.perf_counter() - chunk_started) * 1000, 1),
+        }
+
+
+def to_ndjson(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode progress records as an NDJSON byte stream."""
+    async def encode():
+        async for record in records:
+            yield (json.dumps(record) + "\n").encode("utf-8")
+    return encode()
+
+
+stream_ingestor = StreamIngestor(
+    chunk_rows=settings.INGEST_CHUNK_ROWS,
+    max_line_bytes=settings.INGEST_MAX_LINE_BYTES,
+    max_errors_per_chunk=settings.INGEST_MAX_ERRORS_PER_CHUNK,
+)
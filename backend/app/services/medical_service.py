@@ -1,6 +1,8 @@
 import random
 import hashlib
 import logging
+from functools import lru_cache
+from app.services.medical_store import medical_store
 
 logger = logging.getLogger("aqua-sentinel")
 
@@ -16,38 +18,94 @@ WARD_NAMES = [
     "Zone Alpha (Flood Risk)", "Zone Beta (Toxic Spill)", "Zone Gamma (Outbreak)"
 ]
 
+# Ward centroids (lat, lon) — kept in sync with WARD_COORDS in frontend MapView.jsx
+WARD_COORDS = {
+    "RS Puram, Coimbatore": (11.0318, 76.9408),
+    "Gandhipuram, Coimbatore": (11.0268, 76.9658),
+    "Peelamedu, Coimbatore": (11.0268, 76.9958),
+    "Saravanampatti, Coimbatore": (11.0768, 76.9958),
+    "Singanallur, Coimbatore": (11.0068, 77.0058),
+    "Vadavalli, Coimbatore": (11.0268, 76.9058),
+    "Thudiyalur, Coimbatore": (11.0768, 76.9458),
+    "Kurichi, Coimbatore": (10.9468, 76.9658),
+    "Podanur, Coimbatore": (10.9668, 76.9858),
+    "Kuniyamuthur, Coimbatore": (10.9868, 76.9358),
+    "Ramanathapuram, Coimbatore": (11.0418, 76.9758),
+    "Saibaba Colony, Coimbatore": (11.0168, 76.9558),
+    "Race Course, Coimbatore": (11.0068, 76.9558),
+    "Ganapathy, Coimbatore": (11.0518, 76.9658),
+    "Koundampalayam, Coimbatore": (11.0568, 76.9358),
+    "Periyanaickenpalayam, Coimbatore": (11.0868, 76.9258),
+    "Sulur, Coimbatore": (11.0368, 77.0458),
+    "Pollachi, Coimbatore": (10.6618, 77.0108),
+    "Mettupalayam, Coimbatore": (11.2968, 76.9358),
+    "Karamadai, Coimbatore": (11.0968, 76.8758),
+    "Annur, Coimbatore": (11.2368, 77.1058),
+    "Zone Alpha (Flood Risk)": (11.0568, 77.0158),
+    "Zone Beta (Toxic Spill)": (10.9868, 76.9658),
+    "Zone Gamma (Outbreak)": (11.0268, 76.9358),
+}
+
+# Coimbatore city centre, used when a ward has no known centroid
+DEFAULT_COORDS = (11.0168, 76.9558)
+
+@lru_cache(maxsize=1024)
+def _simulated_records(ward_name: str) -> dict:
+    """Deterministic mock records for wards without ingested data."""
+    # Seed based on ward name for deterministic results
+    seed = int(hashlib.md5(ward_name.encode()).hexdigest(), 16) % (2**32)
+    rng = random.Random(seed)
+
+    base_cases = rng.randint(5, 25)
+    if any(hotspot in ward_name for hotspot in ["Gandhipuram", "Singanallur", "Podanur"]):
+        base_cases += rng.randint(20, 40)
+
+    return {
+        "historical_cases": base_cases,
+        "active_outbreaks": 1 if base_cases > 40 else 0,
+        "last_monitored": "2024-05-20",
+        "source": "simulated",
+    }
+
+
 class MedicalService:
     """
     🏥 Automated Medical Records Service
     Provides historical disease records for Coimbatore wards.
-    Simulates a government health database integration.
+    Serves ingested case-count exports from the medical records store and
+    falls back to a simulated government health database for other wards.
     """
-    
-    def __init__(self):
-        # Initializing some "stable" mock data to simulate real records
-        self._cache = {}
+
+    def __init__(self, store=medical_store):
+        self.store = store
 
     def get_ward_records(self, ward_name: str) -> dict:
         """Fetch medical records/case counts for a specific territory."""
-        if ward_name not in self._cache:
-            # Seed based on ward name for deterministic results
-            seed = int(hashlib.md5(ward_name.encode()).hexdigest(), 16) % (2**32)
-            rng = random.Random(seed)
-            
-            base_cases = rng.randint(5, 25)
-            if any(hotspot in ward_name for hotspot in ["Gandhipuram", "Singanallur", "Podanur"]):
-                base_cases += rng.randint(20, 40)
-            
-            self._cache[ward_name] = {
-                "historical_cases": base_cases,
-                "active_outbreaks": 1 if base_cases > 40 else 0,
-                "last_monitored": "2024-05-20"
-            }
-        
-        return self._cache[ward_name]
+        recent = self.store.get_recent(ward_name)
+        if recent is None:
+            return _simulated_records(ward_name)
+
+        cases = recent["recent_cases"]
+        return {
+            "historical_cases": cases,
+            "active_outbreaks": 1 if cases > 40 else 0,
+            "last_monitored": recent["last_reported"],
+            "window_days": recent["window_days"],
+            # True when the ward's last report predates the window ending today
+            "stale": recent["stale"],
+            "source": "records",
+        }
+
+    def get_case_history(self, ward_name: str, start=None, end=None) -> list:
+        """Daily case counts for a ward over a date range (indexed lookup)."""
+        return self.store.get_range(ward_name, start, end)
 
     def get_all_territories(self) -> list:
         """Returns the list of all monitored Coimbatore wards."""
         return WARD_NAMES
 
+    def get_ward_coordinates(self, ward_name: str) -> tuple:
+        """Returns the (lat, lon) centroid of a ward."""
+        return WARD_COORDS.get(ward_name, DEFAULT_COORDS)
+
 medical_service = MedicalService()
@@ -0,0 +1,298 @@
+"""
+On-disk store for real ward × date case-count exports.
+
+Rows live in a dedicated SQLite file as a ``WITHOUT ROWID`` table clustered on
+``(ward_id, day)``, so a ward's history is contiguous on disk and range
+lookups are a single index seek. Days are stored as proleptic ordinals and
+ward names are interned into a small dictionary table, which keeps each row
+to three integers.
+
+A ``recent_cases`` table holds the precomputed per-ward aggregate the pulse
+needs — cases reported in the ``recent_days`` ending *today* (``as_of_day``),
+plus each ward's last reported day — rebuilt with one grouped query after
+each ingest and mirrored in memory, so the pulse reads it in O(1) per ward.
+A ward whose exports stopped before the window reports 0 recent cases and
+an old ``last_reported``; it does not resurface old counts as current.
+
+The mirror follows the file: ingests usually run in a separate process, so
+reads re-check the database file's signature (mtime/size of the file and its
+WAL) every ``reload_interval`` seconds and reload when it changed or the day
+rolled over.
+
+Usage:
+    python -m app.services.medical_store ingest exports/cases_2023.csv [...]
+    python -m app.services.medical_store refresh
+"""
+import argparse
+import csv
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger("aqua-sentinel")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wards (
+    ward_id INTEGER PRIMARY KEY,
+    name    TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS case_counts (
+    ward_id INTEGER NOT NULL,
+    day     INTEGER NOT NULL,
+    cases   INTEGER NOT NULL,
+    PRIMARY KEY (ward_id, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_case_counts_day ON case_counts (day);
+CREATE TABLE IF NOT EXISTS recent_cases (
+    ward_id      INTEGER PRIMARY KEY,
+    last_day     INTEGER NOT NULL,
+    recent_cases INTEGER NOT NULL,
+    window_days  INTEGER NOT NULL,
+    as_of_day    INTEGER NOT NULL
+);
+"""
+
+# Per-ward last reported day and cases in the window (as_of - window, as_of]
+_RECENT_SELECT = """
+SELECT ward_id, MAX(day),
+       COALESCE(SUM(CASE WHEN day > :as_of - :window AND day <= :as_of THEN cases END), 0),
+       :window, :as_of
+FROM case_counts
+GROUP BY ward_id
+"""
+
+
+class MedicalRecordStore:
+    """Bulk-loadable, indexed case-count store with an O(1) recent aggregate."""
+
+    def __init__(self, path: str, recent_days: int = 7, chunk_size: int = 50_000,
+                 reload_interval: float = 5.0):
+        self.path = path
+        self.recent_days = recent_days
+        self.chunk_size = chunk_size
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._recent: Dict[str, dict] = {}
+        # (file signature, day) the mirror was loaded for, and when it was last checked
+        self._loaded_for = None
+        self._checked_at = float("-inf")
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(recent_cases)")}
+        if columns and "as_of_day" not in columns:
+            # Derived table from an older layout; rebuilt on the next ingest/refresh
+            conn.execute("DROP TABLE recent_cases")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _signature(self) -> Optional[tuple]:
+        """Cheap change detector: mtime and size of the DB file and its WAL."""
+        sig = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                sig.append(None)
+                continue
+            sig.append((st.st_mtime_ns, st.st_size))
+        return None if sig[0] is None else tuple(sig)
+
+    # ---- Ingestion ----
+
+    def ingest_csv(self, csv_path: str, ward_col: str = "ward", date_col: str = "date",
+                   cases_col: str = "cases") -> dict:
+        """
+        Stream a CSV export into the store in ``chunk_size`` row transactions.
+        Re-ingesting the same (ward, date) overwrites the earlier count.
+        Returns counts of rows loaded and rejected.
+        """
+        started = time.perf_counter()
+        loaded = rejected = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            loaded, rejected = self.ingest_rows(
+                ((row.get(ward_col), row.get(date_col), row.get(cases_col)) for row in reader)
+            )
+        elapsed = time.perf_counter() - started
+        logger.info(f"Medical ingest: {loaded} rows from {csv_path} in {elapsed:.1f}s ({rejected} rejected)")
+        return {"file": csv_path, "loaded": loaded, "rejected": rejected, "seconds": round(elapsed, 2)}
+
+    def ingest_rows(self, rows: Iterable[tuple]) -> tuple:
+        """Load ``(ward, iso_date, cases)`` tuples chunk by chunk. Returns (loaded, rejected)."""
+        loaded = rejected = 0
+        conn = self._connect()
+        try:
+            # Bulk-load profile: durability is restored by the final checkpoint
+            conn.execute("PRAGMA synchronous=OFF")
+            ward_ids = dict(conn.execute("SELECT name, ward_id FROM wards"))
+            chunk: List[tuple] = []
+
+            def flush():
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO case_counts (ward_id, day, cases) VALUES (?, ?, ?) "
+                        "ON CONFLICT(ward_id, day) DO UPDATE SET cases = excluded.cases",
+                        chunk,
+                    )
+                chunk.clear()
+
+            for ward, day, cases in rows:
+                try:
+                    ward = ward.strip()
+                    day_num = date.fromisoformat(day.strip()[:10]).toordinal()
+                    cases_num = int(float(cases))
+                    if not ward or cases_num < 0:
+                        raise ValueError
+                except (AttributeError, TypeError, ValueError):
+                    rejected += 1
+                    continue
+
+                ward_id = ward_ids.get(ward)
+                if ward_id is None:
+                    with conn:
+                        ward_id = conn.execute("INSERT INTO wards (name) VALUES (?)", (ward,)).lastrowid
+                    ward_ids[ward] = ward_id
+
+                chunk.append((ward_id, day_num, cases_num))
+                loaded += 1
+                if len(chunk) >= self.chunk_size:
+                    flush()
+            if chunk:
+                flush()
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._rebuild_recent(conn)
+        finally:
+            conn.close()
+        return loaded, rejected
+
+    def _rebuild_recent(self, conn: sqlite3.Connection):
+        """Recompute every ward's recent-cases aggregate (as of today) with one grouped query."""
+        with conn:
+            conn.execute("DELETE FROM recent_cases")
+            conn.execute(
+                "INSERT INTO recent_cases (ward_id, last_day, recent_cases, window_days, as_of_day)"
+                + _RECENT_SELECT,
+                {"as_of": date.today().toordinal(), "window": self.recent_days},
+            )
+        self._load_recent(conn)
+
+    # ---- Reads ----
+
+    def refresh(self):
+        """Rebuild the recent aggregate from the stored rows."""
+        conn = self._connect()
+        try:
+            self._rebuild_recent(conn)
+        finally:
+            conn.close()
+
+    def _load_recent(self, conn: sqlite3.Connection):
+        """
+        Mirror the aggregate in memory. If it was precomputed on an earlier
+        day, the same grouped query is re-run read-only, anchored to today.
+        """
+        today = date.today().toordinal()
+        rows = conn.execute(
+            "SELECT ward_id, last_day, recent_cases, window_days, as_of_day FROM recent_cases"
+        ).fetchall()
+        if any(as_of != today or window != self.recent_days for _, _, _, window, as_of in rows):
+            rows = conn.execute(_RECENT_SELECT, {"as_of": today, "window": self.recent_days}).fetchall()
+        names = dict(conn.execute("SELECT ward_id, name FROM wards"))
+        with self._lock:
+            self._recent = {
+                names[ward_id]: {
+                    "recent_cases": recent,
+                    "window_days": window,
+                    "last_reported": date.fromordinal(last_day).isoformat(),
+                    "stale": last_day <= as_of - window,
+                }
+                for ward_id, last_day, recent, window, as_of in rows
+            }
+            self._loaded_for = (self._signature(), today)
+            self._checked_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        """Reload the mirror if the file changed (e.g. another process ingested) or the day rolled over."""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        current = (self._signature(), date.today().toordinal())
+        if current == self._loaded_for:
+            return
+        if current[0] is None:
+            # No store yet: nothing to serve, but keep checking for one
+            with self._lock:
+                self._recent = {}
+                self._loaded_for = current
+            return
+        conn = self._connect()
+        try:
+            self._load_recent(conn)
+        finally:
+            conn.close()
+
+    def get_recent(self, ward_name: str) -> Optional[dict]:
+        """Precomputed recent-cases aggregate for a ward (dict lookup), or None."""
+        self._ensure_loaded()
+        return self._recent.get(ward_name)
+
+    def get_range(self, ward_name: str, start: Optional[date] = None,
+                  end: Optional[date] = None) -> List[dict]:
+        """Daily case counts for a ward between ``start`` and ``end`` (inclusive)."""
+        if not os.path.exists(self.path):
+            return []
+        lo = start.toordinal() if start else 0
+        hi = end.toordinal() if end else date.max.toordinal()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT c.day, c.cases FROM case_counts c "
+                "WHERE c.ward_id = (SELECT ward_id FROM wards WHERE name = ?) "
+                "AND c.day BETWEEN ? AND ? ORDER BY c.day",
+                (ward_name, lo, hi),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{"date": date.fromordinal(d).isoformat(), "cases": c} for d, c in rows]
+
+
+medical_store = MedicalRecordStore(
+    settings.abs_medical_db_path,
+    recent_days=settings.MEDICAL_RECENT_DAYS,
+    chunk_size=settings.MEDICAL_INGEST_CHUNK,
+    reload_interval=settings.MEDICAL_RELOAD_SECONDS,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AquaSentinel medical records store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="Load case-count CSV exports (ward,date,cases)")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--ward-col", default="ward")
+    ingest.add_argument("--date-col", default="date")
+    ingest.add_argument("--cases-col", default="cases")
+    sub.add_parser("refresh", help="Rebuild the recent-cases aggregate")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        for path in args.files:
+            print(medical_store.ingest_csv(path, args.ward_col, args.date_col, args.cases_col))
+    else:
+        medical_store.refresh()
+        print(f"Recent aggregate rebuilt for {len(medical_store._recent)} wards")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,46 @@
 """
 Prediction service — core business logic for AquaSentinel AI.
 Orchestrates ML prediction, DB persistence, alert generation, and recommendations.
+
+Each DB operation has a sync form (``Session``) and an async form
+(``AsyncSession``, suffixed ``_async``). Both execute the same statements,
+built once by the ``_*_statement`` helpers below.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from collections import deque
 from datetime import datetime, timezone, timedelta
+from typing import List, Optional, Tuple
 from app.models.prediction import Prediction, Alert
-from app.ml.predictor import predict as ml_predict
-from app.services.recommendation import get_recommendation
+from app.ml.predictor import predict as ml_predict, predict_batch as ml_predict_batch
+from app.services.recommendation import recommendation_code, TEMPLATES
+from app.services.write_pipeline import write_pipeline
+from app.services.risk_history import risk_history, RISK_MAP
+from app.services.stats_service import stats_aggregator
+from app.services.rollup_service import rollup_aggregator  # noqa: F401  (registers the rollup hook)
+from app.utils.pagination import Cursor, as_utc_naive, keyset_page, split_page
+from app.utils.metrics import perf_counter, stage
+
+_INFERENCE = stage("prediction.inference")
+_TREND = stage("prediction.trend")
+_COMMIT = stage("prediction.commit")
+# The writer task's SQL is outside the request, so the wait for it counts as the request's DB time
+_GROUP_COMMIT_WAIT = stage("prediction.group_commit_wait", "db")
+_BULK_INFERENCE = stage("prediction.bulk_inference")
+_BULK_TREND = stage("prediction.bulk_trend")
+_BULK_COMMIT = stage("prediction.bulk_commit")
+
+
+def _trend_statement(location: str):
+    """Risk levels of the last few (TREND_WINDOW) predictions for a location, newest first."""
+    return (
+        select(Prediction.risk_level)
+        .where(Prediction.location == location)
+        .order_by(Prediction.created_at.desc(), Prediction.id.desc())
+        .limit(risk_history.window)
+    )
 
 
 def calculate_trend(db: Session, location: str, current_risk_value: int) -> str:
@@ -16,22 +49,39 @@ def calculate_trend(db: Session, location: str, current_risk_value: int) -> str:
     with the average of the last 3 predictions.
     
     Risk Mapping: low=0, medium=1, high=2
+
+    Served from the in-memory risk history; the DB is only queried when
+    memory cannot answer (not hydrated, or the location was evicted).
     """
-    risk_map = {"low": 0, "medium": 1, "high": 2}
-    
-    # Get last 3 predictions for this location
-    last_preds = (
-        db.query(Prediction)
-        .filter(Prediction.location == location)
-        .order_by(Prediction.created_at.desc())
-        .limit(3)
-        .all()
-    )
-    
-    if not last_preds:
+    past_values = risk_history.recent(location)
+    if past_values is None:
+        # Get last 3 predictions for this location
+        past_levels = db.execute(_trend_statement(location)).scalars().all()
+        past_values = _seed_history(location, past_levels)
+    return trend_from_history(past_values, current_risk_value)
+
+
+async def calculate_trend_async(db: AsyncSession, location: str, current_risk_value: int) -> str:
+    """Async form of :func:`calculate_trend`."""
+    past_values = risk_history.recent(location)
+    if past_values is None:
+        past_levels = (await db.execute(_trend_statement(location))).scalars().all()
+        past_values = _seed_history(location, past_levels)
+    return trend_from_history(past_values, current_risk_value)
+
+
+def _seed_history(location: str, newest_first_levels) -> list:
+    oldest_first = list(reversed(newest_first_levels))
+    risk_history.seed(location, oldest_first)
+    return [RISK_MAP.get(level.lower(), 0) for level in oldest_first]
+
+
+def trend_from_history(past_values, current_risk_value: int) -> str:
+    """RISING / STABLE / FALLING from the current risk value vs. recent risk values (0-2)."""
+    if not past_values:
         return "STABLE"
     
-    avg_past_risk = sum(risk_map.get(p.risk_level.lower(), 0) for p in last_preds) / len(last_preds)
+    avg_past_risk = sum(past_values) / len(past_values)
     
     if current_risk_value > avg_past_risk + 0.2:
         return "RISING"
@@ -59,33 +109,19 @@ def determine_severity_tier(risk_level: str, confidence: float, trend: str) -> s
         return "INFO"
 
 
-def create_prediction(db: Session, rainfall: float, ph_level: float,
-                      contamination: float, cases_count: int,
-                      location: str = "Unknown") -> Prediction:
-    """
-    Run the ML model, save the prediction, auto-generate alerts,
-    and attach recommendations based on trends and severity.
-    """
-    # 1. Get ML prediction
-    result = ml_predict(rainfall, ph_level, contamination, cases_count)
+def _assess(result: dict, trend: str, rainfall: float, ph_level: float,
+            contamination: float, cases_count: int, location: str) -> Prediction:
+    """Build the Prediction row (severity + recommendation) for a model result and trend."""
     risk_level = result["risk_level"]
     confidence = result["confidence"]
-    
-    risk_map = {"low": 0, "medium": 1, "high": 2}
-    current_risk_val = risk_map.get(risk_level.lower(), 0)
-
-    # 2. Calculate Trend & Severity
-    trend = calculate_trend(db, location, current_risk_val)
     severity = determine_severity_tier(risk_level, confidence, trend)
 
-    # 3. Generate recommendation
-    recommendation = get_recommendation(
+    code = recommendation_code(
         risk_level, rainfall, ph_level, contamination, cases_count,
         severity=severity, trend=trend
     )
 
-    # 4. Save prediction to DB
-    prediction = Prediction(
+    return Prediction(
         rainfall=rainfall,
         ph_level=ph_level,
         contamination=contamination,
@@ -94,55 +130,327 @@ def create_prediction(db: Session, rainfall: float, ph_level: float,
         severity=severity,
         trend=trend,
         confidence=confidence,
-        recommendation=recommendation,
+        recommendation_code=code,
         location=location,
     )
+
+
+def _alert_for(prediction: Prediction):
+    """Alert for a HIGH or CRITICAL prediction (which must already have an id), else None."""
+    if prediction.severity not in ["HIGH", "CRITICAL"]:
+        return None
+    return Alert(
+        prediction_id=prediction.id,
+        severity=prediction.severity,
+        message=(
+            f"🚨 {prediction.severity} ALERT at {prediction.location}! "
+            f"Trend: {prediction.trend}. Confidence: {prediction.confidence:.1%}. "
+            f"Condition: Rainfall={prediction.rainfall}mm, Contamination={prediction.contamination}."
+        ),
+    )
+
+
+def create_prediction(db: Session, rainfall: float, ph_level: float,
+                      contamination: float, cases_count: int,
+                      location: str = "Unknown") -> Prediction:
+    """
+    Run the ML model, save the prediction, auto-generate alerts,
+    and attach recommendations based on trends and severity.
+    """
+    # 1. Get ML prediction
+    t0 = perf_counter()
+    result = ml_predict(rainfall, ph_level, contamination, cases_count)
+    current_risk_val = RISK_MAP.get(result["risk_level"].lower(), 0)
+    t1 = perf_counter()
+
+    # 2. Calculate Trend, Severity & Recommendation
+    trend = calculate_trend(db, location, current_risk_val)
+    prediction = _assess(result, trend, rainfall, ph_level, contamination, cases_count, location)
+    t2 = perf_counter()
+    _INFERENCE.observe(t1 - t0)
+    _TREND.observe(t2 - t1)
+
+    # 3. Save prediction to DB
     db.add(prediction)
     db.commit()
     db.refresh(prediction)
+    risk_history.record(location, prediction.risk_level)
 
-    # 5. Auto-generate alert if HIGH or CRITICAL
-    if severity in ["HIGH", "CRITICAL"]:
-        alert = Alert(
-            prediction_id=prediction.id,
-            severity=severity,
-            message=(
-                f"🚨 {severity} ALERT at {location}! "
-                f"Trend: {trend}. Confidence: {confidence:.1%}. "
-                f"Condition: Rainfall={rainfall}mm, Contamination={contamination}."
-            ),
-        )
+    # 4. Auto-generate alert if HIGH or CRITICAL
+    alert = _alert_for(prediction)
+    if alert is not None:
         db.add(alert)
         db.commit()
+    _COMMIT.observe(perf_counter() - t2)
+
+    return prediction
+
+
+async def create_prediction_async(db: AsyncSession, rainfall: float, ph_level: float,
+                                  contamination: float, cases_count: int,
+                                  location: str = "Unknown") -> Prediction:
+    """
+    Async form of :func:`create_prediction`. Model inference runs in the
+    threadpool; the prediction and its alert are written in one transaction,
+    shared with concurrent requests when the group-commit writer is running.
+    """
+    t0 = perf_counter()
+    result = await run_in_threadpool(ml_predict, rainfall, ph_level, contamination, cases_count)
+    current_risk_val = RISK_MAP.get(result["risk_level"].lower(), 0)
+    t1 = perf_counter()
+
+    trend = await calculate_trend_async(db, location, current_risk_val)
+    prediction = _assess(result, trend, rainfall, ph_level, contamination, cases_count, location)
+    t2 = perf_counter()
+    _INFERENCE.observe(t1 - t0)
+    _TREND.observe(t2 - t1)
+
+    if write_pipeline.running:
+        prediction = await write_pipeline.submit(prediction, _alert_for)
+        _GROUP_COMMIT_WAIT.observe(perf_counter() - t2)
+    else:
+        db.add(prediction)
+        await db.flush()  # assigns prediction.id for the alert
+        alert = _alert_for(prediction)
+        if alert is not None:
+            db.add(alert)
+        await db.commit()
+        _COMMIT.observe(perf_counter() - t2)
 
+    risk_history.record(location, prediction.risk_level)
     return prediction
 
 
+def _score_bulk(entries) -> Tuple[list, dict]:
+    """
+    Model results for every entry in one vectorized call. If the batch call
+    fails, rows are scored one by one so a bad row only fails itself.
+    Returns (results, {index: error}) with ``None`` results for failed rows.
+    """
+    try:
+        return ml_predict_batch(
+            [e.rainfall for e in entries], [e.ph_level for e in entries],
+            [e.contamination for e in entries], [e.cases_count for e in entries],
+        ), {}
+    except FileNotFoundError:
+        raise
+    except Exception:
+        results, errors = [], {}
+        for idx, e in enumerate(entries):
+            try:
+                results.append(ml_predict(e.rainfall, e.ph_level, e.contamination, e.cases_count))
+            except Exception as row_error:
+                results.append(None)
+                errors[idx] = str(row_error)
+        return results, errors
+
+
+async def _recent_history_bulk(db: AsyncSession, locations) -> dict:
+    """
+    Recent risk values (oldest first) for every location, reading the DB once
+    for all the locations memory cannot answer.
+    """
+    history, missing = {}, []
+    for location in locations:
+        past_values = risk_history.recent(location)
+        if past_values is None:
+            missing.append(location)
+        else:
+            history[location] = past_values
+    if missing:
+        fetched = {location: [] for location in missing}
+        rows = (await db.execute(risk_history.hydration_statement(missing))).all()
+        for location, risk_level in rows:
+            fetched[location].append(risk_level)
+        for location, oldest_first in fetched.items():
+            history[location] = _seed_history(location, list(reversed(oldest_first)))
+    return history
+
+
+async def create_predictions_bulk(db: AsyncSession, entries) -> Tuple[List[Prediction], list]:
+    """
+    Bulk form of :func:`create_prediction_async` for ``/predict/batch``.
+
+    All rows are scored in one model call, recent history for every affected
+    location comes from one grouped query, and trends respect the order of
+    rows inside the batch (row N sees rows < N of the same location). Every
+    prediction and alert is written in a single transaction.
+    Returns (predictions, errors) where errors carry the failed row's index.
+    """
+    t0 = perf_counter()
+    results, score_errors = await run_in_threadpool(_score_bulk, entries)
+    t1 = perf_counter()
+    locations = {e.location or "Unknown" for e in entries}
+    windows = {
+        location: deque(values, maxlen=risk_history.window)
+        for location, values in (await _recent_history_bulk(db, locations)).items()
+    }
+
+    predictions, errors = [], []
+    for idx, (entry, result) in enumerate(zip(entries, results)):
+        if result is None:
+            errors.append({"index": idx, "error": score_errors[idx], "input": entry.model_dump()})
+            continue
+        location = entry.location or "Unknown"
+        current_risk_val = RISK_MAP.get(result["risk_level"].lower(), 0)
+        window = windows[location]
+        trend = trend_from_history(list(window), current_risk_val)
+        window.append(current_risk_val)
+        predictions.append(_assess(
+            result, trend, entry.rainfall, entry.ph_level,
+            entry.contamination, entry.cases_count, location,
+        ))
+    t2 = perf_counter()
+    _BULK_INFERENCE.observe(t1 - t0)
+    _BULK_TREND.observe(t2 - t1)
+
+    if predictions:
+        db.add_all(predictions)
+        await db.flush()  # assigns ids for the alerts
+        db.add_all([a for a in map(_alert_for, predictions) if a is not None])
+        await db.commit()
+        _BULK_COMMIT.observe(perf_counter() - t2)
+        for prediction in predictions:
+            risk_history.record(prediction.location, prediction.risk_level)
+
+    return predictions, errors
+
+
 def get_prediction_by_id(db: Session, prediction_id: int):
     """Fetch a single prediction by ID."""
     return db.query(Prediction).filter(Prediction.id == prediction_id).first()
 
 
+def _predictions_page_statement(limit: int, after: Optional[Cursor] = None, skip: int = 0,
+                                location: Optional[str] = None, risk_level: Optional[str] = None,
+                                severity: Optional[str] = None, since: Optional[datetime] = None,
+                                until: Optional[datetime] = None):
+    """
+    Newest-first page of predictions below the ``after`` cursor. Each filter
+    has a ``(<column>, created_at)`` index, so filtered pages are index seeks too.
+    """
+    stmt = select(Prediction)
+    if location is not None:
+        stmt = stmt.where(Prediction.location == location)
+    if risk_level is not None:
+        stmt = stmt.where(Prediction.risk_level == risk_level.lower())
+    if severity is not None:
+        stmt = stmt.where(Prediction.severity == severity.upper())
+    if since is not None:
+        stmt = stmt.where(Prediction.created_at >= as_utc_naive(since))
+    if until is not None:
+        stmt = stmt.where(Prediction.created_at < as_utc_naive(until))
+    stmt = keyset_page(stmt, Prediction, limit, after)
+    return stmt.offset(skip) if skip else stmt
+
+
+def _alerts_page_statement(limit: int, after: Optional[Cursor] = None, skip: int = 0,
+                           is_resolved: Optional[bool] = None, severity: Optional[str] = None,
+                           since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Newest-first page of alerts below the ``after`` cursor (filters are index-backed)."""
+    stmt = select(Alert)
+    if is_resolved is not None:
+        stmt = stmt.where(Alert.is_resolved == is_resolved)
+    if severity is not None:
+        stmt = stmt.where(Alert.severity == severity.upper())
+    if since is not None:
+        stmt = stmt.where(Alert.created_at >= as_utc_naive(since))
+    if until is not None:
+        stmt = stmt.where(Alert.created_at < as_utc_naive(until))
+    stmt = keyset_page(stmt, Alert, limit, after)
+    return stmt.offset(skip) if skip else stmt
+
+
+# Field order of PredictionOutput / AlertOutput for the column-tuple read path
+PREDICTION_FIELDS = (
+    "id", "rainfall", "ph_level", "contamination", "cases_count", "risk_level", "severity",
+    "trend", "confidence", "recommendation", "location", "created_at",
+)
+ALERT_FIELDS = ("id", "prediction_id", "severity", "message", "is_resolved", "created_at")
+_PREDICTION_ROW_COLUMNS = tuple(getattr(Prediction, f) for f in PREDICTION_FIELDS) + (Prediction.recommendation_code,)
+_ALERT_ROW_COLUMNS = tuple(getattr(Alert, f) for f in ALERT_FIELDS)
+_RECOMMENDATION = PREDICTION_FIELDS.index("recommendation")
+
+
+def _prediction_row(row) -> tuple:
+    """PREDICTION_FIELDS values of a ``_PREDICTION_ROW_COLUMNS`` row, with the template rendered."""
+    code = row[-1]
+    if code is None:
+        return row[:-1]
+    return (*row[:_RECOMMENDATION], TEMPLATES[code], *row[_RECOMMENDATION + 1:-1])
+
+
+def prediction_values(prediction: Prediction) -> tuple:
+    """PREDICTION_FIELDS values of a loaded Prediction."""
+    return tuple(
+        prediction.rendered_recommendation if f == "recommendation" else getattr(prediction, f)
+        for f in PREDICTION_FIELDS
+    )
+
+
+def get_predictions_page(db: Session, limit: int = 100, after: Optional[Cursor] = None, **filters):
+    """One page of predictions, newest first. Returns ``(rows, next_cursor)``."""
+    rows = db.execute(_predictions_page_statement(limit, after, **filters)).scalars().all()
+    return split_page(rows, limit)
+
+
+async def get_predictions_page_async(db: AsyncSession, limit: int = 100,
+                                     after: Optional[Cursor] = None, **filters):
+    """Async form of :func:`get_predictions_page`."""
+    rows = (await db.execute(_predictions_page_statement(limit, after, **filters))).scalars().all()
+    return split_page(rows, limit)
+
+
+async def get_prediction_rows_page_async(db: AsyncSession, limit: int = 100,
+                                         after: Optional[Cursor] = None, **filters):
+    """
+    Column-tuple form of :func:`get_predictions_page_async`: the same page as
+    PREDICTION_FIELDS tuples, without building ORM objects.
+    """
+    stmt = _predictions_page_statement(limit, after, **filters).with_only_columns(*_PREDICTION_ROW_COLUMNS)
+    rows, next_cursor = split_page((await db.execute(stmt)).all(), limit)
+    return [_prediction_row(row) for row in rows], next_cursor
+
+
+def get_alerts_page(db: Session, limit: int = 100, after: Optional[Cursor] = None, **filters):
+    """One page of alerts, newest first. Returns ``(rows, next_cursor)``."""
+    rows = db.execute(_alerts_page_statement(limit, after, **filters)).scalars().all()
+    return split_page(rows, limit)
+
+
+async def get_alerts_page_async(db: AsyncSession, limit: int = 100,
+                                after: Optional[Cursor] = None, **filters):
+    """Async form of :func:`get_alerts_page`."""
+    rows = (await db.execute(_alerts_page_statement(limit, after, **filters))).scalars().all()
+    return split_page(rows, limit)
+
+
+async def get_alert_rows_page_async(db: AsyncSession, limit: int = 100,
+                                    after: Optional[Cursor] = None, **filters):
+    """Column-tuple form of :func:`get_alerts_page_async` (ALERT_FIELDS tuples)."""
+    stmt = _alerts_page_statement(limit, after, **filters).with_only_columns(*_ALERT_ROW_COLUMNS)
+    rows, next_cursor = split_page((await db.execute(stmt)).all(), limit)
+    return [tuple(row) for row in rows], next_cursor
+
+
 def get_all_predictions(db: Session, skip: int = 0, limit: int = 100):
     """Fetch all predictions, newest first."""
-    return (
-        db.query(Prediction)
-        .order_by(Prediction.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    return get_predictions_page(db, limit, skip=skip)[0]
+
+
+async def get_all_predictions_async(db: AsyncSession, skip: int = 0, limit: int = 100):
+    """Async form of :func:`get_all_predictions`."""
+    return (await get_predictions_page_async(db, limit, skip=skip))[0]
 
 
 def get_all_alerts(db: Session, skip: int = 0, limit: int = 100):
     """Fetch all alerts, newest first."""
-    return (
-        db.query(Alert)
-        .order_by(Alert.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    return get_alerts_page(db, limit, skip=skip)[0]
+
+
+async def get_all_alerts_async(db: AsyncSession, skip: int = 0, limit: int = 100):
+    """Async form of :func:`get_all_alerts`."""
+    return (await get_alerts_page_async(db, limit, skip=skip))[0]
 
 
 def resolve_alert(db: Session, alert_id: int):
@@ -156,57 +464,28 @@ def resolve_alert(db: Session, alert_id: int):
 
 
 def get_stats(db: Session) -> dict:
-    """Compute summary statistics for the dashboard."""
-    total_predictions = db.query(func.count(Prediction.id)).scalar() or 0
-    total_alerts = db.query(func.count(Alert.id)).scalar() or 0
-    active_alerts = db.query(func.count(Alert.id)).filter(Alert.is_resolved == False).scalar() or 0
-    resolved_alerts = db.query(func.count(Alert.id)).filter(Alert.is_resolved == True).scalar() or 0
-
-    # Risk distribution
-    risk_rows = (
-        db.query(Prediction.risk_level, func.count(Prediction.id))
-        .group_by(Prediction.risk_level)
-        .all()
+    """
+    Summary statistics for the dashboard, read from the incrementally
+    maintained stats tables (constant cost regardless of history size).
+    """
+    stmts = stats_aggregator.statements()
+    return stats_aggregator.assemble(
+        db.execute(stmts["counters"]).all(),
+        db.execute(stmts["today"]).scalar(),
+        db.execute(stmts["recent"]).all(),
     )
-    risk_distribution = {row[0]: row[1] for row in risk_rows}
 
-    # Trend distribution
-    trend_rows = (
-        db.query(Prediction.trend, func.count(Prediction.id))
-        .group_by(Prediction.trend)
-        .all()
-    )
-    trend_distribution = {row[0]: row[1] for row in trend_rows}
-
-    # Average confidence
-    avg_confidence = db.query(func.avg(Prediction.confidence)).scalar()
-    avg_confidence = round(avg_confidence, 4) if avg_confidence else None
-
-    # Recent unique locations (last 20 predictions)
-    recent = (
-        db.query(Prediction.location)
-        .order_by(Prediction.created_at.desc())
-        .limit(20)
-        .all()
-    )
-    recent_locations = list({r[0] for r in recent if r[0] and r[0] != "Unknown"})
-
-    # Predictions today
-    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    predictions_today = (
-        db.query(func.count(Prediction.id))
-        .filter(Prediction.created_at >= today_start)
-        .scalar() or 0
+
+async def get_stats_async(db: AsyncSession) -> dict:
+    """Async form of :func:`get_stats`."""
+    stmts = stats_aggregator.statements()
+    return stats_aggregator.assemble(
+        (await db.execute(stmts["counters"])).all(),
+        (await db.execute(stmts["today"])).scalar(),
+        (await db.execute(stmts["recent"])).all(),
     )
 
-    return {
-        "total_predictions": total_predictions,
-        "total_alerts": total_alerts,
-        "active_alerts": active_alerts,
-        "resolved_alerts": resolved_alerts,
-        "risk_distribution": risk_distribution,
-        "trend_distribution": trend_distribution,
-        "avg_confidence": avg_confidence,
-        "recent_locations": recent_locations,
-        "predictions_today": predictions_today,
-    }
+
+async def get_stats_etag_async(db: AsyncSession) -> str:
+    """ETag of the current stats summary (one primary-key lookup)."""
+    return stats_aggregator.etag((await db.execute(stats_aggregator.generation_statement())).scalar())
@@ -0,0 +1,209 @@
+"""
+Per-request Server-Timing headers and on-demand sampling profiles.
+
+Every API response carries ``Server-Timing`` with the time spent in each
+stage category: ``db`` (every SQL statement, via engine events), ``model``,
+``explain`` (SHAP), ``llm`` (Ollama) and ``serialize``. It also carries
+``total`` (time until the response started). Stages report through the
+``app.utils.metrics`` histograms, so the header and ``/metrics`` agree.
+
+An admin can profile one live request by sending
+``X-Admin-Token: <ADMIN_TOKEN>`` plus ``X-Profile: store`` (or
+``?profile=store``). While that request runs, a sampler thread records every
+thread's Python stack each ``PROFILE_INTERVAL_MS``:
+
+  - ``store`` writes the folded stacks (flamegraph.pl / speedscope input) to
+    ``PROFILE_DIR`` and names the file in ``X-Profile-File``;
+  - ``return`` sends them back as the response body instead.
+
+Only one profile runs at a time. Without the token, or with ``ADMIN_TOKEN``
+unset, the switch is ignored. When no profile is requested, no sampler
+thread exists and nothing is recorded.
+"""
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.utils.metrics import perf_counter, request_timings, stage
+
+logger = logging.getLogger("aqua-sentinel")
+
+CATEGORIES = ("db", "model", "explain", "llm", "serialize")
+PROFILE_MODES = ("store", "return")
+# Browsers only expose Server-Timing to the dashboard's origins listed here
+_TIMING_ALLOW_ORIGIN = ", ".join(settings.CORS_ORIGINS).encode()
+
+_DB_QUERY = stage("db.query", "db")
+
+
+# ---- DB timing (all engines, sync and async) ----
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("query_start", None)
+    if start is not None:
+        _DB_QUERY.observe(perf_counter() - start)
+
+
+# ---- Sampling profiler ----
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(settings.BASE_DIR):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples every other thread's stack from a daemon thread until stopped.
+    Idle workers (blocked in ``queue.get``) are skipped.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.folded()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if any(code.co_name == "get" and code.co_filename.endswith("queue.py") for code in stack):
+                    continue
+                labels = [names.get(ident, str(ident))] + [_frame_label(code) for code in reversed(stack)]
+                self.samples[";".join(labels)] += 1
+
+    def folded(self) -> str:
+        """One ``frame;frame;... count`` line per distinct stack (root first)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+# ---- Middleware ----
+
+def server_timing(timings: dict, total: float) -> str:
+    parts = [f"{name};dur={timings[name] * 1000:.2f}" for name in CATEGORIES if name in timings]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _requested_profile(scope) -> Optional[str]:
+    """The profile mode an admin asked for, or None."""
+    if not settings.ADMIN_TOKEN:
+        return None
+    headers = dict(scope["headers"])
+    mode = headers.get(b"x-profile", b"").decode("latin-1").strip().lower()
+    if not mode and b"profile=" in scope.get("query_string", b""):
+        mode = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0].lower()
+    if not mode:
+        return None
+    token = headers.get(b"x-admin-token", b"").decode("latin-1")
+    if not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        return None
+    return mode if mode in PROFILE_MODES else "store"
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding Server-Timing and running admin-requested profiles."""
+
+    _profiling = threading.Lock()
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SERVER_TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = request_timings.set(timings)
+        started = perf_counter()
+        mode = _requested_profile(scope)
+        profiler = None
+        if mode is not None and self._profiling.acquire(blocking=False):
+            profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+            profile_name = f"profile-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.folded"
+            profiler.start()
+
+        captured = {}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, perf_counter() - started).encode()))
+                headers.append((b"timing-allow-origin", _TIMING_ALLOW_ORIGIN))
+                if profiler is not None:
+                    if mode == "return":
+                        captured["status"] = message["status"]
+                        return
+                    headers.append((b"x-profile-file", profile_name.encode()))
+                message = {**message, "headers": headers}
+            elif profiler is not None and mode == "return" and message["type"] == "http.response.body":
+                return  # the profile replaces the body
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            if profiler is not None:
+                folded = profiler.stop()
+                self._profiling.release()
+                if mode == "store":
+                    self._store(profile_name, folded)
+
+        if profiler is not None and mode == "return":
+            body = folded.encode()
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(captured.get("status", 500)).encode()),
+                (b"server-timing", server_timing(timings, perf_counter() - started).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _store(name: str, folded: str):
+        try:
+            os.makedirs(settings.abs_profile_dir, exist_ok=True)
+            with open(os.path.join(settings.abs_profile_dir, name), "w") as f:
+                f.write(folded)
+        except OSError as e:
+            logger.error(f"Could not store profile {name}: {e}")
@@ -1,15 +1,46 @@
-import random
+import asyncio
 import logging
-import hashlib
-from datetime import datetime
+import time
+from app.core.config import settings
 from app.services.weather_service import weather_service
 from app.services.medical_service import medical_service
+from app.services.sensor_simulation import sensor_simulator
+from app.services.risk_history import risk_history
 from app.ml.predictor import predict
-from app.utils.database import SessionLocal
+from sqlalchemy import select
+from app.utils.database import AsyncSessionLocal
 from app.models.prediction import Prediction, Alert
+from app.utils.conditional import strong_etag
+from app.utils.serialization import dumps_json
+from app.utils.metrics import stage
 
 logger = logging.getLogger("aqua-sentinel")
 
+_COMPUTE = stage("pulse.compute")
+_WEATHER = stage("pulse.weather")
+_ALERT_SYNC = stage("pulse.alert_sync")
+
+
+def open_alert_statement(location: str):
+    """Any unresolved alert raised for ``location``."""
+    return (
+        select(Alert.id)
+        .join(Prediction)
+        .where(Prediction.location == location)
+        .where(Alert.is_resolved == False)
+        .limit(1)
+    )
+
+
+class PulseSnapshot:
+    """An encoded pulse with its validators; replaced only when the content changes."""
+    __slots__ = ("body", "etag", "last_modified")
+
+    def __init__(self, body: bytes, etag: str, last_modified: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
 
 class PulseService:
     """
@@ -18,47 +49,73 @@ class PulseService:
     Provides a "Live Pulse" state for the government dashboard.
     """
 
-    def __init__(self):
+    def __init__(self, snapshot_ttl: float = 30.0):
         self.last_pulse = []
-
-    def _get_ward_random(self, ward_name: str):
-        """Returns a seeded Random instance stable for the current hour."""
-        hour_key = datetime.now().strftime("%Y-%m-%d-%H")
-        seed = int(hashlib.md5(f"{ward_name}:{hour_key}".encode()).hexdigest(), 16) % (2**32)
-        return random.Random(seed)
+        self.snapshot_ttl = snapshot_ttl
+        self._snapshot = None
+        self._snapshot_at = 0.0
+        self._snapshot_lock = asyncio.Lock()
+        # Requests served from the current snapshot vs. recomputed
+        self.hits = 0
+        self.misses = 0
+
+    async def snapshot(self) -> PulseSnapshot:
+        """
+        The encoded pulse, recomputed at most every ``snapshot_ttl`` seconds
+        (concurrent pollers share one computation). A recomputed pulse with the
+        same content keeps the previous snapshot, so its ETag and
+        Last-Modified only move when something visible changed.
+        """
+        async with self._snapshot_lock:
+            now = time.monotonic()
+            if self._snapshot is None or now - self._snapshot_at >= self.snapshot_ttl:
+                self.misses += 1
+                with _COMPUTE.time():
+                    body = dumps_json(await self.get_territory_pulse())
+                etag = strong_etag(body)
+                if self._snapshot is None or self._snapshot.etag != etag:
+                    self._snapshot = PulseSnapshot(body, etag, time.time())
+                self._snapshot_at = now
+            else:
+                self.hits += 1
+            return self._snapshot
 
     async def get_territory_pulse(self) -> list:
         """
         Runs a full diagnostic pulse for all Coimbatore wards.
-        Aggregates Live Weather + Automated Medical + Simulated Sensors.
+        Aggregates Live Weather (per ward location) + Automated Medical + Simulated Sensors.
         """
-        # 1. Get Live Weather (Context for all wards)
+        territories = medical_service.get_all_territories()
+        # One sensor table per pulse, so every ward reads the same hour
+        sensors = sensor_simulator.table()
+
+        # 1. Get Live Weather per ward (deduplicated onto the geo-grid, fetched concurrently)
         try:
-            weather = await weather_service.get_current_weather()
+            with _WEATHER.time():
+                weather_by_ward = await weather_service.get_weather_for_locations({
+                    ward: medical_service.get_ward_coordinates(ward) for ward in territories
+                })
         except Exception as e:
             logger.error(f"Weather fetch failed, using fallback: {e}")
-            weather = {"rainfall": 0.5, "temperature": 32, "humidity": 45}
-
-        rainfall = weather.get("rainfall", 0.5)
+            weather_by_ward = {}
 
         # 2. Iterate through all wards
-        territories = medical_service.get_all_territories()
         pulse_results = []
 
         for ward in territories:
             try:
-                rng = self._get_ward_random(ward)
+                weather = weather_by_ward.get(ward) or {"rainfall": 0.5, "temperature": 32, "humidity": 45}
+                # Outbreak risk follows cumulative rain, so prefer the rolling 7-day
+                # total once history exists; fall back to the instant reading.
+                rainfall = weather.get("rain_7d", weather.get("rainfall", 0.5))
                 # Get automated medical records
                 med_data = medical_service.get_ward_records(ward)
                 cases = med_data.get("historical_cases", 0)
 
-                # Simulate water quality (sensor data per ward — stable per hour)
-                ph_level = 7.0 + rng.uniform(-0.5, 0.5)
-                contamination = 0.1 + rng.uniform(0, 0.3)
-                if "Singanallur" in ward or "Podanur" in ward:
-                    contamination += 0.2
-                if "Gandhipuram" in ward:
-                    contamination += 0.15
+                # Simulated water quality (sensor data per ward — stable per hour)
+                reading = sensors.reading(ward)
+                ph_level = reading["ph_level"]
+                contamination = reading["contamination"]
                 
                 # Force High Risk for demonstration zones
                 if "Zone Alpha" in ward:
@@ -83,9 +140,12 @@ class PulseService:
                     "confidence": ai_result["confidence"],
                     "reason": ai_result.get("reason", "Standard Model Analysis"),
                     "method": ai_result.get("method", "ml_ensemble"),
+                    "weather_source": weather.get("source", "Climate Normals"),
                     "prediction": f"Outbreak {'likely within 7 days' if ai_result['risk_level'] == 'high' else 'unlikely in near term' if ai_result['risk_level'] == 'low' else 'possible within 14 days'}",
                     "metrics": {
                         "rainfall": round(rainfall, 2),
+                        "rain_24h": weather.get("rain_24h"),
+                        "rain_72h": weather.get("rain_72h"),
                         "ph_level": round(ph_level, 2),
                         "contamination": round(contamination, 2),
                         "cases_count": cases
@@ -94,7 +154,8 @@ class PulseService:
 
                 # 4. Sync HIGH risk alerts with Database (Hackathon Demo Logic)
                 if ai_result["risk_level"] == "high":
-                    self._sync_high_risk_to_db(ward, rainfall, ph_level, contamination, cases, ai_result)
+                    with _ALERT_SYNC.time():
+                        await self._sync_high_risk_to_db(ward, rainfall, ph_level, contamination, cases, ai_result)
             except Exception as e:
                 logger.error(f"Pulse failed for ward {ward}: {e}")
                 # Fallback entry so the ward still appears
@@ -114,51 +175,44 @@ class PulseService:
         self.last_pulse = pulse_results
         return pulse_results
 
-    def _sync_high_risk_to_db(self, location: str, rainfall: float, ph_level: float, 
-                             contamination: float, cases: int, ai_result: dict):
+    async def _sync_high_risk_to_db(self, location: str, rainfall: float, ph_level: float,
+                                    contamination: float, cases: int, ai_result: dict):
         """Ensures a HIGH risk simulation creates a DB alert if one doesn't exist."""
-        db = SessionLocal()
-        try:
-            # Check for existing unresolved alert for this location in the last HOUR
-            existing = (
-                db.query(Alert)
-                .join(Prediction)
-                .filter(Prediction.location == location)
-                .filter(Alert.is_resolved == False)
-                .first()
-            )
-            
-            if not existing:
-                logger.info(f"🚨 Pulse Sync: Automatically generating alert for {location}")
-                
-                # Logic copied from prediction_service.py to maintain consistency
-                prediction = Prediction(
-                    rainfall=rainfall,
-                    ph_level=ph_level,
-                    contamination=contamination,
-                    cases_count=cases,
-                    risk_level=ai_result["risk_level"],
-                    severity="CRITICAL" if "Zone" in location else "HIGH",
-                    trend="RISING",
-                    confidence=ai_result["confidence"],
-                    recommendation=f"Urgent response required for {location}. Resource deployment recommended.",
-                    location=location,
-                )
-                db.add(prediction)
-                db.commit()
-                db.refresh(prediction)
-
-                alert = Alert(
-                    prediction_id=prediction.id,
-                    severity=prediction.severity,
-                    message=f"🚨 PULSE ALERT: {ai_result.get('reason', 'Critical sensor anomaly detected')} in {location}.",
-                )
-                db.add(alert)
-                db.commit()
-        except Exception as e:
-            logger.error(f"Failed to sync pulse alert for {location}: {e}")
-        finally:
-            db.close()
+        async with AsyncSessionLocal() as db:
+            try:
+                # Check for existing unresolved alert for this location
+                existing = (await db.execute(open_alert_statement(location))).first()
+
+                if not existing:
+                    logger.info(f"🚨 Pulse Sync: Automatically generating alert for {location}")
+
+                    # Logic copied from prediction_service.py to maintain consistency
+                    prediction = Prediction(
+                        rainfall=rainfall,
+                        ph_level=ph_level,
+                        contamination=contamination,
+                        cases_count=cases,
+                        risk_level=ai_result["risk_level"],
+                        severity="CRITICAL" if "Zone" in location else "HIGH",
+                        trend="RISING",
+                        confidence=ai_result["confidence"],
+                        recommendation=f"Urgent response required for {location}. Resource deployment recommended.",
+                        location=location,
+                    )
+                    db.add(prediction)
+                    await db.flush()
+
+                    alert = Alert(
+                        prediction_id=prediction.id,
+                        severity=prediction.severity,
+                        message=f"🚨 PULSE ALERT: {ai_result.get('reason', 'Critical sensor anomaly detected')} in {location}.",
+                    )
+                    db.add(alert)
+                    await db.commit()
+                    # Keep in-memory trends consistent with rows written here
+                    risk_history.record(location, prediction.risk_level)
+            except Exception as e:
+                logger.error(f"Failed to sync pulse alert for {location}: {e}")
 
 
-pulse_service = PulseService()
+pulse_service = PulseService(snapshot_ttl=settings.PULSE_SNAPSHOT_SECONDS)
@@ -30,38 +30,89 @@ SEVERITY_RECOMMENDATIONS = {
 }
 
 
+# ---- Template registry ----
+# A recommendation is fully determined by risk level, severity, trend and four
+# condition flags, so every distinct text is rendered once at import and rows
+# store its code. Codes are mixed-radix over the axes below; the layout is
+# persisted in predictions.recommendation_code, so only ever append to an axis.
+
+_RISK_AXIS = ("low", "medium", "high")
+_SEVERITY_AXIS = ("INFO", "WARNING", "HIGH", "CRITICAL")
+_TREND_AXIS = (None, "RISING", "STABLE", "FALLING")
+_FLAG_COUNT = 4  # pH out of range, extreme contamination, outbreak, flood
+
+_RISK_INDEX = {name: i for i, name in enumerate(_RISK_AXIS)}
+_SEVERITY_INDEX = {name: i for i, name in enumerate(_SEVERITY_AXIS)}
+_TREND_INDEX = {name: i for i, name in enumerate(_TREND_AXIS)}
+
+_TREND_LINES = {
+    "RISING": "📈 TREND: Risk level is RISING. Accelerate preventive measures.",
+    "STABLE": "📊 TREND: Situation is stable. Continue monitoring.",
+    "FALLING": "📉 TREND: Risk level is declining. Prepare to scale back alerts.",
+}
+_FLAG_LINES = (
+    "⚗️ pH Out of Range — inspect for industrial leaks or runoff.",
+    "☣️ Extreme contamination detected — investigate source immediately.",
+    "🏨 Outbreak Alert — notify all nearby healthcare facilities.",
+    "🌧️ Flood Warning — move medical supplies to high ground.",
+)
+
+
+def _compose(level: str, severity: str, trend, flags: int) -> str:
+    actions = [SEVERITY_RECOMMENDATIONS[severity]]
+    # A stable trend adds nothing to a high-risk recommendation
+    if trend in _TREND_LINES and not (trend == "STABLE" and level == "high"):
+        actions.append(_TREND_LINES[trend])
+    actions.extend(RISK_RECOMMENDATIONS[level])
+    actions.extend(line for bit, line in enumerate(_FLAG_LINES) if flags >> bit & 1)
+    return " | ".join(actions)
+
+
+def _build_templates():
+    """Every code's text; identical texts share one string object."""
+    interned = {}
+    templates = []
+    for level in _RISK_AXIS:
+        for severity in _SEVERITY_AXIS:
+            for trend in _TREND_AXIS:
+                for flags in range(1 << _FLAG_COUNT):
+                    text = _compose(level, severity, trend, flags)
+                    templates.append(interned.setdefault(text, text))
+    return tuple(templates)
+
+
+TEMPLATES = _build_templates()
+# Text -> code (first code for texts that several codes share)
+TEMPLATE_CODES = {}
+for _code, _text in enumerate(TEMPLATES):
+    TEMPLATE_CODES.setdefault(_text, _code)
+
+
+def recommendation_code(risk_level: str, rainfall: float, ph_level: float,
+                        contamination: float, cases_count: int,
+                        severity: str = "INFO", trend: str = "STABLE") -> int:
+    """Registry code of the recommendation for these conditions."""
+    flags = ((ph_level < 5.0 or ph_level > 8.5)
+             | (contamination > 0.85) << 1
+             | (cases_count > 80) << 2
+             | (rainfall > 300) << 3)
+    return (((_RISK_INDEX.get(risk_level.lower(), 0) * len(_SEVERITY_AXIS)
+              + _SEVERITY_INDEX.get(severity, 0)) * len(_TREND_AXIS)
+             + _TREND_INDEX.get(trend, 0)) << _FLAG_COUNT) | flags
+
+
+def render_recommendation(code: int) -> str:
+    """Text of a registry code."""
+    return TEMPLATES[code]
+
+
 def get_recommendation(risk_level: str, rainfall: float, ph_level: float,
-                       contamination: float, cases_count: int, 
+                       contamination: float, cases_count: int,
                        severity: str = "INFO", trend: str = "STABLE") -> str:
     """
     Generate a context-aware recommendation based on risk level, conditions, severity, and trend.
     Returns a formatted string of recommended actions.
     """
-    level = risk_level.lower()
-    base_actions = RISK_RECOMMENDATIONS.get(level, RISK_RECOMMENDATIONS["low"])
-    
-    # 1. Start with severity-specific advice
-    final_actions = [SEVERITY_RECOMMENDATIONS.get(severity, SEVERITY_RECOMMENDATIONS["INFO"])]
-    
-    # 2. Add trend-specific commentary
-    if trend == "RISING":
-        final_actions.append("📈 TREND: Risk level is RISING. Accelerate preventive measures.")
-    elif trend == "STABLE" and level != "high":
-        final_actions.append("📊 TREND: Situation is stable. Continue monitoring.")
-    elif trend == "FALLING":
-        final_actions.append("📉 TREND: Risk level is declining. Prepare to scale back alerts.")
-
-    # 3. Add risk-level actions
-    final_actions.extend(base_actions)
-
-    # 4. Add condition-specific extras
-    if ph_level < 5.0 or ph_level > 8.5:
-        final_actions.append("⚗️ pH Out of Range — inspect for industrial leaks or runoff.")
-    if contamination > 0.85:
-        final_actions.append("☣️ Extreme contamination detected — investigate source immediately.")
-    if cases_count > 80:
-        final_actions.append("🏨 Outbreak Alert — notify all nearby healthcare facilities.")
-    if rainfall > 300:
-        final_actions.append("🌧️ Flood Warning — move medical supplies to high ground.")
-
-    return " | ".join(final_actions)
+    return TEMPLATES[recommendation_code(
+        risk_level, rainfall, ph_level, contamination, cases_count, severity=severity, trend=trend
+    )]
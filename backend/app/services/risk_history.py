@@ -0,0 +1,127 @@
+"""
+In-memory ring buffer of the most recent risk values per location.
+
+Trend calculation only ever needs the last few risk levels of one location.
+Keeping them in a bounded deque per location — hydrated once at startup with
+a single windowed query and appended to after every committed insert — turns
+the per-prediction ``ORDER BY created_at DESC LIMIT 3`` query into a dict
+lookup.
+"""
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.prediction import Prediction
+
+RISK_MAP = {"low": 0, "medium": 1, "high": 2}
+
+
+class RiskHistory:
+    """Per-location deques of the last ``window`` risk values (0=low .. 2=high)."""
+
+    def __init__(self, window: int = 3, max_locations: int = 100_000):
+        self.window = window
+        self.max_locations = max_locations
+        self._buffers: "OrderedDict[str, Deque[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hydrated = False
+        # Once a location has been evicted a miss no longer proves "no history"
+        self.evicted = False
+        # Lookups answered from memory vs. left to the DB
+        self.hits = 0
+        self.misses = 0
+
+    def hydration_statement(self, locations: Optional[Iterable[str]] = None):
+        """
+        Last ``window`` risk levels of every location (or only ``locations``),
+        oldest first, in one query.
+        """
+        rank = func.row_number().over(
+            partition_by=Prediction.location,
+            order_by=(Prediction.created_at.desc(), Prediction.id.desc()),
+        ).label("rank")
+        ranked = select(Prediction.location, Prediction.risk_level, rank)
+        if locations is not None:
+            ranked = ranked.where(Prediction.location.in_(list(locations)))
+        ranked = ranked.subquery()
+        return (
+            select(ranked.c.location, ranked.c.risk_level)
+            .where(ranked.c.rank <= self.window)
+            .order_by(ranked.c.location, ranked.c.rank.desc())
+        )
+
+    def hydrate(self, db: Session):
+        """Rebuild every buffer from the predictions table."""
+        rows = db.execute(self.hydration_statement()).all()
+        self.load_rows(rows)
+
+    def load_rows(self, rows):
+        """Replace all buffers with ``(location, risk_level)`` rows ordered oldest first."""
+        with self._lock:
+            self._buffers.clear()
+            self.evicted = False
+            for location, risk_level in rows:
+                self._append_locked(location, risk_level)
+            self.hydrated = True
+
+    def recent(self, location: str) -> Optional[List[int]]:
+        """
+        Recent risk values for ``location`` (oldest first). Returns None when the
+        answer is unknown from memory alone (not hydrated, or possibly evicted).
+        """
+        with self._lock:
+            buf = self._buffers.get(location)
+            if buf is not None:
+                self.hits += 1
+                self._buffers.move_to_end(location)
+                return list(buf)
+            if not self.hydrated or self.evicted:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return []
+
+    def record(self, location: str, risk_level: str):
+        """
+        Append a committed prediction's risk level. A location with no buffer is
+        only started when memory is authoritative; otherwise the next trend
+        lookup reads it from the DB and seeds it.
+        """
+        with self._lock:
+            if location in self._buffers or (self.hydrated and not self.evicted):
+                self._append_locked(location, risk_level)
+
+    def seed(self, location: str, risk_levels: List[str]):
+        """Install a location's history (oldest first) fetched from the DB after a miss."""
+        with self._lock:
+            self._buffers.pop(location, None)
+            self._buffers[location] = deque(maxlen=self.window)
+            for level in risk_levels:
+                self._append_locked(location, level)
+
+    def _append_locked(self, location: str, risk_level: str):
+        buf = self._buffers.get(location)
+        if buf is None:
+            buf = self._buffers[location] = deque(maxlen=self.window)
+            if len(self._buffers) > self.max_locations:
+                self._buffers.popitem(last=False)
+                self.evicted = True
+        else:
+            self._buffers.move_to_end(location)
+        buf.append(RISK_MAP.get((risk_level or "").lower(), 0))
+
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+            self.hydrated = False
+            self.evicted = False
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+risk_history = RiskHistory(window=settings.TREND_WINDOW)
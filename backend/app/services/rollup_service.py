@@ -0,0 +1,228 @@
+"""
+Hourly and daily rollups of predictions per location for analytics charts.
+
+Every flushed Prediction insert is folded into its (location, hour) and
+(location, day) rows by a session ``after_flush`` hook — one upsert per
+table per flush, in the same transaction as the predictions — so charts read
+a few hundred pre-aggregated rows instead of scanning history. Rollups are
+never decremented: they outlive predictions archived out of the hot table.
+
+``/analytics/timeseries`` serves them, optionally downsampled with LTTB to a
+requested number of points. Backfill rebuilds both tables from the
+predictions table plus the archived months, so archived history keeps its
+rollups:
+    python -m app.services.rollup_service backfill
+"""
+import argparse
+import logging
+from itertools import chain
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.prediction import Prediction
+from app.models.rollup import DailyRollup, HourlyRollup
+from app.services.archive_service import archive_store
+from app.utils.downsample import lttb
+from app.utils.pagination import as_utc_naive
+
+logger = logging.getLogger("aqua-sentinel")
+
+GRANULARITIES = {"hour": HourlyRollup, "day": DailyRollup}
+FEATURES = ("rainfall", "ph_level", "contamination", "cases_count")
+RISK_LEVELS = ("low", "medium", "high")
+SEVERITIES = ("critical", "high", "warning", "info")
+COUNT_COLUMNS = ("n",) + tuple(f"risk_{r}" for r in RISK_LEVELS) + tuple(f"severity_{s}" for s in SEVERITIES)
+SUM_COLUMNS = tuple(f"{f}_sum" for f in FEATURES)
+MAX_COLUMNS = tuple(f"{f}_max" for f in FEATURES)
+
+
+def bucket_start(value: Optional[datetime], granularity: str) -> datetime:
+    """Naive-UTC start of the hour/day containing ``value``."""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _empty_row(location: str, bucket: datetime) -> dict:
+    row = {"location": location, "bucket": bucket}
+    row.update({c: 0 for c in COUNT_COLUMNS})
+    row.update({c: 0.0 for c in SUM_COLUMNS})
+    row.update({c: None for c in MAX_COLUMNS})
+    return row
+
+
+def _fold(row: dict, prediction):
+    """Add one prediction (ORM object or row with the same attribute names) to a partial rollup."""
+    row["n"] += 1
+    risk = (prediction.risk_level or "").lower()
+    if risk in RISK_LEVELS:
+        row[f"risk_{risk}"] += 1
+    severity = (prediction.severity or "").lower()
+    if severity in SEVERITIES:
+        row[f"severity_{severity}"] += 1
+    for feature in FEATURES:
+        value = getattr(prediction, feature)
+        if value is None:
+            continue
+        row[f"{feature}_sum"] += value
+        current = row[f"{feature}_max"]
+        row[f"{feature}_max"] = value if current is None else max(current, value)
+
+
+class RollupAggregator:
+    """Maintains the rollup tables from flushes and serves time series from them."""
+
+    def __init__(self):
+        self.registered = False
+
+    def register(self):
+        if not self.registered:
+            event.listen(Session, "after_flush", self._after_flush)
+            self.registered = True
+
+    # ---- Write side ----
+
+    def _after_flush(self, session: Session, flush_context):
+        predictions = [obj for obj in session.new if isinstance(obj, Prediction)]
+        if not predictions:
+            return
+        for granularity, model in GRANULARITIES.items():
+            rows: Dict[tuple, dict] = {}
+            for p in predictions:
+                key = (p.location or "Unknown", bucket_start(p.created_at, granularity))
+                row = rows.get(key)
+                if row is None:
+                    row = rows[key] = _empty_row(*key)
+                _fold(row, p)
+            self.apply(session.connection(), model, list(rows.values()))
+
+    @staticmethod
+    def apply(connection, model, rows):
+        """Merge partial rollup rows into ``model`` with one upsert."""
+        if not rows:
+            return
+        dialect = connection.dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        greatest = func.greatest if dialect == "postgresql" else func.max  # scalar max() in SQLite
+        stmt = insert(model)
+        set_ = {c: getattr(model, c) + getattr(stmt.excluded, c) for c in COUNT_COLUMNS + SUM_COLUMNS}
+        set_.update({
+            c: func.coalesce(greatest(getattr(model, c), getattr(stmt.excluded, c)),
+                             getattr(model, c), getattr(stmt.excluded, c))
+            for c in MAX_COLUMNS
+        })
+        connection.execute(
+            stmt.on_conflict_do_update(index_elements=[model.location, model.bucket], set_=set_),
+            rows,
+        )
+
+    # ---- Read side ----
+
+    @staticmethod
+    def timeseries_statement(granularity: str, location: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None):
+        """
+        Rollup rows in bucket order for one location, or merged across all
+        locations (sums added, maxima maxed) when ``location`` is None.
+        """
+        model = GRANULARITIES[granularity]
+        if location is not None:
+            stmt = select(model.bucket, *(getattr(model, c) for c in COUNT_COLUMNS + SUM_COLUMNS + MAX_COLUMNS))
+            stmt = stmt.where(model.location == location)
+        else:
+            stmt = select(
+                model.bucket,
+                *(func.sum(getattr(model, c)).label(c) for c in COUNT_COLUMNS + SUM_COLUMNS),
+                *(func.max(getattr(model, c)).label(c) for c in MAX_COLUMNS),
+            ).group_by(model.bucket)
+        if since is not None:
+            stmt = stmt.where(model.bucket >= bucket_start(since, granularity))
+        if until is not None:
+            stmt = stmt.where(model.bucket < as_utc_naive(until))
+        return stmt.order_by(model.bucket)
+
+    @staticmethod
+    def to_points(rows) -> list:
+        """Chart points with per-feature means derived from the stored sums."""
+        points = []
+        for row in rows:
+            m = row._mapping
+            n = m["n"] or 0
+            point = {"bucket": m["bucket"].isoformat(), "n": n}
+            point.update({f"risk_{r}": m[f"risk_{r}"] for r in RISK_LEVELS})
+            point.update({f"severity_{s}": m[f"severity_{s}"] for s in SEVERITIES})
+            for f in FEATURES:
+                point[f"{f}_mean"] = round(m[f"{f}_sum"] / n, 4) if n else None
+                point[f"{f}_max"] = m[f"{f}_max"]
+            points.append(point)
+        return points
+
+    @staticmethod
+    def downsample(points: list, metric: str, max_points: Optional[int]) -> list:
+        """LTTB-reduce ``points`` to ``max_points`` using ``metric`` as the y value."""
+        if not max_points or len(points) <= max_points:
+            return points
+        x = [datetime.fromisoformat(p["bucket"]).timestamp() for p in points]
+        y = [p.get(metric) or 0.0 for p in points]
+        return [points[i] for i in lttb(x, y, max_points).tolist()]
+
+    # ---- Backfill ----
+
+    def backfill(self, db: Session, archive=None) -> dict:
+        """
+        Rebuild both rollup tables from the predictions table and the
+        archived months in one transaction.
+        """
+        counts = {}
+        store = archive or archive_store
+        for granularity, model in GRANULARITIES.items():
+            db.execute(delete(model))
+            rows: Dict[tuple, dict] = {}
+            # Plain column rows (no ORM identity map), streamed in batches
+            hot = db.execute(
+                select(Prediction.location, Prediction.created_at, Prediction.risk_level,
+                       Prediction.severity, *(getattr(Prediction, f) for f in FEATURES))
+                .execution_options(yield_per=5000)
+            )
+            cold = (SimpleNamespace(**row) for row in store.scan())
+            for p in chain(hot, cold):
+                key = (p.location or "Unknown", bucket_start(p.created_at, granularity))
+                row = rows.get(key)
+                if row is None:
+                    row = rows[key] = _empty_row(*key)
+                _fold(row, p)
+            self.apply(db.connection(), model, list(rows.values()))
+            counts[granularity] = len(rows)
+        db.commit()
+        return counts
+
+
+rollup_aggregator = RollupAggregator()
+rollup_aggregator.register()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AquaSentinel analytics rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="Rebuild hourly and daily rollups from predictions and the archive")
+    args = parser.parse_args()
+
+    from app.utils.database import Base, SessionLocal, engine
+
+    if args.command == "backfill":
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            print(rollup_aggregator.backfill(db))
+
+
+if __name__ == "__main__":
+    main()
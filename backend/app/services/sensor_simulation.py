@@ -0,0 +1,153 @@
+"""
+Vectorized water-quality sensor simulation.
+
+The pulse needs one pH and contamination reading per ward, stable for the
+current hour. Instead of seeding a ``random.Random`` per ward per call, the
+whole ward × hour table is drawn in one shot from a NumPy ``Generator``
+seeded by the hour index, cached by hour, and read by position.
+
+The same engine generates synthetic high-rate reading streams (NDJSON) for
+load-testing the ingest and pulse paths.
+
+Usage:
+    python -m app.services.sensor_simulation stream --rate 2000 --seconds 30 > readings.ndjson
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.medical_service import WARD_NAMES
+
+HOUR = 3600
+SIMULATION_SEED = 0xA05E  # Mixed with the hour index so every hour gets its own table
+
+# Known contamination hotspots (substring match on ward name -> added index)
+CONTAMINATION_OFFSETS = {
+    "Singanallur": 0.2,
+    "Podanur": 0.2,
+    "Gandhipuram": 0.15,
+}
+
+
+class SensorTable:
+    """One hour of simulated readings for every ward, stored as parallel arrays."""
+
+    def __init__(self, hour: int, wards: Sequence[str], ph_level: np.ndarray, contamination: np.ndarray):
+        self.hour = hour
+        self.wards = list(wards)
+        self.ph_level = ph_level
+        self.contamination = contamination
+        self._index = {w: i for i, w in enumerate(self.wards)}
+
+    def reading(self, ward: str) -> Dict[str, float]:
+        i = self._index[ward]
+        return {"ph_level": float(self.ph_level[i]), "contamination": float(self.contamination[i])}
+
+
+class SensorSimulator:
+    """Generates and caches hour-keyed sensor tables for a fixed ward list."""
+
+    def __init__(self, wards: Sequence[str] = WARD_NAMES, keep_hours: int = 2):
+        self.wards = list(wards)
+        self.keep_hours = keep_hours
+        self._offsets = np.array([
+            sum(v for k, v in CONTAMINATION_OFFSETS.items() if k in w) for w in self.wards
+        ])
+        self._tables: "OrderedDict[int, SensorTable]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_hour(ts: Optional[float] = None) -> int:
+        return int((ts if ts is not None else time.time()) // HOUR)
+
+    def table(self, hour: Optional[int] = None) -> SensorTable:
+        """Sensor table for ``hour`` (defaults to now), generated on first use."""
+        hour = self.current_hour() if hour is None else hour
+        table = self._tables.get(hour)
+        if table is not None:
+            return table
+        with self._lock:
+            table = self._tables.get(hour)
+            if table is None:
+                table = self._generate(hour)
+                self._tables[hour] = table
+                while len(self._tables) > self.keep_hours:
+                    self._tables.popitem(last=False)
+        return table
+
+    def _generate(self, hour: int) -> SensorTable:
+        rng = np.random.default_rng([SIMULATION_SEED, hour])
+        n = len(self.wards)
+        ph_level = 7.0 + rng.uniform(-0.5, 0.5, n)
+        contamination = 0.1 + rng.uniform(0.0, 0.3, n) + self._offsets
+        return SensorTable(hour, self.wards, ph_level, contamination)
+
+    # ---- Load-testing streams ----
+
+    def synthetic_batch(self, size: int, rng: np.random.Generator) -> List[dict]:
+        """
+        ``size`` random prediction inputs spanning low to high risk, drawn with
+        vectorized calls and shaped like ``PredictionInput``.
+        """
+        ward_idx = rng.integers(0, len(self.wards), size)
+        rainfall = rng.gamma(2.0, 60.0, size).clip(0, 600)
+        ph_level = rng.normal(6.8, 0.8, size).clip(3.5, 9.5)
+        contamination = rng.beta(2.0, 5.0, size)
+        cases_count = rng.poisson(15 + 60 * contamination)
+        columns = zip(
+            np.round(rainfall, 2).tolist(), np.round(ph_level, 2).tolist(),
+            np.round(contamination, 3).tolist(), cases_count.tolist(), ward_idx.tolist(),
+        )
+        return [
+            {"rainfall": r, "ph_level": p, "contamination": c, "cases_count": k, "location": self.wards[w]}
+            for r, p, c, k, w in columns
+        ]
+
+    def stream(self, rate: float, seconds: float, batch_size: int = 500,
+               seed: Optional[int] = None) -> Iterator[List[dict]]:
+        """
+        Yield batches of synthetic readings paced to ``rate`` readings/second
+        for ``seconds`` (``rate <= 0`` means as fast as possible).
+        """
+        rng = np.random.default_rng(seed)
+        total = int(rate * seconds) if rate > 0 else int(seconds)
+        started = time.perf_counter()
+        sent = 0
+        while sent < total:
+            size = min(batch_size, total - sent)
+            yield self.synthetic_batch(size, rng)
+            sent += size
+            if rate > 0:
+                ahead = sent / rate - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+sensor_simulator = SensorSimulator()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic sensor stream generator")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stream = sub.add_parser("stream", help="Write synthetic readings as NDJSON to stdout")
+    stream.add_argument("--rate", type=float, default=1000.0, help="Readings per second (0 = unpaced)")
+    stream.add_argument("--seconds", type=float, default=10.0,
+                        help="Duration; with --rate 0 this is the total row count")
+    stream.add_argument("--batch-size", type=int, default=500)
+    stream.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    out = sys.stdout
+    for batch in sensor_simulator.stream(args.rate, args.seconds, args.batch_size, args.seed):
+        out.write("".join(json.dumps(row) + "\n" for row in batch))
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
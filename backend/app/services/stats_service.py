@@ -0,0 +1,271 @@
+"""
+Incrementally maintained dashboard statistics.
+
+Instead of counting, grouping and averaging the whole history on every
+``/stats`` call, running totals live in two small tables:
+
+  - ``stats_counters``: one row per key — totals, per-risk and per-trend
+    counts, and the confidence sum/count behind the average.
+  - ``stats_daily``: predictions per UTC day, for ``predictions_today``.
+
+A session ``after_flush`` hook turns every flushed Prediction / Alert insert,
+delete and ``is_resolved`` change into counter deltas and applies them on the
+same connection, so the stats commit (or roll back) with the rows they
+describe — whichever code path wrote them. Reading the stats is a handful of
+primary-key lookups regardless of history size.
+
+Every applied delta also bumps the ``generation`` counter, which versions the
+summary for conditional GETs (one key lookup answers "has anything changed?").
+
+Counters are lifetime totals: predictions archived out of the hot table
+(app.services.archive_service) still count. ``reconcile`` rebuilds both
+tables from scratch, from the hot tables plus the archive files:
+    python -m app.services.stats_service reconcile
+"""
+import argparse
+import logging
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.prediction import Prediction, Alert
+from app.models.stats import StatsCounter, StatsDaily
+from app.services.archive_service import archive_store
+
+logger = logging.getLogger("aqua-sentinel")
+
+
+def utc_day(value: Optional[datetime]) -> date:
+    """UTC calendar day of a timestamp (naive values are already UTC)."""
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _upsert(dialect_name: str):
+    """Dialect-specific INSERT that supports ON CONFLICT DO UPDATE."""
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+class StatsAggregator:
+    """Collects counter deltas from flushes and applies them in the flushing transaction."""
+
+    def __init__(self):
+        self.registered = False
+
+    def register(self):
+        if not self.registered:
+            event.listen(Session, "after_flush", self._after_flush)
+            self.registered = True
+
+    # ---- Write side ----
+
+    @staticmethod
+    def _prediction_deltas(prediction: Prediction, sign: int, counters: Counter, daily: Counter):
+        counters["total_predictions"] += sign
+        counters[f"risk:{prediction.risk_level}"] += sign
+        if prediction.trend is not None:
+            counters[f"trend:{prediction.trend}"] += sign
+        if prediction.confidence is not None:
+            counters["confidence_sum"] += sign * prediction.confidence
+            counters["confidence_count"] += sign
+        daily[utc_day(prediction.created_at)] += sign
+
+    def _after_flush(self, session: Session, flush_context):
+        counters: Counter = Counter()
+        daily: Counter = Counter()
+
+        for obj in session.new:
+            if isinstance(obj, Prediction):
+                self._prediction_deltas(obj, 1, counters, daily)
+            elif isinstance(obj, Alert):
+                counters["total_alerts"] += 1
+                if obj.is_resolved:
+                    counters["resolved_alerts"] += 1
+
+        for obj in session.dirty:
+            if isinstance(obj, Alert):
+                history = inspect(obj).attrs.is_resolved.history
+                if history.added:
+                    was = bool(history.deleted[0]) if history.deleted else False
+                    now = bool(history.added[0])
+                    if was != now:
+                        counters["resolved_alerts"] += 1 if now else -1
+
+        for obj in session.deleted:
+            if isinstance(obj, Prediction):
+                self._prediction_deltas(obj, -1, counters, daily)
+            elif isinstance(obj, Alert):
+                counters["total_alerts"] -= 1
+                if obj.is_resolved:
+                    counters["resolved_alerts"] -= 1
+
+        counters = {k: v for k, v in counters.items() if v}
+        daily = {k: v for k, v in daily.items() if v}
+        if counters or daily:
+            counters["generation"] = 1
+            self.apply(session.connection(), counters, daily)
+
+    @staticmethod
+    def apply(connection, counters: dict, daily: dict):
+        """Add ``counters`` / ``daily`` deltas with one upsert per table."""
+        insert = _upsert(connection.dialect.name)
+        if counters:
+            stmt = insert(StatsCounter)
+            connection.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[StatsCounter.key],
+                    set_={"value": StatsCounter.value + stmt.excluded.value},
+                ),
+                [{"key": k, "value": float(v)} for k, v in counters.items()],
+            )
+        if daily:
+            stmt = insert(StatsDaily)
+            connection.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[StatsDaily.day],
+                    set_={"predictions": StatsDaily.predictions + stmt.excluded.predictions},
+                ),
+                [{"day": d, "predictions": int(n)} for d, n in daily.items()],
+            )
+
+    # ---- Read side ----
+
+    @staticmethod
+    def statements(today: Optional[date] = None) -> dict:
+        """The (constant-cost) queries behind the dashboard summary."""
+        today = today or datetime.now(timezone.utc).date()
+        return {
+            "counters": select(StatsCounter.key, StatsCounter.value),
+            "today": select(StatsDaily.predictions).where(StatsDaily.day == today),
+            # Recent unique locations (last 20 predictions, newest-first index walk)
+            "recent": select(Prediction.location).order_by(Prediction.created_at.desc()).limit(20),
+        }
+
+    @staticmethod
+    def generation_statement():
+        return select(StatsCounter.value).where(StatsCounter.key == "generation")
+
+    @staticmethod
+    def etag(generation: Optional[float], today: Optional[date] = None) -> str:
+        """Validator for the summary: its generation plus the day (``predictions_today`` rolls over)."""
+        today = today or datetime.now(timezone.utc).date()
+        return f'"stats-{int(generation or 0)}-{today.isoformat()}"'
+
+    @staticmethod
+    def assemble(counter_rows, today_count: Optional[int], recent_rows) -> dict:
+        c = {key: value for key, value in counter_rows}
+        total_alerts = int(c.get("total_alerts", 0))
+        resolved = int(c.get("resolved_alerts", 0))
+        confidence_count = c.get("confidence_count", 0)
+        avg_confidence = c.get("confidence_sum", 0) / confidence_count if confidence_count else None
+        return {
+            "total_predictions": int(c.get("total_predictions", 0)),
+            "total_alerts": total_alerts,
+            "active_alerts": total_alerts - resolved,
+            "resolved_alerts": resolved,
+            "risk_distribution": {k[5:]: int(v) for k, v in c.items() if k.startswith("risk:") and v},
+            "trend_distribution": {k[6:]: int(v) for k, v in c.items() if k.startswith("trend:") and v},
+            "avg_confidence": round(avg_confidence, 4) if avg_confidence else None,
+            "recent_locations": list({r[0] for r in recent_rows if r[0] and r[0] != "Unknown"}),
+            "predictions_today": int(today_count or 0),
+        }
+
+    # ---- Reconcile ----
+
+    @staticmethod
+    def _archived_totals(store, counters: Counter, daily: Counter):
+        """Fold the archived months' columns into ``counters`` / ``daily``."""
+        for data in store.column_arrays():
+            counters["total_predictions"] += len(data["id"])
+            for column, prefix in (("risk_level", "risk:"), ("trend", "trend:")):
+                codes = data[f"{column}.codes"]
+                values = data[f"{column}.values"].tolist()
+                for value, count in zip(values, np.bincount(codes[codes >= 0], minlength=len(values)).tolist()):
+                    counters[f"{prefix}{value}"] += count
+            confidence = data["confidence"]
+            known = ~np.isnan(confidence)
+            counters["confidence_sum"] += float(confidence[known].sum())
+            counters["confidence_count"] += int(known.sum())
+            created = data["created_at"]
+            days, counts = np.unique(created[~np.isnat(created)].astype("datetime64[D]"), return_counts=True)
+            for day, count in zip(days.tolist(), counts.tolist()):
+                daily[day] += count
+            counters["total_alerts"] += len(data["alert.id"])
+            counters["resolved_alerts"] += int(data["alert.is_resolved"].sum())
+
+    def reconcile(self, db: Session, archive=None) -> dict:
+        """
+        Recompute every counter from the base tables (and the archive) and
+        replace the stats in one transaction. The DELETE comes first so the
+        transaction holds the write lock before reading, and no concurrent
+        write slips in between. The generation moves forward, never back.
+        """
+        generation = db.execute(self.generation_statement()).scalar() or 0
+        db.execute(delete(StatsCounter))
+        db.execute(delete(StatsDaily))
+
+        counters: Counter = Counter()
+        grouped = db.execute(
+            select(Prediction.risk_level, Prediction.trend, func.count(Prediction.id),
+                   func.sum(Prediction.confidence), func.count(Prediction.confidence))
+            .group_by(Prediction.risk_level, Prediction.trend)
+        ).all()
+        for risk_level, trend, count, confidence_sum, confidence_count in grouped:
+            counters["total_predictions"] += count
+            counters[f"risk:{risk_level}"] += count
+            if trend is not None:
+                counters[f"trend:{trend}"] += count
+            counters["confidence_sum"] += confidence_sum or 0.0
+            counters["confidence_count"] += confidence_count
+
+        for is_resolved, count in db.execute(
+            select(Alert.is_resolved, func.count(Alert.id)).group_by(Alert.is_resolved)
+        ).all():
+            counters["total_alerts"] += count
+            if is_resolved:
+                counters["resolved_alerts"] += count
+
+        daily: Counter = Counter({
+            date.fromisoformat(str(day)[:10]): count
+            for day, count in db.execute(
+                select(func.date(Prediction.created_at), func.count(Prediction.id))
+                .group_by(func.date(Prediction.created_at))
+            ).all()
+            if day is not None
+        })
+        self._archived_totals(archive or archive_store, counters, daily)
+        counters["generation"] = generation + 1
+
+        self.apply(db.connection(), {k: v for k, v in counters.items() if v}, dict(daily))
+        db.commit()
+        return {"counters": len(counters), "days": len(daily)}
+
+
+stats_aggregator = StatsAggregator()
+stats_aggregator.register()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AquaSentinel dashboard statistics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("reconcile", help="Rebuild the stats tables from predictions and alerts")
+    args = parser.parse_args()
+
+    from app.utils.database import Base, SessionLocal, engine
+
+    if args.command == "reconcile":
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            print(stats_aggregator.reconcile(db))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Caching primitives for upstream weather calls.
+
+``WeatherCache`` keeps the last good reading per key with its fetch time so
+callers can tell fresh from stale data. ``CircuitBreaker`` stops calling an
+upstream that keeps failing and lets a single probe through after a cooldown.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker: CLOSED -> OPEN after ``failure_threshold``
+    consecutive failures, OPEN -> HALF_OPEN once ``reset_timeout`` seconds have
+    passed (one probe allowed), HALF_OPEN -> CLOSED on success or back to OPEN.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        """Whether the caller may hit the upstream right now."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+            # Cooldown elapsed — let exactly one probe through
+            self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class WeatherCache:
+    """
+    Keyed store of the latest successful reading per location.
+    Entries are never evicted by age here; the service decides whether an
+    entry is fresh, stale-but-servable or too old. At most ``max_entries``
+    keys are kept, least recently used evicted first.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_entries: int = 256):
+        self._clock = clock
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[dict, float]]:
+        """Return ``(data, age_seconds)`` or ``None`` if nothing is cached."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        data, fetched_at = entry
+        return data, self._clock() - fetched_at
+
+    def set(self, key: Hashable, data: dict):
+        self._entries[key] = (data, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
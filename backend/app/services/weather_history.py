@@ -0,0 +1,178 @@
+"""
+Rolling rainfall history per weather grid cell.
+
+Each cell owns a ring buffer of hourly rainfall buckets (one week deep) and a
+running sum for every aggregation window. Advancing the clock subtracts only
+the bucket that falls out of each window, so reading ``rain_1h`` ... ``rain_7d``
+is O(1) regardless of how many readings were recorded.
+
+The whole store is a handful of NumPy arrays and persists to a single ``.npz``
+file, which reloads in milliseconds at startup.
+"""
+import os
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger("aqua-sentinel")
+
+HOUR = 3600
+RING_HOURS = 168  # 7 days of hourly buckets
+
+# Window name -> length in hours. Order matches the columns of ``_sums``.
+WINDOWS = {"rain_1h": 1, "rain_24h": 24, "rain_72h": 72, "rain_7d": 168}
+_WINDOW_HOURS = np.array(list(WINDOWS.values()), dtype=np.int64)
+
+
+class WeatherHistoryStore:
+    """Append-only hourly rainfall series with incremental windowed sums."""
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 300.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._index: Dict[Tuple[float, float], int] = {}
+        self._cells = np.zeros((0, 2), dtype=np.float64)
+        self._head = np.zeros(0, dtype=np.int64)        # latest hour index per cell
+        self._first = np.zeros(0, dtype=np.int64)       # first recorded hour per cell
+        self._buckets = np.zeros((0, RING_HOURS), dtype=np.float32)
+        self._sums = np.zeros((0, len(WINDOWS)), dtype=np.float64)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    # ---- Recording ----
+
+    def record(self, cell: Tuple[float, float], rainfall: float, ts: Optional[float] = None):
+        """
+        Fold a reading into the bucket for its hour. ``rain.1h`` readings overlap
+        when polled more than once an hour, so a bucket keeps the max seen.
+        """
+        hour = int((ts if ts is not None else time.time()) // HOUR)
+        i = self._slot(cell, hour)
+        self._advance(i, hour)
+        if hour < self._head[i] - RING_HOURS + 1:
+            return  # Older than the ring — nothing to update
+
+        slot = hour % RING_HOURS
+        old = float(self._buckets[i, slot])
+        new = max(old, float(rainfall or 0.0))
+        if new != old:
+            self._buckets[i, slot] = new
+            # The bucket belongs to every window that still covers its hour
+            age = self._head[i] - hour
+            self._sums[i, _WINDOW_HOURS > age] += new - old
+            self._dirty = True
+        self.maybe_flush()
+
+    def aggregates(self, cell: Tuple[float, float], ts: Optional[float] = None) -> Optional[dict]:
+        """Rolling rainfall totals (mm) for the cell, or None if it has no history."""
+        i = self._index.get(cell)
+        if i is None:
+            return None
+        self._advance(i, int((ts if ts is not None else time.time()) // HOUR))
+        result = {name: round(float(v), 2) for name, v in zip(WINDOWS, self._sums[i])}
+        result["hours_covered"] = int(min(self._head[i] - self._first[i] + 1, RING_HOURS))
+        return result
+
+    def _slot(self, cell: Tuple[float, float], hour: int) -> int:
+        i = self._index.get(cell)
+        if i is not None:
+            return i
+        i = len(self._index)
+        if i == len(self._head):
+            self._grow(max(8, 2 * len(self._head)))
+        self._index[cell] = i
+        self._cells[i] = cell
+        self._head[i] = hour
+        self._first[i] = hour
+        return i
+
+    def _grow(self, capacity: int):
+        extra = capacity - len(self._head)
+        self._cells = np.vstack([self._cells, np.zeros((extra, 2))])
+        self._head = np.concatenate([self._head, np.zeros(extra, dtype=np.int64)])
+        self._first = np.concatenate([self._first, np.zeros(extra, dtype=np.int64)])
+        self._buckets = np.vstack([self._buckets, np.zeros((extra, RING_HOURS), dtype=np.float32)])
+        self._sums = np.vstack([self._sums, np.zeros((extra, len(WINDOWS)))])
+
+    def _advance(self, i: int, hour: int):
+        """Move cell ``i`` forward to ``hour``, expiring buckets that leave each window."""
+        head = int(self._head[i])
+        if hour <= head:
+            return
+        if hour - head >= RING_HOURS:
+            self._buckets[i] = 0.0
+            self._sums[i] = 0.0
+        else:
+            buckets, sums = self._buckets[i], self._sums[i]
+            for h in range(head + 1, hour + 1):
+                # Hour h - w drops out of a w-hour window when h enters it
+                sums -= buckets[(h - _WINDOW_HOURS) % RING_HOURS]
+                buckets[h % RING_HOURS] = 0.0
+            np.maximum(sums, 0.0, out=sums)  # absorb float drift
+        self._head[i] = hour
+        self._dirty = True
+
+    # ---- Persistence ----
+
+    def load(self) -> bool:
+        """Reload the store from ``path``. Returns False if there is nothing to load."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as data:
+                cells = data["cells"]
+                self._cells = cells.astype(np.float64)
+                self._head = data["head"].astype(np.int64)
+                self._first = data["first"].astype(np.int64)
+                self._buckets = data["buckets"].astype(np.float32)
+                self._sums = data["sums"].astype(np.float64)
+        except Exception as e:
+            logger.error(f"Weather history could not be loaded from {self.path}: {e}")
+            return False
+        self._index = {(float(lat), float(lon)): i for i, (lat, lon) in enumerate(cells)}
+        self._dirty = False
+        logger.info(f"Weather history loaded: {len(self._index)} grid cells")
+        return True
+
+    def save(self):
+        """Atomically write the store to ``path``."""
+        if not self.path:
+            return
+        n = len(self._index)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                cells=self._cells[:n], head=self._head[:n], first=self._first[:n],
+                buckets=self._buckets[:n], sums=self._sums[:n],
+            )
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        """Persist if there are unsaved changes."""
+        if not self._dirty:
+            return
+        try:
+            self.save()
+        except OSError as e:
+            logger.error(f"Weather history flush failed: {e}")
+
+    def maybe_flush(self):
+        """Persist if there are unsaved changes and the flush interval has passed."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+weather_history = WeatherHistoryStore(
+    settings.abs_weather_history_path,
+    flush_interval=settings.WEATHER_HISTORY_FLUSH_SECONDS,
+)
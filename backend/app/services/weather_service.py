@@ -1,61 +1,193 @@
+import asyncio
 import httpx
 import logging
+from typing import Optional
 from app.core.config import settings
+from app.services.weather_cache import WeatherCache, CircuitBreaker
+from app.services.weather_history import WeatherHistoryStore, weather_history
+from app.services.medical_service import WARD_COORDS
 
 logger = logging.getLogger("aqua-sentinel")
 
 class WeatherService:
     """
     🌍 Real-Time Weather Service
-    Fetches live data for Coimbatore, Tamil Nadu.
+    Fetches live data for Coimbatore, Tamil Nadu, resolved per geo-grid cell
+    so distant wards (Pollachi, Mettupalayam) get their own reading.
+    Readings are cached for ``WEATHER_CACHE_TTL`` seconds, served stale while a
+    background refresh runs, and a circuit breaker skips the upstream entirely
+    after repeated failures. Every live reading is appended to the rolling
+    rainfall history so responses carry 1h/24h/72h/7d totals (history is only
+    kept for cells that contain a known ward, so ad-hoc lookups cannot grow it).
     Provides fallback climate data if API is unavailable.
     """
-    
+
     COIMBATORE_LAT = 11.0168
     COIMBATORE_LON = 76.9558
-    
-    def __init__(self):
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 timeout: Optional[float] = None, cache_ttl: Optional[float] = None,
+                 max_stale: Optional[float] = None,
+                 history: Optional[WeatherHistoryStore] = None):
         # OpenWeatherMap is a standard choice for government datasets
-        self.api_key = getattr(settings, "WEATHER_API_KEY", None)
-        self.base_url = "https://api.openweathermap.org/data/2.5/weather"
+        self.api_key = api_key or getattr(settings, "WEATHER_API_KEY", None)
+        self.base_url = base_url or settings.WEATHER_API_URL
+        self.timeout = timeout if timeout is not None else settings.WEATHER_API_TIMEOUT
+        self.cache_ttl = cache_ttl if cache_ttl is not None else settings.WEATHER_CACHE_TTL
+        self.max_stale = max_stale if max_stale is not None else settings.WEATHER_CACHE_MAX_STALE
+        self.grid_deg = settings.WEATHER_GRID_DEG
+        self.max_concurrency = max(1, settings.WEATHER_MAX_CONCURRENCY)
+        self.cache = WeatherCache(max_entries=settings.WEATHER_CACHE_MAX_ENTRIES)
+        self.history = history if history is not None else weather_history
+        self.ward_cells = {self.grid_cell(lat, lon) for lat, lon in WARD_COORDS.values()}
+        self.ward_cells.add(self.grid_cell(self.COIMBATORE_LAT, self.COIMBATORE_LON))
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.WEATHER_BREAKER_FAILURES,
+            reset_timeout=settings.WEATHER_BREAKER_COOLDOWN,
+        )
+        # One in-flight upstream call per key; concurrent callers share it
+        self._inflight = {}
+        self._last_error = "Upstream unavailable"
+
+    def grid_cell(self, lat: float, lon: float) -> tuple:
+        """Snap a coordinate onto the weather geo-grid (cell centre)."""
+        res = self.grid_deg
+        return (round(round(lat / res) * res, 4), round(round(lon / res) * res, 4))
+
+    @staticmethod
+    def in_district(lat: float, lon: float) -> bool:
+        """Whether (lat, lon) lies inside the configured district bounding box."""
+        return (settings.WEATHER_LAT_MIN <= lat <= settings.WEATHER_LAT_MAX
+                and settings.WEATHER_LON_MIN <= lon <= settings.WEATHER_LON_MAX)
 
     async def get_current_weather(self) -> dict:
-        """Fetch current weather for Coimbatore."""
+        """Fetch current weather for Coimbatore (cached)."""
+        return await self.get_weather_at(self.COIMBATORE_LAT, self.COIMBATORE_LON)
+
+    async def get_weather_at(self, lat: float, lon: float) -> dict:
+        """Fetch current weather for the grid cell containing (lat, lon)."""
         if not self.api_key:
             return self._get_fallback_data("OpenWeather API Key not configured. Using climate normals.")
 
+        key = self.grid_cell(lat, lon)
+        cached = self.cache.get(key)
+
+        if cached is not None:
+            data, age = cached
+            if age < self.cache_ttl:
+                return self._annotate(key, data, "fresh", age)
+            if age < self.cache_ttl + self.max_stale:
+                # Stale-while-revalidate: answer now, refresh in the background
+                self._refresh(key)
+                return self._annotate(key, data, "stale", age)
+
+        data = await self._refresh(key)
+        if data is not None:
+            return self._annotate(key, data, "live", 0.0)
+        if cached is not None:
+            # Upstream down and entry past max-stale — still better than normals
+            return self._annotate(key, cached[0], "expired", cached[1])
+        return self._get_fallback_data(self._failure_reason())
+
+    async def get_weather_for_locations(self, coords: dict) -> dict:
+        """
+        Resolve weather for many named locations at once.
+        ``coords`` maps name -> (lat, lon). Locations are deduplicated onto grid
+        cells and the cells are fetched concurrently (at most
+        ``max_concurrency`` upstream calls at a time). Returns name -> reading.
+        """
+        cells = {}
+        for name, (lat, lon) in coords.items():
+            cells.setdefault(self.grid_cell(lat, lon), []).append(name)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def resolve(cell):
+            async with semaphore:
+                return await self.get_weather_at(*cell)
+
+        readings = await asyncio.gather(*(resolve(cell) for cell in cells))
+
+        results = {}
+        for (cell, names), reading in zip(cells.items(), readings):
+            for name in names:
+                results[name] = reading
+        return results
+
+    def _refresh(self, key) -> "asyncio.Future":
+        """Start (or join) the upstream fetch for ``key``; resolves to data or None."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        return task
+
+    async def _fetch_and_store(self, key) -> Optional[dict]:
+        if not self.breaker.allow_request():
+            return None
+        lat, lon = key
+        data = await self._fetch(lat, lon)
+        if data is None:
+            self.breaker.record_failure()
+            return None
+        self.breaker.record_success()
+        self.cache.set(key, data)
+        if key in self.ward_cells:
+            self.history.record(key, data.get("rainfall", 0))
+        return data
+
+    async def _fetch(self, lat: float, lon: float) -> Optional[dict]:
+        """Single upstream call. Returns the normalized reading or None on failure."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
                 params = {
-                    "lat": self.COIMBATORE_LAT,
-                    "lon": self.COIMBATORE_LON,
+                    "lat": lat,
+                    "lon": lon,
                     "appid": self.api_key,
                     "units": "metric"
                 }
                 response = await client.get(self.base_url, params=params)
-                
+
                 if response.status_code == 200:
                     data = response.json()
                     # Extract fields relevant to AquaSentinel
                     rainfall = data.get("rain", {}).get("1h", 0)  # rain in mm/h
                     temp = data.get("main", {}).get("temp")
                     humidity = data.get("main", {}).get("humidity")
-                    
+
                     return {
                         "rainfall": rainfall,
                         "temperature": temp,
                         "humidity": humidity,
-                        "location": "Coimbatore, Tamil Nadu",
+                        "location": data.get("name") or "Coimbatore, Tamil Nadu",
+                        "grid_cell": [lat, lon],
                         "source": "OpenWeatherMap Real-Time API",
                         "timestamp": data.get("dt")
                     }
                 else:
                     logger.error(f"Weather API Error: {response.status_code} - {response.text}")
-                    return self._get_fallback_data(f"API Error {response.status_code}")
-                    
+                    self._last_error = f"API Error {response.status_code}"
+                    return None
+
         except Exception as e:
             logger.error(f"Weather Service Exception: {e}")
-            return self._get_fallback_data(str(e))
+            self._last_error = str(e) or type(e).__name__
+            return None
+
+    def _failure_reason(self) -> str:
+        if self.breaker.state != CircuitBreaker.CLOSED:
+            return f"Circuit open after {self.breaker.failures} failures"
+        return self._last_error
+
+    def _annotate(self, key, data: dict, status: str, age: float) -> dict:
+        """Copy a cached reading and attach cache provenance and rolling rainfall."""
+        return {
+            **data,
+            **(self.history.aggregates(key) or {}),
+            "cache_status": status,
+            "cache_age_seconds": round(age, 1),
+        }
 
     def _get_fallback_data(self, reason: str) -> dict:
         """Probabilistic climate normals for Coimbatore (Feb-May range)."""
@@ -65,7 +197,9 @@ class WeatherService:
             "humidity": 45,
             "location": "Coimbatore, Tamil Nadu",
             "source": f"Climate Normals (Fallback: {reason})",
-            "is_fallback": True
+            "is_fallback": True,
+            "cache_status": "fallback",
+            "cache_age_seconds": 0.0,
         }
 
 weather_service = WeatherService()
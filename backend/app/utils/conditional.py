@@ -0,0 +1,48 @@
+"""
+HTTP conditional GET helpers (ETag / Last-Modified / 304).
+
+Responses carry a strong ETag (and a Last-Modified where one is known) with
+``Cache-Control: no-cache``, so clients revalidate on every poll and an
+unchanged resource costs an empty 304 instead of a body.
+"""
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def strong_etag(data: bytes) -> str:
+    """Quoted content hash of ``data``."""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def validator_headers(etag: str, last_modified: Optional[float] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    True when the client's cached copy is current. ``If-None-Match`` wins over
+    ``If-Modified-Since`` (RFC 9110 §13.2.2); the date has one-second resolution.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        # Weak comparison, as required for If-None-Match
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
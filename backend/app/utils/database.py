@@ -1,8 +1,14 @@
 """
 Database connection utilities for AquaSentinel AI.
 Uses SQLAlchemy with SQLite for hackathon-friendly zero-config setup.
+
+Two engines share the same database file:
+  - ``engine`` / ``SessionLocal``: blocking, used by sync code and scripts.
+  - ``async_engine`` / ``AsyncSessionLocal``: aiosqlite-backed, used by async
+    route handlers and services so DB waits never block the event loop.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
@@ -18,6 +24,43 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Storage profile for every new SQLite connection (WAL, sync level, caches)."""
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")      # 64 MiB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")    # 256 MiB memory-mapped reads
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync DB URL onto its async driver (sqlite -> sqlite+aiosqlite)."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:"):
+        return "postgresql+asyncpg:" + url[len("postgresql:"):]
+    return url
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+# expire_on_commit=False: committed rows are serialized after the commit and
+# must not trigger lazy refreshes (which cannot run implicitly under asyncio)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+if async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+
 def get_db():
     """Dependency: yields a DB session and ensures cleanup."""
     db = SessionLocal()
@@ -25,3 +68,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency: yields an async DB session and ensures cleanup."""
+    async with AsyncSessionLocal() as db:
+        yield db
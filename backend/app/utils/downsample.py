@@ -0,0 +1,40 @@
+"""
+Largest-Triangle-Three-Buckets (LTTB) downsampling for chart series.
+
+Keeps the first and last points and, from each of ``threshold - 2`` equal
+buckets in between, the point that forms the largest triangle with the point
+kept from the previous bucket and the mean of the next bucket — preserving
+peaks and troughs far better than striding or averaging.
+"""
+import numpy as np
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """Indices (ascending) of at most ``threshold`` points of the series (x, y) to keep."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1][:max(threshold, 0)], dtype=np.int64)
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt_start, nxt_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        if nxt_end <= nxt_start:
+            nxt_end = min(n, nxt_start + 1)
+        avg_x = x[nxt_start:nxt_end].mean()
+        avg_y = y[nxt_start:nxt_end].mean()
+        # Twice the triangle areas for every candidate in this bucket
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(areas.argmax())
+        keep[i + 1] = a
+    return keep
@@ -0,0 +1,163 @@
+"""
+In-process latency histograms and runtime gauges in Prometheus text format.
+
+Hot paths time their stages with ``stage("name").time()`` (a context manager)
+or ``perf_counter()`` around the code and ``observe(seconds)``; an
+observation is a bisect into fixed buckets and two additions, a fraction of
+a microsecond (``python -m benchmarks.bench_metrics``). Counters and gauges
+that already live on service objects (cache hits, queue depths) are not
+duplicated: ``gauge`` / ``counter`` register callbacks read only when
+``/metrics`` is scraped.
+
+A stage can also carry a Server-Timing category (db, model, explain, llm,
+serialize): its observations are then added to the current request's
+``request_timings`` too, when the Server-Timing middleware has set one.
+"""
+import threading
+from contextvars import ContextVar
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# Seconds; from sub-millisecond feature engineering up to LLM calls
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Samples = Union[float, Dict[Tuple[Tuple[str, str], ...], float]]
+
+# Seconds per Server-Timing category for the request being handled (None outside one)
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: "Histogram"):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(perf_counter() - self._start)
+        return False
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Observations are not locked: a lock
+    would double the cost of a timer, and under the GIL a lost update needs
+    a thread switch inside one ``+=`` while another thread observes the
+    same stage, which at worst drops a single sample.
+    """
+    __slots__ = ("bounds", "counts", "sum", "category")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS, category: Optional[str] = None):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot: above every bound
+        self.sum = 0.0
+        self.category = category
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        if self.category is not None:
+            timings = request_timings.get()
+            if timings is not None:
+                timings[self.category] = timings.get(self.category, 0.0) + seconds
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def cumulative(self) -> List[int]:
+        total, out = 0, []
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+
+def _label_text(labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Stage histograms plus scrape-time callback metrics, rendered on demand."""
+
+    def __init__(self, namespace: str = "aquasentinel"):
+        self.namespace = namespace
+        self._stages: Dict[str, Histogram] = {}
+        self._callbacks: List[Tuple[str, str, str, Callable[[], Samples]]] = []
+        self._lock = threading.Lock()
+
+    def stage(self, name: str, category: Optional[str] = None) -> Histogram:
+        """The latency histogram for one named stage (created on first use)."""
+        histogram = self._stages.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(name, Histogram(category=category))
+        return histogram
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Samples]):
+        """A value (or {labels: value}) read from ``fn`` at scrape time."""
+        self._callbacks.append((f"{self.namespace}_{name}", "gauge", help, fn))
+
+    def counter(self, name: str, help: str, fn: Callable[[], Samples]):
+        self._callbacks.append((f"{self.namespace}_{name}", "counter", help, fn))
+
+    def render(self) -> str:
+        name = f"{self.namespace}_stage_seconds"
+        lines = [f"# HELP {name} Wall time per request stage.", f"# TYPE {name} histogram"]
+        for stage in sorted(self._stages):
+            histogram = self._stages[stage]
+            cumulative, total = histogram.cumulative(), histogram.sum
+            count = cumulative[-1]
+            for bound, value in zip(histogram.bounds + (float("inf"),), cumulative):
+                labels = _label_text((("stage", stage), ("le", _number(bound))))
+                lines.append(f"{name}_bucket{labels} {value}")
+            labels = _label_text((("stage", stage),))
+            lines.append(f"{name}_sum{labels} {_number(total)}")
+            lines.append(f"{name}_count{labels} {count}")
+
+        for metric, kind, help, fn in self._callbacks:
+            try:
+                samples = fn()
+            except Exception:
+                continue
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} {kind}")
+            if not isinstance(samples, dict):
+                samples = {(): samples}
+            for labels, value in samples.items():
+                if value is not None:
+                    lines.append(f"{metric}{_label_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def stage(name: str, category: Optional[str] = None) -> Histogram:
+    return metrics.stage(name, category)
+
+
+def observe(name: str, seconds: float):
+    metrics.stage(name).observe(seconds)
+
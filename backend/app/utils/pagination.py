@@ -0,0 +1,60 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Listings are ordered newest first on ``(created_at, id)``. A page ends with
+an opaque cursor that encodes the last row's key; the next page asks for rows
+strictly below it, which an index on ``created_at`` (or ``<filter>,
+created_at``) answers with a single seek — page N costs the same as page 1.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_
+
+Cursor = Tuple[datetime, int]
+
+# Response header carrying the next page's cursor (the body stays a plain list)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque, URL-safe token for the key of the last row on a page."""
+    payload = json.dumps([as_utc_naive(created_at).isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Inverse of :func:`encode_cursor`. Raises ValueError for a malformed token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+
+
+def as_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC; normalize aware values to match."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def keyset_page(stmt, model, limit: int, after: Optional[Cursor] = None):
+    """Order ``stmt`` newest first on (created_at, id) and start below ``after``."""
+    if after is not None:
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(after[0], after[1]))
+    # One extra row tells whether another page follows
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """``(page, next_cursor)`` from a ``limit + 1`` fetch; next_cursor is None on the last page."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
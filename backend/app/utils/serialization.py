@@ -0,0 +1,128 @@
+"""
+Fast response encoding for list and batch endpoints.
+
+List endpoints read plain column tuples (no ORM objects, no per-row Pydantic
+validation) and encode them here in one pass. The format follows the
+request's ``Accept`` header:
+
+  - ``application/json`` (default): orjson when installed, else the stdlib.
+  - ``application/msgpack``: needs ``msgpack``; timestamps as ISO strings.
+  - ``application/vnd.apache.arrow.stream``: Arrow IPC stream, one record
+    batch, columnar; needs ``pyarrow``. Flat tables only.
+
+Binary formats are optional dependencies and are only offered when their
+library imports.
+"""
+import json
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Sequence
+
+from app.utils.metrics import stage
+
+_ENCODE_DOCUMENT = stage("serialize.document", "serialize")
+_ENCODE_ROWS = stage("serialize.rows", "serialize")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.apache.arrow.file": ARROW}
+
+
+def available_formats(tabular: bool = True) -> List[str]:
+    """Media types this process can produce (Arrow only for flat tables)."""
+    formats = [JSON]
+    if msgpack is not None:
+        formats.append(MSGPACK)
+    if tabular and pyarrow is not None:
+        formats.append(ARROW)
+    return formats
+
+
+def negotiate(accept: Optional[str], formats: Sequence[str]) -> Optional[str]:
+    """
+    Best of ``formats`` for an ``Accept`` header (q-values honoured, ties in
+    header order). No header, ``*/*`` or ``application/*`` mean JSON; None
+    means nothing acceptable can be produced (406).
+    """
+    if not accept or not accept.strip():
+        return JSON
+    ranges = []
+    for position, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, position, media.lower()))
+    for _, _, media in sorted(ranges):
+        if media in ("*/*", "application/*"):
+            return JSON
+        media = _ALIASES.get(media, media)
+        if media in formats:
+            return media
+    return None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def dumps_json(obj) -> bytes:
+    """JSON bytes; datetimes as ISO 8601 like the Pydantic response models."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def _encode_document(obj, media_type: str) -> bytes:
+    if media_type == MSGPACK:
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    return dumps_json(obj)
+
+
+def encode_document(obj, media_type: str) -> bytes:
+    """A nested JSON-shaped document as JSON or msgpack."""
+    with _ENCODE_DOCUMENT.time():
+        return _encode_document(obj, media_type)
+
+
+def encode_rows(fields: Sequence[str], rows: Iterable[tuple], media_type: str) -> bytes:
+    """A list of records (``fields`` × ``rows``) in ``media_type``."""
+    with _ENCODE_ROWS.time():
+        return _encode_rows(fields, rows, media_type)
+
+
+def _encode_rows(fields: Sequence[str], rows: Iterable[tuple], media_type: str) -> bytes:
+    if media_type == ARROW:
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [() for _ in fields]
+        table = pyarrow.table({name: list(column) for name, column in zip(fields, columns)})
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    records = [dict(zip(fields, row)) for row in rows]
+    return _encode_document(records, media_type)
@@ -0,0 +1,103 @@
+"""
+Sync vs. async database path benchmark.
+
+Mounts the same service functions behind a blocking ``def`` route (threadpool
++ ``SessionLocal``) and an ``async def`` route (``AsyncSessionLocal``), then
+drives both with concurrent in-process requests and reports throughput and
+tail latency.
+
+Usage:
+    python -m benchmarks.bench_db_paths [--requests 2000] [--concurrency 64]
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import use_temp_database, run_load, print_table
+
+use_temp_database()
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.utils.database import Base, engine, get_db, get_async_db  # noqa: E402
+from app.models.prediction import Prediction  # noqa: E402,F401
+from app.schemas.prediction import PredictionOutput  # noqa: E402
+from app.services.prediction_service import (  # noqa: E402
+    create_prediction, create_prediction_async,
+    get_all_predictions, get_all_predictions_async,
+    get_stats, get_stats_async,
+)
+
+
+def build_app() -> FastAPI:
+    bench = FastAPI()
+
+    @bench.post("/sync/predict", response_model=PredictionOutput)
+    def sync_predict(payload: dict, db: Session = Depends(get_db)):
+        return create_prediction(db, **payload)
+
+    @bench.post("/async/predict", response_model=PredictionOutput)
+    async def async_predict(payload: dict, db: AsyncSession = Depends(get_async_db)):
+        return await create_prediction_async(db, **payload)
+
+    @bench.get("/sync/predictions", response_model=list[PredictionOutput])
+    def sync_list(db: Session = Depends(get_db)):
+        return get_all_predictions(db, limit=100)
+
+    @bench.get("/async/predictions", response_model=list[PredictionOutput])
+    async def async_list(db: AsyncSession = Depends(get_async_db)):
+        return await get_all_predictions_async(db, limit=100)
+
+    @bench.get("/sync/stats")
+    def sync_stats(db: Session = Depends(get_db)):
+        return get_stats(db)
+
+    @bench.get("/async/stats")
+    async def async_stats(db: AsyncSession = Depends(get_async_db)):
+        return await get_stats_async(db)
+
+    return bench
+
+
+def payload(i: int) -> dict:
+    # Mostly model-scored (no rule override) so the ML call is part of the cost
+    return {
+        "rainfall": 50 + (i * 37) % 300,
+        "ph_level": 5.5 + (i % 20) / 10,
+        "contamination": ((i * 13) % 80) / 100,
+        "cases_count": (i * 7) % 70,
+        "location": f"Ward {i % 24}",
+    }
+
+
+async def main(total: int, concurrency: int):
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=build_app())
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, method, path in [
+            ("create", "POST", "predict"),
+            ("list", "GET", "predictions"),
+            ("stats", "GET", "stats"),
+        ]:
+            for mode in ("sync", "async"):
+                url = f"/{mode}/{path}"
+
+                async def request(i, url=url, method=method):
+                    response = await client.request(method, url, json=payload(i) if method == "POST" else None)
+                    response.raise_for_status()
+
+                result = await run_load(request, total, concurrency)
+                rows.append({"endpoint": name, "path": mode, **result})
+
+    print_table(rows, ["endpoint", "path", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
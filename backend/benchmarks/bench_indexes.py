@@ -0,0 +1,148 @@
+"""
+Hot-query latency with and without the access-path indexes.
+
+Bulk-loads ``--rows`` predictions (default 10M, roughly 1/6 of them with an
+alert) through raw ``sqlite3.executemany``, times every hot query on the bare
+tables, builds the indexes from the migration and times the queries again.
+
+Usage:
+    python -m benchmarks.bench_indexes [--rows 10000000] [--locations 500] [--repeat 5]
+"""
+import argparse
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.common import use_temp_database, print_table
+
+db_path = use_temp_database()
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rows", type=int, default=10_000_000)
+parser.add_argument("--locations", type=int, default=500)
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--chunk", type=int, default=200_000)
+args = parser.parse_args()
+
+from sqlalchemy.dialects import sqlite  # noqa: E402
+
+from app.utils.database import Base, engine  # noqa: E402
+from app.models import prediction  # noqa: E402,F401
+from app.services.prediction_service import (  # noqa: E402
+    _trend_statement, _predictions_page_statement, _alerts_page_statement,
+)
+from app.services.stats_service import stats_aggregator  # noqa: E402
+from app.services.pulse_service import open_alert_statement  # noqa: E402
+
+RISKS = ("low", "medium", "high")
+
+# Access-path indexes declared in the models (the primary-key ``ix_<table>_id`` ones stay)
+ACCESS_INDEXES = [
+    (ix.name, table.name, [c.name for c in ix.columns])
+    for table in Base.metadata.sorted_tables
+    for ix in sorted(table.indexes, key=lambda ix: ix.name)
+    if ix.name != f"ix_{table.name}_id"
+]
+
+
+def load(conn: sqlite3.Connection):
+    rng = np.random.default_rng(34)
+    start = datetime(2025, 1, 1)
+    span = 365 * 24 * 3600
+    for offset in range(0, args.rows, args.chunk):
+        n = min(args.chunk, args.rows - offset)
+        seconds = rng.integers(0, span, n)
+        risk = rng.integers(0, 3, n)
+        loc = rng.integers(0, args.locations, n)
+        ids = np.arange(offset + 1, offset + n + 1)
+        conn.executemany(
+            "INSERT INTO predictions (id, rainfall, ph_level, contamination, cases_count, risk_level, "
+            "severity, trend, confidence, recommendation, location, created_at) "
+            "VALUES (?, 120.0, 6.8, 0.3, 20, ?, 'INFO', 'STABLE', 0.9, '', ?, ?)",
+            (
+                (i, RISKS[r], f"Ward {l}", (start + timedelta(seconds=s)).isoformat(sep=" "))
+                for i, r, l, s in zip(ids.tolist(), risk.tolist(), loc.tolist(), seconds.tolist())
+            ),
+        )
+        high = np.flatnonzero(risk == 2)[::2]
+        conn.executemany(
+            "INSERT INTO alerts (prediction_id, severity, message, is_resolved, created_at) "
+            "VALUES (?, 'HIGH', 'bench', ?, ?)",
+            (
+                (int(ids[k]), int(k % 10 != 0), (start + timedelta(seconds=int(seconds[k]))).isoformat(sep=" "))
+                for k in high.tolist()
+            ),
+        )
+        conn.commit()
+
+
+def hot_queries():
+    statements = {
+        "trend": _trend_statement("Ward 7"),
+        "list predictions": _predictions_page_statement(100),
+        "predictions page N": _predictions_page_statement(100, (datetime(2025, 12, 1), args.rows)),
+        "high-risk page": _predictions_page_statement(100, risk_level="high"),
+        "list alerts": _alerts_page_statement(100),
+        "recent locations": stats_aggregator.statements()["recent"],
+        "pulse open alert": open_alert_statement("Ward 7"),
+    }
+    dialect = sqlite.dialect(paramstyle="named")
+    compiled = {}
+    for name, stmt in statements.items():
+        c = stmt.compile(dialect=dialect)
+        params = {k: (v.isoformat(sep=" ") if isinstance(v, datetime) else v) for k, v in c.params.items()}
+        compiled[name] = (str(c), params)
+    return compiled
+
+
+def time_queries(conn: sqlite3.Connection, queries: dict) -> dict:
+    timings = {}
+    for name, (sql, params) in queries.items():
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[name] = min(samples)
+    return timings
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    for name, _, _ in ACCESS_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    started = time.perf_counter()
+    load(conn)
+    print(f"Loaded {args.rows:,} predictions in {time.perf_counter() - started:.1f}s")
+
+    queries = hot_queries()
+    before = time_queries(conn, queries)
+
+    started = time.perf_counter()
+    for name, table, columns in ACCESS_INDEXES:
+        conn.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+    conn.execute("ANALYZE")
+    conn.commit()
+    print(f"Built indexes + ANALYZE in {time.perf_counter() - started:.1f}s\n")
+
+    after = time_queries(conn, queries)
+    print_table(
+        [
+            {"query": name, "no_index_ms": round(before[name], 2), "indexed_ms": round(after[name], 3),
+             "speedup": f"{before[name] / max(after[name], 1e-6):.0f}x"}
+            for name in queries
+        ],
+        ["query", "no_index_ms", "indexed_ms", "speedup"],
+    )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Sustained ingest benchmark: predictions per second with and without group commit.
+
+Model inference is taken out of the loop (rows are pre-scored) so the numbers
+reflect the write path only: ``direct`` commits each prediction (+ alert) in
+its own transaction, ``group`` hands them to the group-commit writer.
+
+Usage:
+    python -m benchmarks.bench_ingest [--rows 5000] [--concurrency 128] [--synchronous NORMAL]
+"""
+import argparse
+import asyncio
+import os
+
+from benchmarks.common import use_temp_database, run_load, print_table
+
+use_temp_database()
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rows", type=int, default=5000)
+parser.add_argument("--concurrency", type=int, default=128)
+parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"])
+args = parser.parse_args()
+os.environ["SQLITE_SYNCHRONOUS"] = args.synchronous
+
+from app.utils.database import Base, engine, AsyncSessionLocal  # noqa: E402
+from app.services.prediction_service import _assess, _alert_for  # noqa: E402
+from app.services.write_pipeline import GroupCommitWriter  # noqa: E402
+
+
+def scored_row(i: int):
+    risk = ("low", "medium", "high")[i % 3]
+    result = {"risk_level": risk, "confidence": 0.9}
+    return _assess(result, "STABLE", 100.0 + i % 300, 6.5, 0.3, i % 90, f"Ward {i % 24}")
+
+
+async def direct_write(i: int):
+    async with AsyncSessionLocal() as db:
+        prediction = scored_row(i)
+        db.add(prediction)
+        await db.flush()
+        alert = _alert_for(prediction)
+        if alert is not None:
+            db.add(alert)
+        await db.commit()
+
+
+async def main():
+    Base.metadata.create_all(bind=engine)
+    rows = []
+
+    result = await run_load(direct_write, args.rows, args.concurrency)
+    rows.append({"mode": "direct", **result})
+
+    writer = GroupCommitWriter(session_factory=AsyncSessionLocal)
+    await writer.start()
+    result = await run_load(lambda i: writer.submit(scored_row(i), _alert_for), args.rows, args.concurrency)
+    await writer.stop()
+    rows.append({"mode": "group", **result, "batches": writer.batches,
+                 "avg_batch": round(writer.rows / max(1, writer.batches), 1)})
+
+    print(f"synchronous={args.synchronous} concurrency={args.concurrency}")
+    print_table(rows, ["mode", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "batches", "avg_batch"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""
+Cost of one stage timer (start, stop, observe) in the instrumentation layer.
+
+Times the two forms used in the app — ``perf_counter()`` around the code and
+``Histogram.observe`` (hot paths), and ``with histogram.time():`` (coarse
+stages) — against an empty loop, and reports nanoseconds per timer.
+
+Usage:
+    python -m benchmarks.bench_metrics [--n 1000000] [--repeat 5]
+"""
+import argparse
+import timeit
+
+from benchmarks.common import print_table
+from app.utils.metrics import Histogram, perf_counter
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--n", type=int, default=1_000_000)
+parser.add_argument("--repeat", type=int, default=5)
+args = parser.parse_args()
+
+histogram = Histogram()
+
+
+def baseline():
+    pass
+
+
+def observe():
+    t0 = perf_counter()
+    histogram.observe(perf_counter() - t0)
+
+
+def context_manager():
+    with histogram.time():
+        pass
+
+
+empty = min(timeit.repeat(baseline, number=args.n, repeat=args.repeat)) / args.n
+rows = []
+for name, fn in (("perf_counter + observe", observe), ("with histogram.time()", context_manager)):
+    best = min(timeit.repeat(fn, number=args.n, repeat=args.repeat)) / args.n
+    rows.append({"timer": name, "ns/timer": f"{(best - empty) * 1e9:.0f}"})
+print_table(rows, ["timer", "ns/timer"])
@@ -0,0 +1,87 @@
+"""
+Listing throughput (rows/s) per read path and response format.
+
+Loads ``--rows`` predictions, then serves ``--page``-row pages the way the
+old route did (ORM objects validated through ``PredictionOutput`` and dumped
+to JSON) and through the column-tuple path in every available format. Each
+timing covers query, row building and encoding of one page.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 20000] [--page 1000] [--repeat 20]
+"""
+import argparse
+import time
+from typing import List
+
+from benchmarks.common import use_temp_database, print_table
+
+use_temp_database()
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rows", type=int, default=20_000)
+parser.add_argument("--page", type=int, default=1000)
+parser.add_argument("--repeat", type=int, default=20)
+args = parser.parse_args()
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.utils.database import Base, engine, SessionLocal  # noqa: E402
+from app.schemas.prediction import PredictionOutput  # noqa: E402
+from app.services.prediction_service import (  # noqa: E402
+    _assess, _predictions_page_statement, _prediction_row, _PREDICTION_ROW_COLUMNS, PREDICTION_FIELDS,
+)
+from app.utils.serialization import available_formats, encode_rows, orjson  # noqa: E402
+
+_PAGE_ADAPTER = TypeAdapter(List[PredictionOutput])
+
+
+def load(db):
+    for offset in range(0, args.rows, 5000):
+        db.add_all([
+            _assess({"risk_level": ("low", "medium", "high")[i % 3], "confidence": 0.9}, "STABLE",
+                    100.0 + i % 300, 6.5, 0.3, i % 90, f"Ward {i % 24}")
+            for i in range(offset, min(args.rows, offset + 5000))
+        ])
+        db.commit()
+
+
+def orm_pydantic(db) -> bytes:
+    rows = db.execute(_predictions_page_statement(args.page)).scalars().all()[: args.page]
+    return _PAGE_ADAPTER.dump_json([PredictionOutput.model_validate(p) for p in rows])
+
+
+def tuples(media_type):
+    stmt = _predictions_page_statement(args.page).with_only_columns(*_PREDICTION_ROW_COLUMNS)
+
+    def run(db) -> bytes:
+        rows = [_prediction_row(r) for r in db.execute(stmt).all()[: args.page]]
+        return encode_rows(PREDICTION_FIELDS, rows, media_type)
+    return run
+
+
+def measure(name, fn, db) -> dict:
+    fn(db)  # warm up caches and statement compilation
+    samples, size = [], 0
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        size = len(fn(db))
+        samples.append(time.perf_counter() - started)
+    best = min(samples)
+    return {"path": name, "page_ms": round(best * 1000, 2), "rows_per_s": f"{args.page / best:,.0f}",
+            "bytes": f"{size:,}"}
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        load(db)
+        results = [measure("orm + pydantic (json)", orm_pydantic, db)]
+        for media_type in available_formats():
+            label = f"tuples ({media_type.split('/')[-1]}{', orjson' if media_type.endswith('json') and orjson else ''})"
+            results.append(measure(label, tuples(media_type), db))
+    print(f"rows={args.rows:,} page={args.page}")
+    print_table(results, ["path", "page_ms", "rows_per_s", "bytes"])
+
+
+if __name__ == "__main__":
+    main()
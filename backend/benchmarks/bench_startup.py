@@ -0,0 +1,66 @@
+"""
+Startup cost: import time per module and time until the agents are warm.
+
+Imports ``--target`` (default ``app.main``) in fresh interpreters under
+``python -X importtime`` and reports the median cumulative import time of
+the target and of its slowest modules (``--top``). Timing a fresh process
+each run keeps the import caches of one run out of the next. With
+``--warmup`` it also times ``orchestrator.warm()`` (model load + SHAP
+explainer), the work moved from import into the background task.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--top 15] [--target app.main] [--warmup]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from benchmarks.common import print_table, use_temp_database
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--runs", type=int, default=5)
+parser.add_argument("--top", type=int, default=15)
+parser.add_argument("--target", default="app.main")
+parser.add_argument("--warmup", action="store_true")
+args = parser.parse_args()
+
+use_temp_database()
+
+
+def import_times(target: str) -> dict:
+    """{module: cumulative microseconds} from one ``-X importtime`` run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+samples = defaultdict(list)
+for _ in range(args.runs):
+    for module, micros in import_times(args.target).items():
+        samples[module].append(micros)
+
+medians = {module: statistics.median(values) for module, values in samples.items()}
+slowest = sorted((m for m in medians if m != args.target), key=medians.get, reverse=True)[:args.top]
+rows = [{"module": args.target, "cumulative ms": f"{medians[args.target] / 1000:.1f}"}]
+rows += [{"module": m, "cumulative ms": f"{medians[m] / 1000:.1f}"} for m in slowest]
+print(f"Import time, median of {args.runs} fresh interpreters\n")
+print_table(rows, ["module", "cumulative ms"])
+
+if args.warmup:
+    import time
+
+    from app.services.agent_orchestrator import orchestrator
+
+    start = time.perf_counter()
+    orchestrator.warm()
+    print(f"\norchestrator.warm(): {(time.perf_counter() - start) * 1000:.0f} ms  {orchestrator.readiness()}")
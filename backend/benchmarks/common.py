@@ -0,0 +1,71 @@
+"""
+Shared helpers for the AquaSentinel benchmarks.
+
+Benchmarks run from the backend directory as modules, e.g.
+``python -m benchmarks.bench_db_paths``. Each one points ``DATABASE_URL`` at a
+throwaway SQLite file *before* importing the app, so results never touch the
+development database.
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, List
+
+
+def use_temp_database(name: str = "bench.db") -> str:
+    """Point the app at a fresh SQLite file. Must run before importing ``app``."""
+    path = os.path.join(tempfile.mkdtemp(prefix="aqua-bench-"), name)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+async def run_load(request: Callable[[int], Awaitable[object]], total: int, concurrency: int) -> dict:
+    """
+    Issue ``total`` calls of ``request(i)`` with at most ``concurrency`` in flight.
+    Returns throughput and latency percentiles (milliseconds).
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await request(i)
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def print_table(rows: List[dict], columns: List[str]):
+    """Plain fixed-width table for terminal output."""
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns))
@@ -3,54 +3,86 @@ import os
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from app.main import app
-from app.utils.database import Base, get_db
+from app.utils.database import Base, get_db, get_async_db
+from app.services.write_pipeline import write_pipeline
+from app.services.weather_history import weather_history
+from app.services.ingest_service import stream_ingestor
+from app.services.archive_service import archive_store
+from app.services.export_service import exporter
 from app.core.config import settings
 
-# --- Setup Test Database (In-Memory) ---
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# --- Setup Test Database (fresh temporary file per test) ---
+# A file rather than :memory: so the sync and async engines see the same data.
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'test.db'}"
 
 
-@pytest.fixture(scope="session", autouse=True)
-def setup_db():
+@pytest.fixture
+def engine(db_url):
+    engine = create_engine(db_url, connect_args={"check_same_thread": False})
     Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture
-def db_session():
+def db_session(engine):
     """Returns a clean database session for each test."""
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
-    
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session = TestingSessionLocal()
     yield session
-    
     session.close()
-    transaction.rollback()
-    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_weather_history(tmp_path, monkeypatch):
+    """Keep the app's weather history snapshot out of the developer's data/ directory."""
+    monkeypatch.setattr(weather_history, "path", str(tmp_path / "weather_history.npz"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_archive(tmp_path, monkeypatch):
+    """Archive files go to the test's tmp_path, never the developer's data/archive."""
+    monkeypatch.setattr(archive_store, "directory", str(tmp_path / "archive"))
+    return archive_store
 
 
 @pytest.fixture
-def client(db_session):
-    """Returns a TestClient with a mocked DB dependency."""
+def client(db_session, db_url, tmp_path):
+    """Returns a TestClient with the sync and async DB dependencies pointed at the test DB."""
+    # NullPool: aiosqlite connections never outlive the TestClient's event loop
+    async_engine = create_async_engine(db_url.replace("sqlite:", "sqlite+aiosqlite:", 1), poolclass=NullPool)
+    TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as c:
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    default_factory = write_pipeline.session_factory
+    write_pipeline.session_factory = TestingAsyncSessionLocal
+    stream_ingestor.session_factory = TestingAsyncSessionLocal
+    default_export_factory, default_export_dir = exporter.session_factory, exporter.directory
+    exporter.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    exporter.directory = str(tmp_path / "exports")
+    # Routes are mounted under API_V1_STR; requests use paths relative to it
+    with TestClient(app, base_url=f"http://testserver{settings.API_V1_STR}") as c:
         yield c
+    write_pipeline.session_factory = default_factory
+    stream_ingestor.session_factory = default_factory
+    exporter.session_factory, exporter.directory = default_export_factory, default_export_dir
     app.dependency_overrides.clear()
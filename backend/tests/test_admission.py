@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.admission import (
+    DEFAULT, HEAVY, INGEST, AdmissionController, Rejected, TokenBucket, admission_controller,
+)
+
+
+def _controller(**overrides):
+    options = dict(prefix="/api/v1", max_concurrent=4, reserved_ingest=2, heavy_concurrency=1,
+                   heavy_rate=1.0, heavy_burst=10.0, queue_timeout=0.05, max_queue=4)
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def test_classify_routes():
+    controller = _controller()
+    assert controller.classify("/api/v1/predict") == (INGEST, 0.0)
+    assert controller.classify("/api/v1/agent/simulate") == (HEAVY, 5.0)
+    assert controller.classify("/api/v1/predictions") == (DEFAULT, 0.0)
+    assert controller.classify("/api/v1/realtime/pulse") == (DEFAULT, 0.0)  # snapshot / 304 reads
+    assert controller.classify("/docs") == (None, 0.0)
+
+
+def test_reserved_ingest_capacity_and_queue_timeout():
+    controller = _controller()
+
+    async def run():
+        await controller.admit(DEFAULT, 0)
+        await controller.admit(DEFAULT, 0)
+        with pytest.raises(Rejected) as busy:
+            await controller.admit(DEFAULT, 0)  # only reserved slots left
+        assert busy.value.status_code == 503
+        await controller.admit(INGEST, 0)
+        await controller.admit(INGEST, 0)
+
+        # A queued request is admitted as soon as a slot frees up
+        waiter = asyncio.ensure_future(controller.admit(INGEST, 0))
+        await asyncio.sleep(0)
+        assert controller.pool.waiting == 1
+        controller.release(DEFAULT)
+        await waiter
+        assert controller.pool.active == 4 and controller.rejected[DEFAULT] == 1
+
+    asyncio.run(run())
+
+
+def test_heavy_routes_are_rate_limited_and_capped():
+    controller = _controller(heavy_burst=6.0)
+
+    async def run():
+        await controller.admit(HEAVY, 5.0)
+        with pytest.raises(Rejected) as limited:
+            await controller.admit(HEAVY, 5.0)
+        assert limited.value.status_code == 429 and 3.0 < limited.value.retry_after <= 4.0
+        with pytest.raises(Rejected) as capped:
+            await controller.admit(HEAVY, 1.0)  # tokens left, but the one heavy slot is taken
+        assert capped.value.status_code == 503
+        assert controller.bucket.tokens >= 1.0  # the rejected request's token was refunded
+        controller.release(HEAVY)
+        assert controller.heavy.active == 0 and controller.pool.active == 0
+
+    asyncio.run(run())
+
+
+def test_rejections_carry_retry_after_and_spare_ingestion(client, monkeypatch):
+    bucket = TokenBucket(rate=0.5, burst=10.0)
+    bucket.tokens = 0.0
+    monkeypatch.setattr(admission_controller, "bucket", bucket)
+    response = client.post("/agent/simulate", json={})
+    assert response.status_code == 429 and int(response.headers["retry-after"]) >= 10
+    payload = {"rainfall": 10, "ph_level": 7, "contamination": 0.01, "cases_count": 0, "location": "Calm"}
+    assert client.post("/predict", json=payload).status_code == 200
+    assert admission_controller.pool.active == 0
+    assert settings.ADMISSION_RESERVED_INGEST < settings.ADMISSION_MAX_CONCURRENT
@@ -2,7 +2,7 @@ import pytest
 
 def test_health_check(client):
     """Verifies that the API is up and reachable."""
-    response = client.get("/")
+    response = client.get("http://testserver/")
     assert response.status_code == 200
 
 def test_prediction_creation(client):
@@ -68,3 +68,41 @@ def test_batch_prediction(client):
     assert data["total"] == 2
     assert data["successful"] == 2
     assert len(data["predictions"]) == 2
+
+def test_batch_prediction_bulk_semantics(client):
+    """Bulk batch: trends follow row order inside the batch, bad rows are reported per index."""
+    low = {"rainfall": 10, "ph_level": 7, "contamination": 0.01, "cases_count": 0, "location": "BulkCity"}
+    high = {"rainfall": 400, "ph_level": 4, "contamination": 0.9, "cases_count": 100, "location": "BulkCity"}
+    invalid = {"rainfall": -5, "ph_level": 7, "contamination": 0.1, "cases_count": 0, "location": "BulkCity"}
+
+    response = client.post("/predict/batch", json={"predictions": [low, low, invalid, high, low]})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["successful"], data["failed"]) == (5, 4, 1)
+    assert data["errors"][0]["index"] == 2
+    assert [p["trend"] for p in data["predictions"]] == ["STABLE", "STABLE", "RISING", "FALLING"]
+
+    # The batch is committed in order: a follow-up prediction sees it as history
+    assert client.post("/predict", json=high).json()["trend"] == "RISING"
+    alerts = client.get("/alerts").json()
+    assert len(alerts) == 2
+
+def test_batch_schema_documents_row_shape(client):
+    """The OpenAPI document still describes batch rows as PredictionInput."""
+    schema = client.get("http://testserver/openapi.json").json()["components"]["schemas"]
+    items = schema["BatchPredictionInput"]["properties"]["predictions"]["items"]
+    assert {"$ref": "#/components/schemas/PredictionInput"} in items["anyOf"]
+
+def test_resolve_alert_updates_stats(client):
+    """Alerts written by the async /predict path can be resolved and are reflected in /stats."""
+    client.post("/predict", json={"rainfall": 400, "ph_level": 4.0, "contamination": 0.9, "cases_count": 100, "location": "ResolveCity"})
+    alert_id = client.get("/alerts").json()[0]["id"]
+
+    response = client.patch(f"/alerts/{alert_id}/resolve")
+    assert response.status_code == 200
+    assert response.json()["is_resolved"] is True
+
+    stats = client.get("/stats").json()
+    assert stats["total_alerts"] == 1
+    assert stats["resolved_alerts"] == 1
+    assert stats["active_alerts"] == 0
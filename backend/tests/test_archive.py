@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from app.models.prediction import Alert, Prediction
+from app.models.rollup import DailyRollup, HourlyRollup
+from app.services.archive_service import iter_predictions
+from app.services.prediction_service import get_stats
+from app.services.rollup_service import rollup_aggregator
+from app.services.stats_service import stats_aggregator
+
+
+NOW = datetime(2026, 10, 19, 12, 0)
+TEXT = "Boil water before drinking. Chlorinate wells and inspect drainage. " * 4
+
+
+def _add(db, days_ago, location="Zone A", alert=None):
+    p = Prediction(rainfall=100.0 + days_ago, ph_level=6.5, contamination=0.2, cases_count=days_ago,
+                   risk_level="high" if alert else "low", severity="HIGH" if alert else "INFO",
+                   trend="STABLE", confidence=None if days_ago % 2 else 0.9,
+                   recommendation=TEXT, location=location, created_at=NOW - timedelta(days=days_ago))
+    db.add(p)
+    db.flush()
+    if alert is not None:
+        db.add(Alert(prediction_id=p.id, severity="HIGH", message="High risk", is_resolved=alert,
+                     created_at=p.created_at))
+    return p
+
+
+def test_archive_moves_old_rows_and_keeps_totals(db_session, isolated_archive):
+    isolated_archive.retention_days = 90
+    for days in (400, 380, 200, 150, 120):
+        _add(db_session, days)
+    resolved_id = _add(db_session, 300, alert=True).id
+    open_id = _add(db_session, 250, alert=False).id
+    for days in (30, 1):
+        _add(db_session, days, location="Zone B")
+    db_session.commit()
+
+    before = get_stats(db_session)
+    rollups_before = db_session.query(DailyRollup).count()
+    everything = [r["id"] for r in iter_predictions(db_session)]
+
+    summary = isolated_archive.archive(db_session, now=NOW)
+    assert (summary["predictions"], summary["alerts"]) == (6, 1)
+    hot = {p.id for p in db_session.query(Prediction).all()}
+    assert open_id in hot and resolved_id not in hot
+    assert len(hot) == 3
+    assert len(isolated_archive.months()) == 6
+
+    # Idempotent: nothing left to move, archived rows are not duplicated
+    assert isolated_archive.archive(db_session, now=NOW)["predictions"] == 0
+
+    # Rollups and lifetime counters are untouched; reconcile agrees with them
+    assert db_session.query(DailyRollup).count() == rollups_before
+    assert get_stats(db_session)["total_predictions"] == 9
+    stats_aggregator.reconcile(db_session)
+    after = get_stats(db_session)
+    assert {k: v for k, v in after.items() if k != "recent_locations"} == \
+        {k: v for k, v in before.items() if k != "recent_locations"}
+
+    # The alert travelled with its prediction
+    month = datetime(2025, 12, 1)
+    [archived_alert] = isolated_archive.alerts(month)
+    assert archived_alert["prediction_id"] == resolved_id and archived_alert["is_resolved"] is True
+
+    # One ordered stream over archive + hot table, with filters
+    merged = list(iter_predictions(db_session))
+    assert [r["id"] for r in merged] == everything
+    assert merged[0]["recommendation"] == TEXT and merged[0]["confidence"] == 0.9
+    window = list(iter_predictions(db_session, since=NOW - timedelta(days=310), until=NOW - timedelta(days=100),
+                                   severity="INFO"))
+    assert [r["cases_count"] for r in window] == [250, 200, 150, 120]
+    assert list(iter_predictions(db_session, location="Nowhere")) == []
+
+
+def test_backfill_after_archive_keeps_archived_rollups(db_session, isolated_archive):
+    isolated_archive.retention_days = 90
+    for days in (200, 200, 150, 30, 1):
+        _add(db_session, days)
+    db_session.commit()
+
+    def snapshot():
+        return {
+            model.__tablename__: sorted(
+                tuple(getattr(row, c.name) for c in model.__table__.columns)
+                for row in db_session.query(model).all()
+            )
+            for model in (HourlyRollup, DailyRollup)
+        }
+
+    live = snapshot()
+    assert isolated_archive.archive(db_session, now=NOW)["predictions"] == 3
+    rollup_aggregator.backfill(db_session, archive=isolated_archive)
+    assert snapshot() == live
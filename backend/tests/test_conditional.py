@@ -0,0 +1,78 @@
+import asyncio
+import os
+
+from app.services.artifact_cache import ArtifactCache
+from app.services.pulse_service import PulseService, pulse_service
+
+
+HIGH = {"rainfall": 400, "ph_level": 4.0, "contamination": 0.9, "cases_count": 100, "location": "EtagCity"}
+
+
+def _revalidate(client, path, response):
+    return client.get(path, headers={"If-None-Match": response.headers["etag"]})
+
+
+def test_model_artifacts_revalidate_with_304(client):
+    for path in ("/model/metrics", "/model/plots/roc_curves.png"):
+        first = client.get(path)
+        assert first.status_code == 200 and first.headers["etag"].startswith('"')
+        assert "last-modified" in first.headers
+        again = _revalidate(client, path, first)
+        assert again.status_code == 304 and again.content == b""
+        assert client.get(path, headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+    assert client.get("/model/metrics").json()["plots_available"]
+
+
+def test_artifact_cache_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "metrics.json"
+    path.write_text('{"v": 1}')
+    cache = ArtifactCache()
+    first = cache.get(str(path), lambda b: b.decode())
+    assert cache.get(str(path), lambda b: b.decode()) is first and cache.hits == 1
+
+    path.write_text('{"v": 22}')
+    os.utime(path, ns=(first.signature[0] + 10**9, first.signature[0] + 10**9))
+    second = cache.get(str(path), lambda b: b.decode())
+    assert second.value == '{"v": 22}' and second.etag != first.etag
+    path.unlink()
+    assert cache.get(str(path)) is None
+
+
+def test_stats_etag_follows_writes(client):
+    first = client.get("/stats")
+    assert _revalidate(client, "/stats", first).status_code == 304
+    client.post("/predict", json=HIGH)
+    changed = _revalidate(client, "/stats", first)
+    assert changed.status_code == 200 and changed.json()["total_predictions"] == 1
+    alert_id = client.get("/alerts").json()[0]["id"]
+    client.patch(f"/alerts/{alert_id}/resolve")
+    assert _revalidate(client, "/stats", changed).status_code == 200
+
+
+def test_pulse_snapshot_is_shared_and_keeps_its_etag_until_content_changes(client, monkeypatch):
+    calls = []
+    wards = [{"ward_name": "Zone A", "risk_level": "low"}]
+
+    async def fake_pulse():
+        calls.append(1)
+        return list(wards)
+
+    service = PulseService(snapshot_ttl=0.0)
+    monkeypatch.setattr(service, "get_territory_pulse", fake_pulse)
+
+    async def run():
+        first = await service.snapshot()
+        same = await service.snapshot()
+        wards[0] = {"ward_name": "Zone A", "risk_level": "high"}
+        changed = await service.snapshot()
+        return first, same, changed
+
+    first, same, changed = asyncio.run(run())
+    assert same is first and changed.etag != first.etag and len(calls) == 3
+
+    monkeypatch.setattr(pulse_service, "get_territory_pulse", fake_pulse)
+    monkeypatch.setattr(pulse_service, "snapshot_ttl", 60.0)
+    monkeypatch.setattr(pulse_service, "_snapshot", None)
+    response = client.get("/realtime/pulse")
+    assert response.json() == wards
+    assert _revalidate(client, "/realtime/pulse", response).status_code == 304
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime, timedelta
+
+from app.models.prediction import Prediction
+from app.services.export_service import exporter
+
+
+LOW = {"rainfall": 10, "ph_level": 7.0, "contamination": 0.01, "cases_count": 0, "location": "ExportCity"}
+HIGH = {"rainfall": 400, "ph_level": 4.0, "contamination": 0.9, "cases_count": 100, "location": "ExportCity"}
+
+
+def test_export_streams_every_row_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(exporter, "chunk_rows", 2)
+    client.post("/predict/batch", json={"predictions": [LOW, HIGH, LOW, HIGH, dict(LOW, location="Elsewhere")]})
+
+    response = client.get("/export/predictions", params={"format": "ndjson", "location": "ExportCity"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 4 and all(r["location"] == "ExportCity" for r in rows)
+    assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+    assert rows[1]["recommendation"]
+
+    response = client.get("/export/predictions", params={"format": "csv", "risk_level": "HIGH"})
+    table = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(table) == 2 and {r["risk_level"] for r in table} == {"high"}
+    assert "attachment" in response.headers["content-disposition"]
+
+    alerts = client.get("/export/alerts", params={"format": "csv", "resolved": False}).text
+    assert len(list(csv.DictReader(io.StringIO(alerts)))) == 2
+
+
+def test_export_includes_archived_history(client, db_session, isolated_archive):
+    old = datetime.utcnow() - timedelta(days=400)
+    db_session.add_all([
+        Prediction(rainfall=1.0, ph_level=7.0, contamination=0.1, cases_count=0, risk_level="low",
+                   severity="INFO", location="ExportCity", created_at=old + timedelta(hours=i))
+        for i in range(3)
+    ])
+    db_session.commit()
+    client.post("/predict", json=LOW)
+    isolated_archive.archive(db_session)
+    assert db_session.query(Prediction).count() == 1
+
+    rows = client.get("/export/predictions", params={"format": "ndjson"}).text.splitlines()
+    assert len(rows) == 4
+
+
+def test_export_rejects_unknown_dataset_and_format(client):
+    assert client.get("/export/nothing").status_code == 404
+    assert client.get("/export/predictions", params={"format": "xlsx"}).status_code == 400
+
+
+def test_background_export_job(client):
+    client.post("/predict/batch", json={"predictions": [LOW, HIGH]})
+    job = client.post("/export/predictions/jobs", params={"format": "csv"})
+    assert job.status_code == 202
+    job_id = job.json()["id"]
+
+    deadline = time.monotonic() + 10
+    while (status := client.get(f"/export/jobs/{job_id}").json())["status"] not in ("done", "failed"):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert status["status"] == "done" and status["rows"] == 2
+
+    download = client.get(f"/export/jobs/{job_id}/download")
+    assert len(list(csv.DictReader(io.StringIO(download.text)))) == 2
+    assert client.get("/export/jobs/missing").status_code == 404
@@ -0,0 +1,62 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from app.models.prediction import Alert, Prediction
+from app.services.idempotency import IdempotencyStore, StoredResponse
+
+
+HIGH = {"rainfall": 400, "ph_level": 4.0, "contamination": 0.9, "cases_count": 100, "location": "RetryCity"}
+
+
+def test_repeated_key_replays_without_writing(client, db_session):
+    headers = {"Idempotency-Key": "gw-1-0001"}
+    first = client.post("/predict", json=HIGH, headers=headers)
+    again = client.post("/predict", json=HIGH, headers=headers)
+    assert first.status_code == again.status_code == 200
+    assert again.content == first.content and again.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert db_session.query(Prediction).filter_by(location="RetryCity").count() == 1
+    assert db_session.query(Alert).count() == 1
+
+    other = client.post("/predict", json={**HIGH, "cases_count": 5}, headers=headers)
+    assert other.status_code == 422
+
+    batch = {"predictions": [HIGH, {**HIGH, "ph_level": 99}]}
+    first = client.post("/predict/batch", json=batch, headers=headers)  # keys are scoped per route
+    again = client.post("/predict/batch", json=batch, headers=headers)
+    assert first.json()["successful"] == 1 and again.content == first.content
+    assert db_session.query(Prediction).filter_by(location="RetryCity").count() == 2
+
+
+def test_concurrent_duplicates_are_coalesced_and_failures_released():
+    store = IdempotencyStore(max_entries=2, ttl=60)
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return StoredResponse(200, b'{"id":1}', "application/json")
+
+    async def failing():
+        raise HTTPException(status_code=500, detail="model missing")
+
+    async def run():
+        responses = await asyncio.gather(*(store.respond("/predict", "k", "fp", handler) for _ in range(5)))
+        assert len(calls) == 1 and store.coalesced == 4
+        assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 4
+
+        for _ in range(2):
+            try:
+                await store.respond("/predict", "bad", "fp", failing)
+            except HTTPException as e:
+                assert e.status_code == 500
+        assert len(store) == 1  # the failure was not kept
+
+        await store.respond("/predict", "a", "fp", handler)
+        await store.respond("/predict", "b", "fp", handler)
+        assert len(store) == 2  # bounded: "k" evicted
+        await store.respond("/predict", "k", "fp", handler)
+        assert len(calls) == 4
+
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import threading
+
+from app.services.ingest_service import iter_lines, OVERSIZED, stream_ingestor
+
+
+def _collect(pieces, max_line_bytes=16):
+    async def body():
+        for piece in pieces:
+            yield piece
+
+    async def run():
+        return [line async for line in iter_lines(body(), max_line_bytes)]
+    return asyncio.run(run())
+
+
+def _post_with_timeout(client, url, timeout=30, **kwargs):
+    """POST on a daemon thread so a deadlocked upload fails the test instead of hanging the run."""
+    result = {}
+    worker = threading.Thread(target=lambda: result.setdefault("response", client.post(url, **kwargs)), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    assert "response" in result, f"POST {url} did not finish within {timeout}s"
+    return result["response"]
+
+
+def test_iter_lines_splits_across_pieces_and_skips_oversized():
+    """Lines may span network chunks; an over-long line is replaced by a marker, not buffered."""
+    lines = _collect([b"ab", b"c\nde\r\n", b"x" * 40, b"yy\nlast"])
+    assert lines == [b"abc", b"de", OVERSIZED, b"last"]
+
+
+def test_ingest_ndjson_streams_chunk_progress(client, monkeypatch):
+    """Rows are written chunk by chunk; errors carry their line number."""
+    monkeypatch.setattr(stream_ingestor, "chunk_rows", 2)
+    row = {"rainfall": 10, "ph_level": 7, "contamination": 0.01, "cases_count": 0, "location": "IngestCity"}
+    body = "\n".join([
+        json.dumps(row), json.dumps(row), "", "{not json", json.dumps({**row, "ph_level": 20}), json.dumps(row),
+    ])
+
+    response = _post_with_timeout(client, "/predict/ingest", content=body,
+                                  headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    chunks, summary = records[:-1], records[-1]
+    assert [c["rows"] for c in chunks] == [2, 2, 1]
+    assert [e["line"] for c in chunks for e in c["errors"]] == [4, 5]
+    assert summary == {**summary, "done": True, "rows": 5, "accepted": 3, "failed": 2, "chunks": 3}
+    assert client.get("/stats").json()["total_predictions"] == 3
+
+
+def test_ingest_csv(client):
+    """CSV bodies take their columns from the header row."""
+    body = (
+        "location,rainfall,ph_level,contamination,cases_count\n"
+        "CsvCity,10,7.0,0.01,0\n"
+        "CsvCity,400,4.0,0.9,100\n"
+    )
+    response = _post_with_timeout(client, "/predict/ingest", content=body, headers={"content-type": "text/csv"})
+    summary = json.loads(response.text.splitlines()[-1])
+    assert (summary["accepted"], summary["failed"]) == (2, 0)
+    assert len(client.get("/alerts").json()) == 1
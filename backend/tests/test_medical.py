@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from app.services.medical_service import MedicalService
+from app.services.medical_store import MedicalRecordStore
+
+
+def test_medical_store_ingest_and_lookups(tmp_path):
+    """CSV exports stream into the store; range lookups and the recent aggregate agree."""
+    csv_path = tmp_path / "cases.csv"
+    start = date.today() - timedelta(days=29)
+    lines = ["ward,date,cases"]
+    for i in range(30):
+        day = (start + timedelta(days=i)).isoformat()
+        lines.append(f'"Podanur, Coimbatore",{day},{i}')
+        lines.append(f"Annur,{day},1")
+    lines.append("Annur,not-a-date,5")
+    lines.append("Old Ward,2022-01-01,90")
+    csv_path.write_text("\n".join(lines))
+
+    store = MedicalRecordStore(str(tmp_path / "medical.db"), recent_days=7, chunk_size=16)
+    result = store.ingest_csv(str(csv_path))
+    assert result["loaded"] == 61
+    assert result["rejected"] == 1
+
+    history = store.get_range("Podanur, Coimbatore", start + timedelta(days=9), start + timedelta(days=11))
+    assert [h["cases"] for h in history] == [9, 10, 11]
+
+    recent = store.get_recent("Podanur, Coimbatore")
+    assert recent["recent_cases"] == sum(range(23, 30))
+    assert recent["last_reported"] == date.today().isoformat()
+
+    # Fresh store instance reloads the precomputed aggregate from disk
+    service = MedicalService(store=MedicalRecordStore(str(tmp_path / "medical.db")))
+    records = service.get_ward_records("Annur")
+    assert records["historical_cases"] == 7
+    assert records["source"] == "records"
+    assert service.get_ward_records("Unknown Ward")["source"] == "simulated"
+
+    # The window ends today: an old export is not reported as current cases
+    old = service.get_ward_records("Old Ward")
+    assert (old["historical_cases"], old["stale"], old["last_monitored"]) == (0, True, "2022-01-01")
+
+
+def test_medical_store_picks_up_ingest_from_another_process(tmp_path):
+    """A reader that started before the DB existed sees a later ingest without a restart."""
+    path = str(tmp_path / "medical.db")
+    reader = MedicalRecordStore(path, reload_interval=0)
+    assert reader.get_recent("Annur") is None
+
+    MedicalRecordStore(path).ingest_rows([("Annur", date.today().isoformat(), "4")])
+    assert reader.get_recent("Annur")["recent_cases"] == 4
+
+    MedicalRecordStore(path).ingest_rows([("Annur", date.today().isoformat(), "9")])
+    assert reader.get_recent("Annur")["recent_cases"] == 9
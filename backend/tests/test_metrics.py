@@ -0,0 +1,30 @@
+from app.utils.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_and_rendering():
+    registry = MetricsRegistry(namespace="t")
+    histogram = registry.stage('odd"stage')
+    for seconds in (0.00001, 0.003, 0.003, 100.0):
+        histogram.observe(seconds)
+    registry.gauge("depth", "Queue depth.", lambda: {(("queue", "w"),): 3})
+    registry.gauge("broken", "Raises.", lambda: 1 / 0)
+    text = registry.render()
+    assert 't_stage_seconds_bucket{stage="odd\\"stage",le="5e-05"} 1' in text
+    assert 't_stage_seconds_bucket{stage="odd\\"stage",le="0.005"} 3' in text
+    assert 't_stage_seconds_bucket{stage="odd\\"stage",le="+Inf"} 4' in text
+    assert 't_stage_seconds_count{stage="odd\\"stage"} 4' in text
+    assert '# TYPE t_depth gauge\nt_depth{queue="w"} 3\n' in text
+    assert "t_broken" not in text
+    assert Histogram().cumulative()[-1] == 0
+
+
+def test_metrics_endpoint_reports_prediction_stages(client):
+    payload = {"rainfall": 120, "ph_level": 6.8, "contamination": 0.2, "cases_count": 4, "location": "Meter"}
+    assert client.post("/predict", json=payload).status_code == 200
+    response = client.get("http://testserver/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    for stage in ("predictor.predict_proba", "prediction.inference", "prediction.trend", "db.query"):
+        assert f'aquasentinel_stage_seconds_count{{stage="{stage}"}}' in text
+    assert 'aquasentinel_cache_hits_total{cache="risk_history"}' in text
+    assert 'aquasentinel_queue_depth{queue="write_pipeline"}' in text
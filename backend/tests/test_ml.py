@@ -1,6 +1,9 @@
 import pytest
-from app.ml.predictor import predict
-from app.ml.train_model import train as train_model
+from sklearn.base import clone
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, VotingClassifier
+from app.ml.predictor import predict, predict_batch
+from app.ml.train_model import assemble_voting, train as train_model
 
 def test_train_and_predict():
     """Verifies that the whole ML pipeline (train -> load -> predict) works and gives valid outputs."""
@@ -19,3 +22,30 @@ def test_predictor_outliers():
     """Verifies that the predictor handles extreme values gracefully (should still predict)."""
     result = predict(rainfall=1000, ph_level=1, contamination=1.0, cases_count=1000)
     assert result["risk_level"] == "high" # Expected high risk for extreme values
+
+def test_predict_batch_matches_single_predictions():
+    """The vectorized path gives the same result as predicting row by row (rules + model)."""
+    rows = [
+        (100, 7.0, 0.1, 5),      # model
+        (300, 5.2, 0.6, 40),     # model
+        (50, 7.0, 0.9, 0),       # contamination override
+        (500, 6.5, 0.5, 10),     # rain + contamination override
+        (20, 7.0, 0.2, 95),      # outbreak override
+    ]
+    batch = predict_batch(*zip(*rows))
+    for row, result in zip(rows, batch):
+        single = predict(*row)
+        assert result["risk_level"] == single["risk_level"]
+        assert result["confidence"] == pytest.approx(single["confidence"])
+
+def test_voting_ensemble_assembled_from_fitted_members_matches_fit():
+    """The trainer reuses its member fits; the assembled ensemble predicts like VotingClassifier.fit."""
+    X, y = make_classification(n_samples=200, n_features=5, n_informative=3, n_classes=3, random_state=0)
+    members = {
+        "rf": RandomForestClassifier(n_estimators=10, random_state=0),
+        "gb": GradientBoostingClassifier(n_estimators=10, random_state=0),
+    }
+    fitted = VotingClassifier(list(members.items()), voting="soft").fit(X, y)
+    assembled = assemble_voting({name: clone(model).fit(X, y) for name, model in members.items()}, y)
+    assert assembled.predict_proba(X) == pytest.approx(fitted.predict_proba(X))
+    assert list(assembled.named_estimators_) == ["rf", "gb"]
@@ -0,0 +1,82 @@
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+LOW = {"rainfall": 10, "ph_level": 7.0, "contamination": 0.01, "cases_count": 0, "location": "PageCity"}
+HIGH = {"rainfall": 400, "ph_level": 4.0, "contamination": 0.9, "cases_count": 100, "location": "PageCity"}
+
+
+def _all_pages(client, url, **params):
+    ids, pages, cursor = [], 0, None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [row["id"] for row in response.json()]
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids, pages
+
+
+def test_predictions_keyset_pages_cover_every_row_once(client):
+    """Following X-Next-Cursor walks all rows newest first, with no gaps or repeats."""
+    rows = [LOW, HIGH, LOW, HIGH, LOW] + [{**LOW, "location": "OtherCity"}] * 2
+    client.post("/predict/batch", json={"predictions": rows})
+
+    ids, pages = _all_pages(client, "/predictions", limit=2)
+    assert pages == 4
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 7
+
+    high_ids, _ = _all_pages(client, "/predictions", limit=1, risk_level="high")
+    assert len(high_ids) == 2
+    city_ids, _ = _all_pages(client, "/predictions", limit=3, location="OtherCity")
+    assert len(city_ids) == 2
+
+
+def test_alerts_filters_and_bad_cursor(client):
+    client.post("/predict/batch", json={"predictions": [HIGH, HIGH, HIGH]})
+    first = client.get("/alerts").json()[0]["id"]
+    client.patch(f"/alerts/{first}/resolve")
+
+    open_ids, _ = _all_pages(client, "/alerts", limit=1, resolved=False)
+    assert len(open_ids) == 2 and first not in open_ids
+    assert client.get("/alerts", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_tuple_read_path_matches_response_models(client, db_session):
+    """Listings skip ORM objects and Pydantic per row but produce the documented records."""
+    from app.models.prediction import Alert, Prediction
+    from app.schemas.prediction import AlertOutput, PredictionOutput
+    from app.services.prediction_service import ALERT_FIELDS, PREDICTION_FIELDS
+
+    assert PREDICTION_FIELDS == tuple(PredictionOutput.model_fields)
+    assert ALERT_FIELDS == tuple(AlertOutput.model_fields)
+
+    client.post("/predict/batch", json={"predictions": [HIGH, LOW, HIGH]})
+    fast = client.get("/predictions").json()
+    expected = [PredictionOutput.model_validate(p).model_dump(mode="json")
+                for p in db_session.query(Prediction).order_by(Prediction.id.desc())]
+    assert fast == expected
+    fast = client.get("/alerts").json()
+    expected = [AlertOutput.model_validate(a).model_dump(mode="json")
+                for a in db_session.query(Alert).order_by(Alert.id.desc())]
+    assert fast == expected
+
+
+def test_listing_content_negotiation(client):
+    client.post("/predict", json=HIGH)
+    assert client.get("/predictions", headers={"Accept": "text/html;q=0.9, */*;q=0.1"}).headers[
+        "content-type"].startswith("application/json")
+    assert client.get("/predictions", headers={"Accept": "application/xml"}).status_code == 406
+    assert client.post("/predict/batch", json={"predictions": [LOW]},
+                       headers={"Accept": "application/vnd.apache.arrow.stream"}).status_code == 406
+
+
+def test_negotiate_honours_quality_and_aliases():
+    from app.utils.serialization import ARROW, JSON, MSGPACK, negotiate
+
+    formats = [JSON, MSGPACK, ARROW]
+    assert negotiate(None, formats) == JSON
+    assert negotiate("application/x-msgpack", formats) == MSGPACK
+    assert negotiate("application/json;q=0.5, application/vnd.apache.arrow.stream", formats) == ARROW
+    assert negotiate("application/msgpack;q=0", [JSON, MSGPACK]) is None
+    assert negotiate("application/msgpack", [JSON]) is None
@@ -0,0 +1,55 @@
+import os
+
+from app.core.config import settings
+from app.services.profiling import SamplingProfiler, server_timing
+
+
+PAYLOAD = {"rainfall": 120, "ph_level": 6.8, "contamination": 0.2, "cases_count": 4, "location": "Timed"}
+
+
+def test_server_timing_breaks_down_stages(client):
+    timing = client.post("/predict", json=PAYLOAD).headers["server-timing"]
+    stages = dict(part.split(";dur=") for part in timing.split(", "))
+    assert {"db", "model", "total"} <= set(stages)
+    assert float(stages["total"]) >= float(stages["model"]) > 0
+    listing = client.get("/predictions").headers["server-timing"]
+    assert "db;dur=" in listing and "serialize;dur=" in listing
+    assert server_timing({"llm": 0.25}, 1.0) == "llm;dur=250.00, total;dur=1000.00"
+
+
+def test_profiles_need_the_admin_token(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path / "profiles"))
+
+    ignored = client.post("/predict", json=PAYLOAD, headers={"X-Profile": "return", "X-Admin-Token": "wrong"})
+    assert ignored.json()["location"] == "Timed" and "x-profile-file" not in ignored.headers
+
+    returned = client.post("/predict", json=PAYLOAD, headers={"X-Profile": "return", "X-Admin-Token": "s3cret"})
+    assert returned.headers["x-profiled-status"] == "200"
+    assert returned.headers["content-type"].startswith("text/plain")
+
+    stored = client.get("/stats?profile=store", headers={"X-Admin-Token": "s3cret"})
+    assert stored.status_code == 200 and "total_predictions" in stored.json()
+    assert os.path.exists(os.path.join(settings.abs_profile_dir, stored.headers["x-profile-file"]))
+
+
+def test_sampler_folds_stacks():
+    import threading
+    import time
+
+    done = threading.Event()
+
+    def busy():
+        while not done.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy, name="busy")
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    worker.start()
+    time.sleep(0.05)
+    done.set()
+    worker.join()
+    lines = profiler.stop().splitlines()
+    assert any(line.startswith("busy;") and "busy (" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,108 @@
+"""
+Query-plan regression tests: every hot query must be served by an index
+(no full-table SCAN of predictions/alerts, no temp B-tree for ORDER BY).
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+
+from app.services.prediction_service import (
+    _trend_statement, _predictions_page_statement, _alerts_page_statement,
+)
+from app.services.stats_service import stats_aggregator
+from app.services.rollup_service import rollup_aggregator
+from app.services.pulse_service import open_alert_statement
+from app.services.risk_history import risk_history
+
+
+CURSOR = (datetime(2026, 6, 1, 12, 0), 5000)
+SINCE, UNTIL = datetime(2026, 1, 1), datetime(2026, 7, 1)
+
+
+def query_plan(db_session, stmt) -> str:
+    compiled = stmt.compile(dialect=sqlite.dialect(paramstyle="named"))
+    rows = db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"), compiled.params).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_indexed(plan: str, index: str):
+    assert index in plan, plan
+    for line in plan.splitlines():
+        # "SCAN t USING INDEX ..." is an ordered index walk; a bare "SCAN t" is a full table scan
+        if line.startswith("SCAN") and "USING" not in line and "SUBQUERY" not in line:
+            pytest.fail(f"Full table scan in plan:\n{plan}")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.parametrize("name, stmt, index", [
+    ("trend", _trend_statement("Zone A"), "ix_predictions_location_created_at"),
+    ("list predictions", _predictions_page_statement(100), "ix_predictions_created_at"),
+    ("predictions page N", _predictions_page_statement(100, CURSOR), "ix_predictions_created_at"),
+    ("predictions by location", _predictions_page_statement(100, CURSOR, location="Zone A"),
+     "ix_predictions_location_created_at"),
+    ("predictions by risk", _predictions_page_statement(100, CURSOR, risk_level="high"),
+     "ix_predictions_risk_level_created_at"),
+    ("predictions by severity", _predictions_page_statement(100, CURSOR, severity="CRITICAL"),
+     "ix_predictions_severity_created_at"),
+    ("predictions in range", _predictions_page_statement(100, CURSOR, since=SINCE, until=UNTIL),
+     "ix_predictions_created_at"),
+    ("list alerts", _alerts_page_statement(100), "ix_alerts_created_at"),
+    ("alerts page N", _alerts_page_statement(100, CURSOR), "ix_alerts_created_at"),
+    ("alerts by resolved", _alerts_page_statement(100, CURSOR, is_resolved=False),
+     "ix_alerts_is_resolved_created_at"),
+    ("alerts by severity", _alerts_page_statement(100, CURSOR, severity="HIGH"), "ix_alerts_severity_created_at"),
+    ("recent locations", stats_aggregator.statements()["recent"], "ix_predictions_created_at"),
+    ("predictions today", stats_aggregator.statements()["today"], "sqlite_autoindex_stats_daily_1"),
+    ("stats generation", stats_aggregator.generation_statement(), "sqlite_autoindex_stats_counters_1"),
+    ("pulse open alert", open_alert_statement("Zone A"), "ix_alerts_is_resolved_created_at"),
+    ("timeseries by location", rollup_aggregator.timeseries_statement("hour", "Zone A", SINCE, UNTIL),
+     "sqlite_autoindex_rollups_hourly_1"),
+    ("timeseries all locations", rollup_aggregator.timeseries_statement("day", None, SINCE, UNTIL),
+     "ix_rollups_daily_bucket"),
+])
+def test_hot_query_uses_index(db_session, name, stmt, index):
+    assert_indexed(query_plan(db_session, stmt), index)
+
+
+def test_trend_hydration_walks_location_index(db_session):
+    """Startup hydration is a full pass by design, but must not sort the whole table."""
+    plan = query_plan(db_session, risk_history.hydration_statement())
+    assert "SCAN predictions USING INDEX ix_predictions_location_created_at" in plan, plan
+
+
+def test_index_migration_round_trip(engine, tmp_path):
+    """
+    The Alembic chain applies on top of create_all() and reverts cleanly,
+    and builds the same tables on an empty database.
+    """
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine, inspect
+    import os
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "alembic"))
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+        names = {ix["name"] for ix in inspect(connection).get_indexes("predictions")}
+        assert "ix_predictions_location_created_at" in names
+        bootstrapped = {t: {c["name"] for c in inspect(connection).get_columns(t)}
+                        for t in inspect(connection).get_table_names()}
+
+        command.downgrade(config, "2c265c310a45")
+        names = {ix["name"] for ix in inspect(connection).get_indexes("predictions")}
+        assert "ix_predictions_location_created_at" not in names
+
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    with fresh.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+        migrated = {t: {c["name"] for c in inspect(connection).get_columns(t)}
+                    for t in inspect(connection).get_table_names()}
+    fresh.dispose()
+    assert migrated == bootstrapped
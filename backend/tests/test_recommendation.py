@@ -0,0 +1,47 @@
+import os
+
+from sqlalchemy import text
+
+from app.models.prediction import Prediction
+from app.services.recommendation import TEMPLATES, get_recommendation, recommendation_code
+
+
+def test_prediction_rows_store_a_code_and_render_on_read(client, db_session):
+    response = client.post("/predict", json={"rainfall": 400, "ph_level": 4.0, "contamination": 0.9,
+                                             "cases_count": 100, "location": "Zone A"})
+    data = response.json()
+    row = db_session.get(Prediction, data["id"])
+    assert row.recommendation is None and row.recommendation_code is not None
+    assert data["recommendation"] == get_recommendation(
+        data["risk_level"], 400, 4.0, 0.9, 100, severity=data["severity"], trend=data["trend"])
+    assert "Flood Warning" in data["recommendation"]
+
+
+def test_registry_codes_are_dense_and_unique():
+    codes = {recommendation_code(level, rain, ph, c, cases, severity=sev, trend=trend)
+             for level in ("low", "medium", "high")
+             for sev in ("INFO", "WARNING", "HIGH", "CRITICAL")
+             for trend in (None, "RISING", "STABLE", "FALLING")
+             for rain in (0, 301) for ph in (7, 4) for c in (0, 0.9) for cases in (0, 81)}
+    assert codes == set(range(len(TEMPLATES)))
+
+
+def test_migration_compacts_existing_rows(engine):
+    from alembic import command
+    from alembic.config import Config
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "alembic"))
+    legacy = get_recommendation("high", 400, 4.0, 0.9, 100, severity="CRITICAL", trend="RISING")
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.stamp(config, "5e7a3c9d1f48")
+        insert = text("INSERT INTO predictions (rainfall, ph_level, contamination, cases_count, risk_level, "
+                      "recommendation, location) VALUES (1, 7, 0.1, 0, 'low', :rec, 'Zone A')")
+        connection.execute(insert, [{"rec": legacy}, {"rec": "Urgent response required for Zone A."}])
+        command.upgrade(config, "head")
+        rows = connection.execute(text("SELECT recommendation, recommendation_code FROM predictions ORDER BY id")).all()
+    assert rows[0] == (None, TEMPLATES.index(legacy))
+    assert rows[1] == ("Urgent response required for Zone A.", None)
@@ -0,0 +1,57 @@
+import math
+
+from app.models.rollup import DailyRollup, HourlyRollup
+from app.services.rollup_service import rollup_aggregator
+from app.utils.downsample import lttb
+
+
+HIGH = {"rainfall": 400, "ph_level": 4.0, "contamination": 0.9, "cases_count": 100, "location": "RollupCity"}
+LOW = {"rainfall": 10, "ph_level": 7.0, "contamination": 0.01, "cases_count": 0, "location": "RollupCity"}
+
+
+def _snapshot(db_session):
+    return {
+        model.__tablename__: sorted(
+            tuple(getattr(row, c.name) for c in model.__table__.columns)
+            for row in db_session.query(model).all()
+        )
+        for model in (HourlyRollup, DailyRollup)
+    }
+
+
+def test_rollups_are_maintained_incrementally_and_match_backfill(client, db_session):
+    client.post("/predict", json=HIGH)
+    client.post("/predict/batch", json={"predictions": [LOW, HIGH, dict(LOW, location="Elsewhere")]})
+
+    series = client.get("/analytics/timeseries", params={"granularity": "hour", "location": "RollupCity"}).json()
+    assert series["source_points"] == 1 and not series["downsampled"]
+    point = series["points"][0]
+    assert (point["n"], point["risk_high"], point["risk_low"]) == (3, 2, 1)
+    assert point["rainfall_max"] == 400
+    assert math.isclose(point["rainfall_mean"], 270.0)
+
+    merged = client.get("/analytics/timeseries", params={"granularity": "day"}).json()
+    assert merged["points"][0]["n"] == 4
+
+    live = _snapshot(db_session)
+    db_session.query(HourlyRollup).delete()
+    db_session.commit()
+    rollup_aggregator.backfill(db_session)
+    assert _snapshot(db_session) == live
+
+
+def test_timeseries_rejects_unknown_granularity_and_metric(client):
+    client.post("/predict", json=HIGH)
+    assert client.get("/analytics/timeseries", params={"granularity": "week"}).status_code == 400
+    assert client.get("/analytics/timeseries", params={"metric": "bogus"}).status_code == 400
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = list(range(1000))
+    y = [math.sin(i / 40) for i in x]
+    y[503] = 25.0
+    keep = lttb(x, y, 50).tolist()
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert keep == sorted(keep)
+    assert 503 in keep
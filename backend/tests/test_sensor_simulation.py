@@ -0,0 +1,25 @@
+from app.services.sensor_simulation import SensorSimulator
+
+
+def test_sensor_table_is_stable_per_hour():
+    """The ward table is generated once per hour and reproducible across instances."""
+    sim = SensorSimulator()
+    table = sim.table(hour=480_000)
+    assert sim.table(hour=480_000) is table
+    assert SensorSimulator().table(hour=480_000).reading("Podanur, Coimbatore") == table.reading("Podanur, Coimbatore")
+    assert sim.table(hour=480_001).reading("RS Puram, Coimbatore") != table.reading("RS Puram, Coimbatore")
+
+    for ward in sim.wards:
+        reading = table.reading(ward)
+        assert 6.5 <= reading["ph_level"] <= 7.5
+        floor = 0.3 if "Podanur" in ward or "Singanallur" in ward else 0.1
+        assert reading["contamination"] >= floor
+
+
+def test_sensor_stream_batches():
+    """Unpaced streams yield the requested number of schema-shaped readings."""
+    batches = list(SensorSimulator().stream(rate=0, seconds=1200, batch_size=500, seed=1))
+    assert [len(b) for b in batches] == [500, 500, 200]
+    row = batches[0][0]
+    assert set(row) == {"rainfall", "ph_level", "contamination", "cases_count", "location"}
+    assert 0 <= row["contamination"] <= 1
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+import time
+
+
+def test_importing_the_app_loads_no_model_or_plotting():
+    code = (
+        "import sys, app.main, app.ml.train_model\n"
+        "from app.services.agent_orchestrator import orchestrator\n"
+        "assert orchestrator.readiness()['model'] == 'cold'\n"
+        "heavy = [m for m in ('shap', 'matplotlib', 'seaborn') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_ready_after_background_warmup(client):
+    deadline = time.monotonic() + 30
+    while True:
+        response = client.get("http://testserver/ready")
+        if response.status_code == 200 or time.monotonic() > deadline:
+            break
+        assert response.json()["ready"] is False
+        time.sleep(0.05)
+    body = response.json()
+    assert response.status_code == 200 and body["warmup"] == "done"
+    assert body["model"] == "warm" and body["explainer"] in ("warm", "unavailable")
+    assert body["llm"] in ("warm", "unavailable")
@@ -0,0 +1,41 @@
+from sqlalchemy import event
+
+from app.models.stats import StatsCounter
+from app.services.prediction_service import get_stats
+from app.services.stats_service import stats_aggregator
+
+
+HIGH = {"rainfall": 400, "ph_level": 4.0, "contamination": 0.9, "cases_count": 100, "location": "StatsCity"}
+LOW = {"rainfall": 10, "ph_level": 7.0, "contamination": 0.01, "cases_count": 0, "location": "StatsCity"}
+
+
+def test_stats_are_maintained_incrementally_and_match_reconcile(client, db_session):
+    """Every write path updates the counters; a from-scratch rebuild yields the same summary."""
+    client.post("/predict", json=HIGH)
+    client.post("/predict", json=LOW)
+    client.post("/predict/batch", json={"predictions": [LOW, HIGH, HIGH]})
+    alert_id = client.get("/alerts").json()[0]["id"]
+    client.patch(f"/alerts/{alert_id}/resolve")
+
+    live = client.get("/stats").json()
+    assert live["total_predictions"] == 5
+    assert live["predictions_today"] == 5
+    assert live["risk_distribution"] == {"high": 3, "low": 2}
+    assert (live["total_alerts"], live["resolved_alerts"], live["active_alerts"]) == (3, 1, 2)
+    assert live["recent_locations"] == ["StatsCity"]
+
+    db_session.query(StatsCounter).delete()
+    db_session.commit()
+    assert get_stats(db_session)["total_predictions"] == 0
+
+    stats_aggregator.reconcile(db_session)
+    assert get_stats(db_session) == live
+
+
+def test_stats_read_is_constant_cost(client, db_session, engine):
+    """/stats issues the same few primary-key/limit queries however many rows exist."""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    get_stats(db_session)
+    assert len(statements) == 3
+    assert not any("count(" in sql.lower() or "avg(" in sql.lower() for sql in statements)
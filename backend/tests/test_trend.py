@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.prediction import Prediction
+from app.services.risk_history import RiskHistory
+
+
+def _row(location, risk_level, minutes):
+    return Prediction(
+        rainfall=10, ph_level=7, contamination=0.1, cases_count=0,
+        risk_level=risk_level, location=location,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes),
+    )
+
+
+def test_risk_history_hydrates_last_window_per_location(db_session):
+    """One grouped query loads the newest N risk levels per location, oldest first."""
+    levels = ["low", "medium", "high", "high", "low"]
+    db_session.add_all([_row("A", lvl, i) for i, lvl in enumerate(levels)])
+    db_session.add(_row("B", "medium", 0))
+    db_session.commit()
+
+    history = RiskHistory(window=3)
+    history.hydrate(db_session)
+    assert history.recent("A") == [2, 2, 0]
+    assert history.recent("B") == [1]
+    assert history.recent("C") == []
+
+    history.record("A", "medium")
+    assert history.recent("A") == [2, 0, 1]
+
+
+def test_trend_follows_recent_predictions(client):
+    """Trend is computed from in-memory history and tracks predictions as they are written."""
+    low = {"rainfall": 10, "ph_level": 7, "contamination": 0.01, "cases_count": 0, "location": "RingCity"}
+    high = {"rainfall": 400, "ph_level": 4, "contamination": 0.9, "cases_count": 100, "location": "RingCity"}
+
+    assert client.post("/predict", json=low).json()["trend"] == "STABLE"
+    assert client.post("/predict", json=low).json()["trend"] == "STABLE"
+    assert client.post("/predict", json=high).json()["trend"] == "RISING"
+    assert client.post("/predict", json=high).json()["trend"] == "RISING"
+    assert client.post("/predict", json=low).json()["trend"] == "FALLING"
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.services.weather_service import WeatherService
+from app.services.weather_cache import CircuitBreaker
+from app.services.weather_history import WeatherHistoryStore, HOUR
+
+
+class _StubOpenWeather(BaseHTTPRequestHandler):
+    """Minimal stand-in for the OpenWeatherMap current-weather endpoint."""
+    calls = 0
+    fail = False
+
+    def do_GET(self):
+        type(self).calls += 1
+        if type(self).fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({"rain": {"1h": 12.5}, "main": {"temp": 27.0, "humidity": 80}, "dt": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    _StubOpenWeather.calls = 0
+    _StubOpenWeather.fail = False
+    server = HTTPServer(("127.0.0.1", 0), _StubOpenWeather)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/data/2.5/weather"
+    server.shutdown()
+
+
+def test_weather_cache_serves_fresh_then_stale(stub_server):
+    """Second call within TTL is a cache hit; past TTL it is served stale and refreshed."""
+    service = WeatherService(api_key="test", base_url=stub_server, cache_ttl=60, max_stale=600,
+                             history=WeatherHistoryStore())
+
+    async def scenario():
+        first = await service.get_current_weather()
+        second = await service.get_current_weather()
+        assert first["cache_status"] == "live" and first["rainfall"] == 12.5
+        assert second["cache_status"] == "fresh"
+        assert _StubOpenWeather.calls == 1
+
+        # Age the entry past its TTL
+        key = service.grid_cell(service.COIMBATORE_LAT, service.COIMBATORE_LON)
+        data, fetched_at = service.cache._entries[key]
+        service.cache._entries[key] = (data, fetched_at - 120)
+
+        stale = await service.get_current_weather()
+        assert stale["cache_status"] == "stale"
+        assert stale["cache_age_seconds"] >= 120
+        await asyncio.gather(*service._inflight.values())
+        assert _StubOpenWeather.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_weather_circuit_breaker_skips_upstream(stub_server):
+    """After repeated failures the breaker opens and the upstream is not called."""
+    _StubOpenWeather.fail = True
+    service = WeatherService(api_key="test", base_url=stub_server, cache_ttl=60, max_stale=600,
+                             history=WeatherHistoryStore())
+
+    async def scenario():
+        for _ in range(service.breaker.failure_threshold):
+            result = await service.get_current_weather()
+            assert result["is_fallback"]
+        assert service.breaker.state == CircuitBreaker.OPEN
+        calls = _StubOpenWeather.calls
+
+        result = await service.get_current_weather()
+        assert result["cache_status"] == "fallback"
+        assert "Circuit open" in result["source"]
+        assert _StubOpenWeather.calls == calls
+
+        # Cooldown elapsed: one probe goes through and closes the breaker
+        _StubOpenWeather.fail = False
+        service.breaker.opened_at -= service.breaker.reset_timeout
+        result = await service.get_current_weather()
+        assert result["cache_status"] == "live"
+        assert service.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_weather_batch_dedupes_grid_cells(stub_server):
+    """Nearby wards share one grid-cell fetch; distant wards get their own."""
+    service = WeatherService(api_key="test", base_url=stub_server, cache_ttl=60, max_stale=600,
+                             history=WeatherHistoryStore())
+    coords = {
+        "RS Puram": (11.0318, 76.9408),
+        "Kuniyamuthur": (10.9868, 76.9358),   # same 0.1° cell as RS Puram
+        "Pollachi": (10.6618, 77.0108),
+        "Mettupalayam": (11.2968, 76.9358),
+    }
+
+    async def scenario():
+        readings = await service.get_weather_for_locations(coords)
+        assert set(readings) == set(coords)
+        assert readings["RS Puram"]["grid_cell"] == readings["Kuniyamuthur"]["grid_cell"]
+        assert readings["Pollachi"]["grid_cell"] != readings["Mettupalayam"]["grid_cell"]
+        assert _StubOpenWeather.calls == 3
+
+        await service.get_weather_for_locations(coords)
+        assert _StubOpenWeather.calls == 3  # every cell cached independently
+
+    asyncio.run(scenario())
+
+
+def test_weather_history_rolling_windows(tmp_path):
+    """Windowed sums expire old hours incrementally and survive a save/load round trip."""
+    path = str(tmp_path / "history.npz")
+    store = WeatherHistoryStore(path)
+    cell = (11.0, 77.0)
+    t0 = 1_700_000_000 - (1_700_000_000 % HOUR)
+
+    for h in range(100):
+        store.record(cell, 1.0, ts=t0 + h * HOUR)
+    store.record(cell, 0.5, ts=t0 + 99 * HOUR)  # lower overlapping reading keeps the max
+
+    now = t0 + 99 * HOUR
+    agg = store.aggregates(cell, ts=now)
+    assert agg["rain_1h"] == 1.0
+    assert agg["rain_24h"] == 24.0
+    assert agg["rain_72h"] == 72.0
+    assert agg["rain_7d"] == 100.0
+
+    store.save()
+    reloaded = WeatherHistoryStore(path)
+    assert reloaded.load()
+    assert reloaded.aggregates(cell, ts=now) == agg
+
+    # A day later the 24h window is empty and the week keeps the rest
+    later = reloaded.aggregates(cell, ts=now + 24 * HOUR)
+    assert later["rain_24h"] == 0.0
+    assert later["rain_72h"] == 48.0
+    assert later["rain_7d"] == 100.0
+
+
+def test_weather_lookups_cannot_grow_cache_or_history(stub_server, client):
+    """Out-of-district points are rejected; ad-hoc cells are LRU-capped and never enter history."""
+    assert client.get("/realtime/weather", params={"lat": 95, "lon": 77}).status_code == 422
+    assert client.get("/realtime/weather", params={"lat": 28.6, "lon": 77.2}).status_code == 422
+
+    history = WeatherHistoryStore()
+    service = WeatherService(api_key="test", base_url=stub_server, history=history)
+    service.cache.max_entries = 2
+
+    async def scenario():
+        for i in range(4):
+            await service.get_weather_at(10.3 + i * 0.2, 76.7)   # cells with no ward
+        await service.get_current_weather()                       # Coimbatore's ward cell
+
+    asyncio.run(scenario())
+    assert len(service.cache) == 2
+    assert len(history) == 1
@@ -19,11 +19,18 @@ export const submitPrediction = (data) => api.post('/api/v1/predict', data);
 /** Submit multiple predictions at once. */
 export const submitBatchPredictions = (data) => api.post('/api/v1/predict/batch', data);
 
-/** Fetch all past predictions. */
-export const getPredictions = () => api.get('/api/v1/predictions');
+/**
+ * Fetch past predictions, newest first.
+ * @param {{ limit?: number, cursor?: string, location?: string, risk_level?: string, severity?: string, since?: string, until?: string }} [params]
+ * The next page's cursor is in the `x-next-cursor` response header.
+ */
+export const getPredictions = (params = {}) => api.get('/api/v1/predictions', { params });
 
-/** Fetch all active alerts. */
-export const getAlerts = () => api.get('/api/v1/alerts');
+/**
+ * Fetch alerts, newest first.
+ * @param {{ limit?: number, cursor?: string, resolved?: boolean, severity?: string, since?: string, until?: string }} [params]
+ */
+export const getAlerts = (params = {}) => api.get('/api/v1/alerts', { params });
 
 /** Resolve an alert. */
 export const resolveAlert = (id) => api.patch(`/api/v1/alerts/${id}/resolve`);
@@ -34,6 +41,25 @@ export const getStats = () => api.get('/api/v1/stats');
 /** Fetch ML model metrics. */
 export const getModelMetrics = () => api.get('/api/v1/model/metrics');
 
+/**
+ * Fetch hourly/daily rollups for charts.
+ * @param {{ granularity?: 'hour'|'day', location?: string, since?: string, until?: string, points?: number, metric?: string }} [params]
+ */
+export const getTimeseries = (params = {}) => api.get('/api/v1/analytics/timeseries', { params });
+
+/**
+ * URL of a streamed export (use as a download link).
+ * @param {'predictions'|'alerts'} dataset
+ * @param {{ format?: 'csv'|'ndjson'|'parquet', since?: string, until?: string, location?: string, risk_level?: string, severity?: string, resolved?: boolean }} [params]
+ */
+export const getExportUrl = (dataset, params = {}) =>
+    `${API_BASE}/api/v1/export/${dataset}?${new URLSearchParams(params)}`;
+
+/** Start a background export; poll getExportJob(id) until status is 'done', then download. */
+export const createExportJob = (dataset, params = {}) => api.post(`/api/v1/export/${dataset}/jobs`, null, { params });
+export const getExportJob = (id) => api.get(`/api/v1/export/jobs/${id}`);
+export const getExportDownloadUrl = (id) => `${API_BASE}/api/v1/export/jobs/${id}/download`;
+
 // Agentic AI & Simulation (Ollama + SHAP)
 export const getAgentAnalysis = (data) => api.post('/api/v1/agent/analyze', data);
 export const runSimulation = (baseline, updates) => api.post('/api/v1/agent/simulate', { baseline, updates });